@@ -1,8 +1,13 @@
 import os
+import sys
 import json
 import logging
 import pandas as pd
 
+# The metric definitions are shared with the simulator (path_sim/metrics.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from path_sim.metrics import summarize_database, summarize_files
+
 
 logging.basicConfig(
     filename="analysis_log.txt",
@@ -12,62 +17,77 @@ logging.basicConfig(
 )
 
 
-def load_run(csv_path):
+SUMMARY_METRICS = ["oscillation", "loss", "throughput", "fairness_std"]
+
+
+def read_meta(csv_path):
     meta_path = csv_path.replace(".csv", ".meta.json")
     if not os.path.exists(meta_path):
         raise FileNotFoundError(f"Meta file missing for {csv_path}")
 
-    df = pd.read_csv(csv_path)
     with open(meta_path) as f:
-        meta = json.load(f)
-
-    path_cols = [col for col in df.columns if col.endswith("_load")]
-
-    osc = df[path_cols].std().mean()
-    loss = df["total_loss"].mean()
-    tput = df["total_throughput"].mean()
-    fairness = df[path_cols].mean().std()
-
-    result = {
-        "file": os.path.basename(csv_path),
-        "experiment": meta.get("experiment", "unknown"),
-        "strategy": meta["strategy"],
-        "agents": meta["agents"],
-        "topology": meta.get("topology", "unknown"),
-        "oscillation": round(osc, 2),
-        "loss": round(loss, 2),
-        "throughput": round(tput, 2),
-        "fairness_std": round(fairness, 2)
-    }
-
-    logging.info(f"{result['file']}: "
-                 f"osc={result['oscillation']}, "
-                 f"loss={result['loss']}, "
-                 f"tput={result['throughput']}, "
-                 f"fairness={result['fairness_std']}")
-    return result
-
-
-def analyze_folder(folder="."):
+        return json.load(f)
+
+
+def summary_rows(runs, table):
+    """Summary rows of (file name, meta) runs and their metric table, in the same order."""
     summary = []
+    for (name, meta), values in zip(runs, table.to_dict("records")):
+        result = {
+            "file": name,
+            "experiment": meta.get("experiment", "unknown"),
+            "strategy": meta["strategy"],
+            "agents": meta["agents"],
+            "topology": meta.get("topology", "unknown"),
+            "oscillation": round(values["oscillation"], 2),
+            "loss": round(values["loss"], 2),
+            "throughput": round(values["throughput"], 2),
+            "fairness_std": round(values["fairness_std"], 2)
+        }
+
+        logging.info(f"{result['file']}: "
+                     f"osc={result['oscillation']}, "
+                     f"loss={result['loss']}, "
+                     f"tput={result['throughput']}, "
+                     f"fairness={result['fairness_std']}")
+        summary.append(result)
+    return pd.DataFrame(summary)
+
+
+def analyze_folder(folder=".", chunksize=100_000):
+    """Summarizes every result file, reading each in chunks of `chunksize` rows."""
+    runs = []
 
     for file in os.listdir(folder):
         if file.endswith(".csv") and file.startswith("results_"):
             try:
-                result = load_run(os.path.join(folder, file))
-                summary.append(result)
+                runs.append((file, read_meta(os.path.join(folder, file))))
             except Exception as e:
                 logging.warning(f"Error with {file}: {e}")
                 print(f" Error with {file}: {e}")
 
-    return pd.DataFrame(summary)
+    table = summarize_files([os.path.join(folder, file) for file, _ in runs], SUMMARY_METRICS, chunksize)
+    return summary_rows(runs, table)
+
+
+def analyze_database(db_path, chunksize=100_000, **filters):
+    """Summarizes the runs of a results database, e.g. strategy="blest", min_agents=250.
+
+    Each trace is read in chunks of `chunksize` rows, like analyze_folder.
+    """
+    metas, table = summarize_database(db_path, SUMMARY_METRICS, chunksize, **filters)
+    return summary_rows([(meta["name"], meta) for meta in metas], table)
 
 
 
 if __name__ == "__main__":
     logging.info("=== Starting analysis ===")
 
-    df = analyze_folder()
+    # python analysis_expN.py [results.db]
+    if len(sys.argv) > 1 and sys.argv[1].endswith(".db"):
+        df = analyze_database(sys.argv[1])
+    else:
+        df = analyze_folder()
     df = df.sort_values(by=["experiment", "strategy", "agents"])
 
     for _, row in df.iterrows():
@@ -0,0 +1,5 @@
+"""Agent-based simulator of path selection strategies on path-aware networks.
+
+The modules are imported on demand (see cli.py): importing the package
+itself loads nothing else.
+"""
@@ -0,0 +1,204 @@
+import random
+
+import numpy as np
+
+from .main import depends_on
+
+# ==============================================================================
+# LEARNING STRATEGIES: per-agent bandit estimates of every path
+# ==============================================================================
+#
+# Each agent learns a value per path from what it observes itself: the reward
+# of a step is the fraction of its window its path delivered (1 on an
+# uncongested path, capacity / load on a congested one). Three policies:
+#
+#   epsilon_decay   explore a random path with probability epsilon / (1 + t / decay_steps),
+#                   otherwise take the best estimate
+#   ucb             estimate + c * sqrt(ln(t + 1) / count)
+#   thompson        estimate + N(0, 1) * 0.5 / sqrt(count), a Gaussian stand-in
+#                   for the Beta posterior of a [0, 1] reward
+#
+# Every (agent, path) starts as if it had been observed once with reward
+# PRIOR_MEAN. The estimates are float32 tables updated and queried once per
+# step for all agents at once; the strategy callable only hands each agent
+# its precomputed choice.
+#
+# With more than SPARSE_PATHS paths the dense agents x paths table gives way
+# to a fixed number of slots per agent (the paths it has actually used; the
+# weakest slot is evicted when full). Unvisited paths keep the prior, and one
+# random unvisited path per agent and step competes with the slots for them.
+
+LEARNING_POLICIES = ("epsilon_decay", "ucb", "thompson")
+
+PRIOR_MEAN = 0.5
+PRIOR_COUNT = 1.0
+
+# Paths above which a learner switches to the slot table, and its slots per agent
+SPARSE_PATHS = 64
+SPARSE_SLOTS = 16
+
+
+class DenseValueTable:
+    """Estimate and observation count of every (agent, path), as agents x paths float32."""
+
+    def __init__(self, num_agents, num_paths):
+        self.num_paths = num_paths
+        self.mean = np.full((num_agents, num_paths), PRIOR_MEAN, dtype=np.float32)
+        self.count = np.full((num_agents, num_paths), PRIOR_COUNT, dtype=np.float32)
+        self.rows = np.arange(num_agents)
+
+    def update(self, path_idx, reward):
+        """Folds one reward per agent into the running mean of the path it used."""
+        count = self.count[self.rows, path_idx] + 1
+        mean = self.mean[self.rows, path_idx]
+        self.count[self.rows, path_idx] = count
+        self.mean[self.rows, path_idx] = mean + (reward - mean) / count
+
+    def candidates(self, rng):
+        """(paths, mean, count) arrays to score, one row per agent."""
+        return None, self.mean, self.count
+
+
+class SlotValueTable:
+    """Estimates of the paths each agent has used, in a fixed number of slots per agent."""
+
+    def __init__(self, num_agents, num_paths, slots=SPARSE_SLOTS):
+        self.num_paths = num_paths
+        self.path = np.full((num_agents, slots), -1, dtype=np.int32)
+        self.mean = np.full((num_agents, slots), PRIOR_MEAN, dtype=np.float32)
+        self.count = np.full((num_agents, slots), PRIOR_COUNT, dtype=np.float32)
+        self.rows = np.arange(num_agents)
+
+    def update(self, path_idx, reward):
+        """Updates the agent's slot of its path, claiming the empty or weakest slot if it has none."""
+        match = self.path == path_idx[:, None]
+        found = match.any(axis=1)
+        # Empty slots (-1) go first, then the slot with the lowest estimate
+        weakest = np.argmin(np.where(self.path < 0, -np.inf, self.mean), axis=1)
+        slot = np.where(found, np.argmax(match, axis=1), weakest)
+        fresh = ~found
+        self.path[self.rows[fresh], slot[fresh]] = path_idx[fresh]
+        self.mean[self.rows[fresh], slot[fresh]] = PRIOR_MEAN
+        self.count[self.rows[fresh], slot[fresh]] = PRIOR_COUNT
+
+        count = self.count[self.rows, slot] + 1
+        mean = self.mean[self.rows, slot]
+        self.count[self.rows, slot] = count
+        self.mean[self.rows, slot] = mean + (reward - mean) / count
+
+    def candidates(self, rng):
+        """The agent's slots plus one random unvisited path at the prior."""
+        extra = rng.integers(self.num_paths, size=len(self.rows)).astype(np.int32)
+        paths = np.concatenate([self.path, extra[:, None]], axis=1)
+        mean = np.concatenate([self.mean, np.full((len(self.rows), 1), PRIOR_MEAN, dtype=np.float32)], axis=1)
+        count = np.concatenate([self.count, np.full((len(self.rows), 1), PRIOR_COUNT, dtype=np.float32)], axis=1)
+        # Empty slots, and a random pick that is already in a slot, are not candidates
+        invalid = paths < 0
+        invalid[:, -1] = (self.path == extra[:, None]).any(axis=1)
+        mean = np.where(invalid, -np.inf, mean)
+        return paths, mean, count
+
+
+class BanditLearner:
+    """Learns per-agent path values and picks every agent's next path in one pass per step.
+
+    observe() is called once per step with every agent's path and the
+    PathState; select() is the strategy callable the agents hold.
+    """
+
+    def __init__(self, policy, num_agents, num_paths, epsilon=0.2, decay_steps=100, c=0.5,
+                 sparse=None, seed=None):
+        if policy not in LEARNING_POLICIES:
+            raise ValueError(f"Unknown learning policy: {policy}")
+        self.policy = policy
+        self.epsilon = epsilon
+        self.decay_steps = decay_steps
+        self.c = c
+        if sparse is None:
+            sparse = num_paths > SPARSE_PATHS
+        self.table = SlotValueTable(num_agents, num_paths) if sparse else DenseValueTable(num_agents, num_paths)
+        # Seeded from `random`, so a seeded Simulator run is reproducible
+        self.rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+        self.t = 0
+        self.choice = None
+
+    def observe(self, path_idx, path_state):
+        """Updates the estimates with this step's rewards and picks every agent's next path."""
+        load = np.asarray(path_state.load, dtype=np.float64)
+        capacity = np.asarray(path_state.capacity, dtype=np.float64)
+        delivered = np.where(load > capacity, capacity / np.maximum(load, 1e-12), 1.0).astype(np.float32)
+        path_idx = np.asarray(path_idx, dtype=np.int64)
+        self.table.update(path_idx, delivered[path_idx])
+        self.choice = self.choose()
+        self.t += 1
+
+    def choose(self):
+        """Every agent's next path index under the policy."""
+        paths, mean, count = self.table.candidates(self.rng)
+        num_agents = mean.shape[0]
+        if self.policy == "epsilon_decay":
+            score = mean
+        elif self.policy == "ucb":
+            score = mean + self.c * np.sqrt(np.log(self.t + 1.0) / count)
+        else:
+            noise = self.rng.standard_normal(mean.shape, dtype=np.float32)
+            score = mean + noise * (0.5 / np.sqrt(count))
+        # A tiny random tie-break keeps agents with equal estimates from herding onto one path
+        score = score + self.rng.random(mean.shape, dtype=np.float32) * 1e-4
+        best = np.argmax(score, axis=1)
+        choice = best if paths is None else paths[np.arange(num_agents), best]
+
+        if self.policy == "epsilon_decay":
+            epsilon = self.epsilon / (1.0 + self.t / self.decay_steps)
+            explore = self.rng.random(num_agents) < epsilon
+            choice = np.where(explore, self.rng.integers(self.table.num_paths, size=num_agents), choice)
+        return choice
+
+    @depends_on("agent_state", "random")
+    def select(self, agent, topology, path_state):
+        """Strategy callable: the agent's path as chosen by the last observe()."""
+        if self.choice is None:
+            return agent.current_path
+        return topology.paths[self.choice[agent.id]]
+
+    def nbytes(self):
+        """Memory held by the value table."""
+        table = self.table
+        return sum(getattr(table, name).nbytes for name in ("path", "mean", "count") if hasattr(table, name))
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from collections import namedtuple
+    from .main import Simulator, create_topology_file, reset_strategy_state
+
+    CONFIG_FILE = "topology.json"
+    create_topology_file(CONFIG_FILE)
+    for strategy in ["epsilon_greedy", "epsilon_decay", "ucb", "thompson"]:
+        reset_strategy_state()
+        random.seed(0)
+        sim = Simulator(CONFIG_FILE, 100, 300, strategy, trace="paths")
+        sim.run()
+        tail = sim.log_data[100:]
+        print(f"{strategy}: avg throughput {np.mean([r['total_throughput'] for r in tail]):.1f}, "
+              f"avg loss {np.mean([r['total_loss'] for r in tail]):.1f}")
+    os.remove(CONFIG_FILE)
+
+    # Feasibility at scale: the learner's own per-step cost, without the Python agent loop
+    State = namedtuple("State", "load capacity")
+    num_agents, num_paths = 100_000, 300
+    rng = np.random.default_rng(0)
+    capacity = rng.uniform(50, 500, num_paths)
+    for policy in LEARNING_POLICIES:
+        for sparse in (False, True):
+            learner = BanditLearner(policy, num_agents, num_paths, sparse=sparse, seed=0)
+            path_idx = rng.integers(num_paths, size=num_agents)
+            start = time.perf_counter()
+            for _ in range(10):
+                load = np.bincount(path_idx, minlength=num_paths) * 3.0
+                learner.observe(path_idx, State(load, capacity))
+                path_idx = learner.choice
+            step = (time.perf_counter() - start) / 10
+            print(f"{policy:>13} {'slots' if sparse else 'dense'}: {step * 1000:.0f} ms/step, "
+                  f"table {learner.nbytes() / 1e6:.0f} MB ({num_agents} agents x {num_paths} paths)")
@@ -0,0 +1,181 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from .main import Simulator, create_topology_file
+from .jit_engine import JitSimulator
+from .sharded_engine import ShardedSimulator
+
+# ==============================================================================
+# BENCHMARK SUITE
+# ==============================================================================
+
+def time_run(engine, *args, **kwargs):
+    """Builds a simulator quietly and returns (seconds spent in run(), simulator)."""
+    with redirect_stdout(io.StringIO()):
+        sim = engine(*args, **kwargs)
+        start = time.perf_counter()
+        sim.run()
+        elapsed = time.perf_counter() - start
+    return elapsed, sim
+
+
+def bench_engines(config_filepath, agent_counts, duration, strategy_name):
+    """Steps per second of each engine for a range of population sizes."""
+    engines = {"reference": Simulator, "jit": JitSimulator, "sharded": ShardedSimulator}
+    rows = []
+    for num_agents in agent_counts:
+        for name, engine in engines.items():
+            # Warm-up run so JIT compilation is not counted
+            time_run(engine, config_filepath, 10, 2, strategy_name)
+            elapsed, _ = time_run(engine, config_filepath, num_agents, duration, strategy_name)
+            rows.append({
+                "engine": name,
+                "agents": num_agents,
+                "seconds": round(elapsed, 4),
+                "steps_per_second": round(duration / elapsed, 1)
+            })
+    return rows
+
+
+def bench_memory(config_filepath, agent_counts, duration, strategy_name):
+    """Trace size and tracemalloc peak of each engine (timed apart: tracemalloc slows runs)."""
+    engines = {"reference": Simulator, "jit": JitSimulator, "sharded": ShardedSimulator}
+    rows = []
+    for num_agents in agent_counts:
+        for name, engine in engines.items():
+            # Warm-up run so JIT compilation is not counted as step allocation
+            time_run(engine, config_filepath, 10, 2, strategy_name)
+            _, sim = time_run(engine, config_filepath, num_agents, duration, strategy_name, profile_memory=True)
+            cost = sim.run_cost()
+            rows.append({
+                "engine": name,
+                "agents": num_agents,
+                "trace_mb": cost["trace_mb"],
+                "alloc_peak_mb": cost["alloc_peak_mb"],
+                "step_alloc_mb": cost["phases"]["step"]["alloc_mb"],
+                "log_alloc_mb": cost["phases"]["log"]["alloc_mb"],
+            })
+    return rows
+
+
+def bench_sharded_scaling(config_filepath, num_agents, duration, strategy_name,
+                          thread_counts=(1, 2, 4, 8), shard_size=65536):
+    """Strong-scaling efficiency of ShardedSimulator over thread counts.
+
+    Also checks that every thread count produces the same log as one thread.
+    """
+    rows = []
+    baseline_time, baseline_log = None, None
+    for num_threads in thread_counts:
+        elapsed, sim = time_run(
+            ShardedSimulator, config_filepath, num_agents, duration, strategy_name,
+            num_threads=num_threads, shard_size=shard_size
+        )
+        if baseline_time is None:
+            baseline_time, baseline_log = elapsed, sim.log_data
+        speedup = baseline_time / elapsed
+        rows.append({
+            "threads": num_threads,
+            "seconds": round(elapsed, 4),
+            "speedup": round(speedup, 2),
+            "efficiency": round(speedup / num_threads * thread_counts[0], 2),
+            "deterministic": sim.log_data == baseline_log
+        })
+    return rows
+
+
+def bench_imports(modules, repeats=5):
+    """Import time of each module in a fresh interpreter, net of interpreter startup.
+
+    This is what every spawned worker process pays before it can simulate.
+    """
+    # Run from the directory holding the package, so it imports without being installed
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def best_of(code):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=here, check=True)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    startup = best_of("pass")
+    rows = []
+    for module in modules:
+        loaded = subprocess.run(
+            [sys.executable, "-c", f"import sys, {__package__}.{module}; print(' '.join(sorted(sys.modules)))"],
+            cwd=here, check=True, capture_output=True, text=True
+        ).stdout.split()
+        rows.append({
+            "module": module,
+            "import_ms": round((best_of(f"import {__package__}.{module}") - startup) * 1000, 1),
+            "pandas": "pandas" in loaded,
+            "numpy": "numpy" in loaded,
+            "matplotlib": "matplotlib" in loaded,
+            "numba": "numba" in loaded,
+        })
+    return rows
+
+
+def append_history(history_file, benchmark, rows):
+    """Appends benchmark rows, stamped with the time and git commit, to a JSON-lines history."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    with open(history_file, "a") as f:
+        for row in rows:
+            f.write(json.dumps({"time": stamp, "commit": commit, "benchmark": benchmark, **row}) + "\n")
+
+
+def print_rows(title, rows):
+    """Prints benchmark rows as an aligned table."""
+    print(f"\n=== {title} ===")
+    header = list(rows[0].keys())
+    print("  ".join(f"{h:>16}" for h in header))
+    for row in rows:
+        print("  ".join(f"{str(row[h]):>16}" for h in header))
+
+
+def run_benchmarks(imports_only=False, history_file=None):
+    """Runs the benchmark suite and prints its tables.
+
+    With history_file the engine and memory tables are also appended to that
+    JSON-lines file, so speed and memory regressions show up across commits.
+    """
+    modules = ["main", "sweep", "cli", "jit_engine", "sharded_engine", "multi_engine", "churn", "fluid",
+               "metrics", "plotting"]
+    print_rows("Import time (fresh interpreter)", bench_imports(modules))
+    if imports_only:
+        return
+
+    # The topology lives in a temporary directory, removed even when a benchmark fails
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file = os.path.join(tmp_dir, "topology.json")
+        create_topology_file(config_file)
+
+        engine_rows = bench_engines(config_file, [100, 500, 2000], 300, "min_load")
+        print_rows("Engines (min_load)", engine_rows)
+        memory_rows = bench_memory(config_file, [100, 500, 2000], 300, "min_load")
+        print_rows("Memory (min_load, tracemalloc)", memory_rows)
+        if history_file:
+            append_history(history_file, "engines", engine_rows)
+            append_history(history_file, "memory", memory_rows)
+
+        max_threads = os.cpu_count() or 1
+        thread_counts = tuple(n for n in (1, 2, 4, 8, 16, 32) if n <= max_threads)
+        print_rows(f"Sharded scaling, 10^6 agents, {max_threads} cores",
+                   bench_sharded_scaling(config_file, 1_000_000, 50, "min_load", thread_counts))
+
+
+if __name__ == "__main__":
+    run_benchmarks()
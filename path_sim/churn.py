@@ -0,0 +1,234 @@
+import numpy as np
+
+from .main import Simulator
+from .memory import CWND_DTYPE, path_index_dtype
+from .sketch import CwndSketch
+from .strategy_codes import SHARD_STRATEGIES, SHARD_STRATEGY_NAMES
+from .vector_step import PathTables, StrategyState, aimd, choose_paths, static_choice, step_target
+
+# ==============================================================================
+# FLOW CHURN: flows arrive, transfer a heavy-tailed amount of data and leave
+# ==============================================================================
+#
+# ChurnSimulator replaces the fixed population with a flow process. New flows
+# arrive as a Poisson process (arrival_rate per step) on a random path, each
+# with a Pareto-distributed size (mean_flow_size Mb, tail index size_shape).
+# A flow delivers cwnd x (capacity / load, at most 1) of its path per step
+# and departs once its size is delivered; its completion time is recorded.
+#
+# Flow state lives in a FlowTable of max_flows slots allocated once. Departed
+# slots go back on a free-list and are reused by later arrivals, so churn never
+# reallocates; arrivals that find no free slot are rejected and counted. Every
+# per-step operation works on the compact list of active slots, so a step
+# costs time proportional to the active flows, not to max_flows.
+#
+# Log rows add active_flows, arrivals, rejected, completions and mean_fct
+# (mean completion time in steps of the flows that finished at that step),
+# and with trace="cwnd" the cwnd summaries of the active flows (sketch.py).
+
+
+class FlowTable:
+    """Fixed-capacity flow state with a free-list of slots and a compact list of active slots."""
+
+    def __init__(self, capacity, num_paths):
+        index_dtype = path_index_dtype(num_paths)
+        self.capacity = capacity
+        self.path_idx = np.zeros(capacity, dtype=index_dtype)
+        self.cwnd = np.zeros(capacity, dtype=CWND_DTYPE)
+        self.remaining = np.zeros(capacity, dtype=np.float64)
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.strategy_state = StrategyState(capacity, index_dtype, np.float32)
+        # Free slots are a stack (top at num_free - 1); active slots are packed at the front
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.int64)
+        self.num_free = capacity
+        self.active_slots = np.empty(capacity, dtype=np.int64)
+        self.num_active = 0
+
+    @property
+    def active(self):
+        """Slots of the active flows, in arrival order."""
+        return self.active_slots[:self.num_active]
+
+    def allocate(self, count):
+        """Takes up to `count` free slots, marks them active and returns them."""
+        count = min(count, self.num_free)
+        slots = self.free[self.num_free - count:self.num_free][::-1].copy()
+        self.num_free -= count
+        self.active_slots[self.num_active:self.num_active + count] = slots
+        self.num_active += count
+        return slots
+
+    def release(self, done):
+        """Frees the active flows flagged in `done` (a mask over self.active)."""
+        active = self.active
+        finished = active[done]
+        kept = active[~done]
+        self.active_slots[:len(kept)] = kept
+        self.num_active = len(kept)
+        self.free[self.num_free:self.num_free + len(finished)] = finished
+        self.num_free += len(finished)
+
+
+class ChurnSimulator(Simulator):
+    """Simulator with flow arrivals and departures instead of a fixed population.
+
+    num_agents flows exist at t=0; afterwards flows arrive at arrival_rate
+    per step and leave once their size is delivered. The default rate offers
+    load_factor x the total path capacity (0.8: the paths are 80% loaded).
+    Supports the strategies of the sharded engine; congestion control is
+    AIMD as in Agent. Per-agent columns are never logged; trace="cwnd" adds
+    the cwnd summaries of the active flows.
+    """
+    ENGINE = "churn"
+    STRATEGIES = SHARD_STRATEGY_NAMES
+
+    def __init__(self, config_filepath, num_agents, duration, strategy_name, arrival_rate=None,
+                 load_factor=0.8, mean_flow_size=100.0, size_shape=1.5, max_flows=None, seed=0,
+                 epsilon=0.1, telemetry=None, memory_budget_mb=None, trace="paths", profile_memory=False,
+                 congestion_control="aimd"):
+        if trace == "agents":
+            raise ValueError("The churn engine does not log per-agent columns")
+        if congestion_control != "aimd":
+            raise ValueError("The churn engine only models AIMD congestion control")
+        if size_shape <= 1:
+            raise ValueError("size_shape must be above 1 for the flow sizes to have a mean")
+        self.arrival_rate = arrival_rate
+        self.load_factor = load_factor
+        self.mean_flow_size = mean_flow_size
+        self.size_shape = size_shape
+        self.max_flows = max_flows or max(4 * num_agents, 1024)
+        self.seed = seed
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+        super().__init__(config_filepath, num_agents, duration, strategy_name, telemetry=telemetry,
+                         trace=trace, memory_budget_mb=memory_budget_mb, profile_memory=profile_memory)
+        if self.events is not None:
+            raise ValueError("Topology events are not supported by the churn engine")
+        if self.arrival_rate is None:
+            total_capacity = sum(path.capacity_mbps for path in self.topology.paths)
+            self.arrival_rate = load_factor * total_capacity / mean_flow_size
+        self.flow_completion_times = np.empty(0, dtype=np.int64)
+
+    def flow_sizes(self, count):
+        """Pareto flow sizes (Mb) with the configured mean and tail index."""
+        minimum = self.mean_flow_size * (self.size_shape - 1) / self.size_shape
+        return minimum * (1.0 + self.rng.pareto(self.size_shape, size=count))
+
+    def _create_agents(self):
+        """Creates the flow table and the initial flows; returns an empty Agent list."""
+        self.flows = FlowTable(self.max_flows, len(self.topology.paths))
+        self._admit(min(self.num_agents, self.max_flows), t=0)
+        return []
+
+    def _admit(self, count, t):
+        """Starts up to `count` new flows at step t; returns how many found a slot."""
+        slots = self.flows.allocate(count)
+        flows, n = self.flows, len(slots)
+        flows.path_idx[slots] = self.rng.integers(len(self.topology.paths), size=n)
+        flows.cwnd[slots] = self.rng.uniform(1.0, 5.0, size=n)
+        flows.remaining[slots] = self.flow_sizes(n)
+        flows.start[slots] = t
+        flows.strategy_state.reset(slots)
+        return n
+
+    def run(self):
+        """The main loop over the active flows only."""
+        print(f"\nStarting churn simulation with {self.num_agents} initial flows, "
+              f"{self.arrival_rate:g} arrivals/step, for {self.duration} steps...")
+        paths = self.topology.paths
+        num_paths = len(paths)
+        tables = PathTables(self.topology)
+        capacity = tables.capacity
+        strategy = SHARD_STRATEGIES[self.strategy_func]
+        static = static_choice(strategy, self.strategy_func, self.topology)
+
+        flows = self.flows
+        completion_times = []
+        path_ids = [path.id for path in paths]
+        load_keys = [f'{path_id}_load' for path_id in path_ids]
+        loss_keys = [f'{path_id}_loss' for path_id in path_ids]
+        self.profiler.lap("setup")
+
+        for t in range(self.duration):
+            # 0. Arrivals (t=0 starts with the initial flows)
+            arrivals = int(self.rng.poisson(self.arrival_rate)) if t > 0 else 0
+            admitted = self._admit(arrivals, t) if arrivals else 0
+
+            # 1. Path loads over the active flows
+            active = flows.active
+            path_idx = flows.path_idx[active]
+            cwnd = flows.cwnd[active]
+            loads = np.bincount(path_idx, weights=cwnd, minlength=num_paths)
+
+            # 2. Congestion, loss and the share of each window that gets delivered
+            congested = loads > capacity
+            loss = np.where(congested, loads - capacity, 0.0)
+            delivered = np.where(congested, capacity / np.maximum(loads, 1e-12), 1.0)
+
+            # 3. Transfer progress and departures
+            remaining = flows.remaining[active] - cwnd * delivered[path_idx]
+            flows.remaining[active] = remaining
+            done = remaining <= 0
+            fct = t - flows.start[active[done]] + 1
+            completion_times.append(fct)
+
+            # 4. AIMD update, the strategy decision and the switch reset
+            new_cwnd = aimd(cwnd, congested[path_idx])
+            target = step_target(strategy, loads, tables.blest_mask, static)
+            new = choose_paths(strategy, flows.strategy_state, active, target, tables.weights, num_paths,
+                               rng=self.rng, epsilon=self.epsilon)
+            new_cwnd = np.where(new != path_idx, 2.0, new_cwnd)
+            flows.path_idx[active] = new
+            flows.cwnd[active] = new_cwnd
+            flows.release(done)
+            self.profiler.lap("step")
+
+            # 5. Log the flows still active after step t
+            log_entry = {
+                'timestep': t,
+                'total_throughput': float(flows.cwnd[flows.active].sum(dtype=np.float64)),
+            }
+            for key, load in zip(load_keys, loads.tolist()):
+                log_entry[key] = round(load, 2)
+            path_loss = [round(x, 2) for x in loss.tolist()]
+            for key, x in zip(loss_keys, path_loss):
+                log_entry[key] = x
+            log_entry['total_loss'] = round(sum(path_loss), 2)
+            log_entry['active_flows'] = flows.num_active
+            log_entry['arrivals'] = admitted
+            log_entry['rejected'] = arrivals - admitted
+            log_entry['completions'] = len(fct)
+            log_entry['mean_fct'] = round(float(fct.mean()), 2) if len(fct) else None
+            if self.trace == "cwnd":
+                active = flows.active
+                sketch = CwndSketch.from_arrays(flows.cwnd[active], flows.path_idx[active], num_paths)
+                log_entry.update(self._cwnd_columns(sketch, path_ids))
+            self.log_data.append(log_entry)
+            self.profiler.lap("log")
+
+        self.flow_completion_times = np.concatenate(completion_times)
+        print(f"{len(self.flow_completion_times)} flows completed, {flows.num_active} still active.")
+        print("Simulation finished.")
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from .main import create_topology_file
+
+    CONFIG_FILE = "topology.json"
+    create_topology_file(CONFIG_FILE)
+    for strategy in ["min_rtt", "min_load", "blest", "epsilon_greedy"]:
+        sim = ChurnSimulator(CONFIG_FILE, 100, 300, strategy, seed=0)
+        sim.run()
+        fct = sim.flow_completion_times
+        print(f"{strategy}: mean active {np.mean([r['active_flows'] for r in sim.log_data]):.0f}, "
+              f"FCT median {np.median(fct):.0f}, p99 {np.percentile(fct, 99):.0f} steps")
+
+    # Cost per step follows the active flows, not the table capacity
+    for max_flows in (10_000, 1_000_000):
+        sim = ChurnSimulator(CONFIG_FILE, 1000, 200, "min_load", max_flows=max_flows, seed=0)
+        start = time.perf_counter()
+        sim.run()
+        print(f"max_flows={max_flows}: {(time.perf_counter() - start) / 200 * 1000:.2f} ms/step")
+    os.remove(CONFIG_FILE)
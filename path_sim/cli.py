@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+
+# ==============================================================================
+# COMMAND LINE: path-sim run | sweep | replicate | optimize | analyze | plot | bench
+# ==============================================================================
+#
+# Only argparse is imported up front. Each subcommand imports the modules it
+# needs, so `path-sim run` never loads pandas or matplotlib.
+
+# Engines without agent objects: they take only the "cwnd" trace option and
+# have no per-agent decision order for sequential updates
+AGENTLESS_ENGINES = ("sharded", "churn", "fluid")
+
+
+def cmd_run(args):
+    """Simulates one cell and saves its results."""
+    from .main import create_meta_file, create_topology_file
+    from .sweep import build_simulator
+
+    config_file = args.config
+    if config_file is None:
+        config_file = "topology.json"
+        create_topology_file(config_file)
+    agentless = args.engine in AGENTLESS_ENGINES
+    engine_options = {"trace": args.trace} if not agentless or args.trace == "cwnd" else {}
+    if args.sequential_updates:
+        engine_options["sequential_updates"] = True
+    sim = build_simulator(args.engine, config_file, args.agents, args.duration, args.strategy,
+                          seed=args.seed, profile_memory=args.profile_memory, **engine_options)
+    sim.run()
+    output = args.output or f"results_{args.strategy}_{args.agents}_agents.csv"
+    sim.save_results(output_filepath=output, db=args.db)
+    cost = sim.run_cost()
+    # Metadata as a sweep writes it, so `path-sim analyze` finds the run
+    create_meta_file(output, args.strategy, args.agents, config_file, args.duration, args.experiment,
+                     db=args.db, cost=cost)
+    print(f"{cost['wall_seconds']:.2f} s, {cost['steps_per_second']} steps/s, trace {cost['trace_mb']} MB, "
+          f"peak RSS {cost['peak_rss_mb']} MB"
+          + (f", tracemalloc peak {cost['alloc_peak_mb']} MB" if cost['alloc_peak_mb'] is not None else ""))
+    if args.config is None:
+        os.remove(config_file)
+
+
+def cmd_sweep(args):
+    """Runs one or more declarative sweep specs."""
+    from .sweep import load_spec, run_sweep
+
+    run_sweep([load_spec(path) for path in args.specs], workers=args.workers)
+
+
+def cmd_replicate(args):
+    """Replicates every cell of a spec until its confidence interval is tight."""
+    from .replication import replicate
+    from .sweep import load_spec
+
+    print(replicate(load_spec(args.spec), workers=args.workers).to_string(index=False))
+
+
+def cmd_optimize(args):
+    """Searches a strategy parameter with batched candidate simulations."""
+    import numpy as np
+    from .optimize import optimize_spec
+    from .sweep import load_spec
+
+    best, table = optimize_spec(load_spec(args.spec))
+    print(table.head(10).to_string(index=False))
+    print(f"\nBest: {np.round(np.atleast_1d(best), 4).tolist()}")
+
+
+def cmd_analyze(args):
+    """Summarizes a result folder (results_*.csv + .meta.json) or a results database."""
+    import json
+    import pandas as pd
+    from .metrics import summarize_database, summarize_files
+
+    filters = {"experiment": args.experiment, "strategy": args.strategy,
+               "min_agents": args.min_agents, "max_agents": args.max_agents}
+    if args.results.endswith(".db"):
+        metas, table = summarize_database(args.results, chunksize=args.chunksize, **filters)
+    else:
+        metas, files = [], []
+        for file in sorted(os.listdir(args.results)):
+            csv_path = os.path.join(args.results, file)
+            meta_path = csv_path.replace(".csv", ".meta.json")
+            if not (file.startswith("results_") and file.endswith(".csv") and os.path.exists(meta_path)):
+                continue
+            with open(meta_path) as f:
+                meta = dict(json.load(f), name=file)
+            if ((args.experiment is not None and meta.get("experiment") != args.experiment)
+                    or (args.strategy is not None and meta["strategy"] != args.strategy)
+                    or (args.min_agents is not None and meta["agents"] < args.min_agents)
+                    or (args.max_agents is not None and meta["agents"] > args.max_agents)):
+                continue
+            metas.append(meta)
+            files.append(csv_path)
+        table = summarize_files(files, chunksize=args.chunksize)
+
+    columns = ["name", "experiment", "strategy", "agents"]
+    summary = pd.concat([pd.DataFrame(metas, columns=columns), table.reset_index(drop=True).round(4)], axis=1)
+    print(summary.to_string(index=False))
+    if args.output:
+        summary.to_csv(args.output, index=False)
+
+
+def cmd_plot(args):
+    """Renders the figures of a result folder, skipping unchanged ones."""
+    from .plotting import plan_sweep_figures, render_all
+
+    output_dir = args.output_dir or os.path.join(args.result_dir, "plots")
+    rendered, skipped = render_all(plan_sweep_figures(args.result_dir), output_dir,
+                                   workers=args.workers, max_points=args.max_points, force=args.force)
+    print(f"Rendered {len(rendered)} figures, skipped {len(skipped)} unchanged, into {output_dir}")
+
+
+def cmd_bench(args):
+    """Runs the benchmark suite."""
+    from .bench import run_benchmarks
+
+    run_benchmarks(imports_only=args.imports_only, history_file=args.history)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="path-sim", description="Path-aware network simulator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="simulate one strategy and agent count")
+    run.add_argument("--strategy", required=True)
+    run.add_argument("--agents", type=int, required=True)
+    run.add_argument("--duration", type=int, default=300)
+    run.add_argument("--config", help="topology JSON (default: the built-in three-path topology)")
+    run.add_argument("--engine", default="reference", choices=["reference", "jit", "sharded", "multi", "churn", "fluid"])
+    run.add_argument("--seed", type=int)
+    run.add_argument("--trace", default="agents", choices=["agents", "cwnd", "paths"])
+    run.add_argument("--output", help="result CSV (default: results_<strategy>_<agents>_agents.csv)")
+    run.add_argument("--db", help="store the trace in this results database instead")
+    run.add_argument("--experiment", default="cli", help="experiment name recorded in the run metadata")
+    run.add_argument("--profile-memory", action="store_true", help="record allocations per phase (tracemalloc)")
+    run.add_argument("--sequential-updates", action="store_true",
+                     help="min_load / blest decisions see earlier switches within the step")
+    run.set_defaults(func=cmd_run)
+
+    sweep = commands.add_parser("sweep", help="run sweep specs (JSON or TOML)")
+    sweep.add_argument("specs", nargs="+")
+    sweep.add_argument("--workers", type=int)
+    sweep.set_defaults(func=cmd_sweep)
+
+    replicate = commands.add_parser("replicate", help="add seeds per cell until the CI of a metric is tight")
+    replicate.add_argument("spec", help="sweep spec with a \"replication\" section")
+    replicate.add_argument("--workers", type=int)
+    replicate.set_defaults(func=cmd_replicate)
+
+    optimize = commands.add_parser("optimize", help="search WRR weights, epsilon or the blest RTT factor")
+    optimize.add_argument("spec", help="sweep spec with an \"optimize\" section")
+    optimize.set_defaults(func=cmd_optimize)
+
+    analyze = commands.add_parser("analyze", help="summarize a result folder or results database")
+    analyze.add_argument("results", help="folder of result CSVs, or a .db results database")
+    analyze.add_argument("--experiment")
+    analyze.add_argument("--strategy")
+    analyze.add_argument("--min-agents", type=int)
+    analyze.add_argument("--max-agents", type=int)
+    analyze.add_argument("--chunksize", type=int, default=100_000)
+    analyze.add_argument("--output", help="also write the summary to this CSV")
+    analyze.set_defaults(func=cmd_analyze)
+
+    plot = commands.add_parser("plot", help="render the figures of a result folder")
+    plot.add_argument("result_dir")
+    plot.add_argument("output_dir", nargs="?")
+    plot.add_argument("--workers", type=int)
+    plot.add_argument("--max-points", type=int, default=2000)
+    plot.add_argument("--force", action="store_true")
+    plot.set_defaults(func=cmd_plot)
+
+    bench = commands.add_parser("bench", help="run the benchmark suite")
+    bench.add_argument("--imports-only", action="store_true", help="only measure import times")
+    bench.add_argument("--history", help="append the results to this JSON-lines benchmark history")
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.sequential_updates and args.engine in AGENTLESS_ENGINES:
+        parser.error(f"--sequential-updates needs per-agent decisions; "
+                     f"use --engine reference, jit or multi instead of {args.engine}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
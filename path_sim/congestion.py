@@ -0,0 +1,203 @@
+import numpy as np
+
+from .main import QUEUE_UTILIZATION_CAP
+from .vector_step import aimd
+
+# ==============================================================================
+# CONGESTION CONTROL: vectorized cwnd models for the array engines
+# ==============================================================================
+#
+# A model updates the cwnd of a whole population (or one population group)
+# in a single array pass per step. Per-agent state lives in arrays created by
+# init_state from the initial windows, and is reset for agents that switched
+# path by on_switch. A switch also resets cwnd to 2.0 in every engine, so
+# under strategies that move most agents every step (min_load, round_robin)
+# the models barely get to act; static strategies show them apart.
+
+
+class PathStateArrays:
+    """Array form of main.PathState: per-step, per-path columns the models read.
+
+    Columns share PathState's names and are made read-only, so one table is
+    built per step and shared by every shard and model.
+    """
+    __slots__ = ('load', 'capacity', 'utilization', 'loss', 'congested', 'base_rtt_ms', 'rtt_ms')
+
+    def __init__(self, load, capacity, base_rtt_ms):
+        self.load = load
+        self.capacity = capacity
+        # A zero-capacity path (e.g. a failed link) is infinitely utilized, as in PathState
+        self.utilization = np.divide(load, capacity, out=np.full(load.shape, np.inf), where=capacity != 0)
+        self.congested = load > capacity
+        self.loss = np.where(self.congested, load - capacity, 0.0)
+        self.base_rtt_ms = base_rtt_ms
+        # Same queueing delay as main.effective_rtt, capped the same way
+        utilization = np.minimum(self.utilization, QUEUE_UTILIZATION_CAP)
+        self.rtt_ms = base_rtt_ms * (1 + utilization / (1 - utilization))
+        for column in (self.load, self.capacity, self.utilization, self.loss,
+                       self.congested, self.base_rtt_ms, self.rtt_ms):
+            column.setflags(write=False)
+
+
+class CongestionControl:
+    """Base class of the vectorized congestion-control models."""
+    name = None
+
+    def init_state(self, cwnd):
+        """Per-agent state arrays of this model, for agents starting at the windows `cwnd`."""
+        return {}
+
+    def update(self, cwnd, path_idx, state, t, path_state):
+        """Returns the new cwnd array for the agents in this group."""
+        raise NotImplementedError
+
+    def on_switch(self, state, switched, t, cwnd):
+        """Resets the state of agents that changed path this step; cwnd holds their reset windows."""
+
+
+class AIMD(CongestionControl):
+    """Additive increase, multiplicative decrease, as in Agent.update_cwnd."""
+    name = "aimd"
+
+    def __init__(self, increase=1.0, decrease=0.5, floor=1.0):
+        self.increase = increase
+        self.decrease = decrease
+        self.floor = floor
+
+    def update(self, cwnd, path_idx, state, t, path_state):
+        return aimd(cwnd, path_state.congested[path_idx], self.increase, self.decrease, self.floor)
+
+
+class Cubic(CongestionControl):
+    """CUBIC-like: after a loss, cwnd follows C * (t - epoch - K)^3 + w_max.
+
+    w_max is the window at the last loss and epoch the step it happened, so
+    growth is concave up to the old maximum and convex beyond it. Agents
+    start, and restart after a switch, with w_max at their current window.
+    """
+    name = "cubic"
+
+    def __init__(self, c=0.4, beta=0.7, floor=1.0):
+        self.c = c
+        self.beta = beta
+        self.floor = floor
+
+    def init_state(self, cwnd):
+        return {
+            "w_max": np.array(cwnd, dtype=np.float32),
+            "epoch_start": np.zeros(len(cwnd), dtype=np.int32),
+        }
+
+    def update(self, cwnd, path_idx, state, t, path_state):
+        congested = path_state.congested[path_idx]
+        state["w_max"] = np.where(congested, cwnd, state["w_max"])
+        state["epoch_start"] = np.where(congested, t, state["epoch_start"]).astype(np.int32)
+        k = np.cbrt(state["w_max"] * (1 - self.beta) / self.c)
+        target = self.c * (t - state["epoch_start"] - k) ** 3 + state["w_max"]
+        cwnd = np.where(congested, cwnd * self.beta, np.maximum(target, cwnd)).astype(cwnd.dtype)
+        return np.maximum(cwnd, self.floor, out=cwnd)
+
+    def on_switch(self, state, switched, t, cwnd):
+        state["w_max"][switched] = cwnd[switched]
+        state["epoch_start"][switched] = t
+
+
+class BbrLike(CongestionControl):
+    """BBR-like: paces at gain x the max-filtered delivered rate.
+
+    The delivered rate is cwnd scaled by the path's delivery ratio
+    (capacity / load when overloaded). Agents start with a 2.89 gain until
+    the estimate stops growing by 25%, then cycle through the probe gains.
+    The rate is bounded by cwnd_gain x capacity x base RTT / RTT, the rate
+    form of a window of cwnd_gain bandwidth-delay products.
+    """
+    name = "bbr"
+    PROBE_GAINS = np.array([1.25, 0.75, 1, 1, 1, 1, 1, 1], dtype=np.float32)
+
+    def __init__(self, startup_gain=2.89, cwnd_gain=2.0, bw_decay=0.9, floor=1.0):
+        self.startup_gain = startup_gain
+        self.cwnd_gain = cwnd_gain
+        self.bw_decay = bw_decay
+        self.floor = floor
+
+    def init_state(self, cwnd):
+        num_agents = len(cwnd)
+        return {
+            "btl_bw": np.zeros(num_agents, dtype=np.float32),
+            "startup": np.ones(num_agents, dtype=bool),
+            # Spread the probe phases so agents do not probe in lockstep
+            "phase": (np.arange(num_agents) % len(self.PROBE_GAINS)).astype(np.int8),
+        }
+
+    def update(self, cwnd, path_idx, state, t, path_state):
+        ratio = np.minimum(1.0, path_state.capacity / np.maximum(path_state.load, 1e-9))
+        delivered = cwnd * ratio[path_idx].astype(cwnd.dtype)
+        state["startup"] &= delivered > state["btl_bw"] * 1.25
+        state["btl_bw"] = np.maximum(delivered, state["btl_bw"] * self.bw_decay)
+        gain = np.where(state["startup"], self.startup_gain,
+                        self.PROBE_GAINS[(t % len(self.PROBE_GAINS) + state["phase"]) % len(self.PROBE_GAINS)])
+        rate_cap = self.cwnd_gain * path_state.capacity * path_state.base_rtt_ms / path_state.rtt_ms
+        cwnd = np.minimum(gain * state["btl_bw"], rate_cap[path_idx]).astype(cwnd.dtype)
+        return np.maximum(cwnd, self.floor, out=cwnd)
+
+    def on_switch(self, state, switched, t, cwnd):
+        state["btl_bw"][switched] = 0.0
+        state["startup"][switched] = True
+
+
+class DelayBased(CongestionControl):
+    """Vegas-like: keeps between alpha and beta packets queued.
+
+    diff = cwnd * (1 - min_rtt / rtt) estimates this agent's queued data.
+    Below alpha the window grows by one, above beta it shrinks by one, and a
+    loss still halves it.
+    """
+    name = "delay"
+
+    def __init__(self, alpha=2.0, beta=4.0, floor=1.0):
+        self.alpha = alpha
+        self.beta = beta
+        self.floor = floor
+
+    def init_state(self, cwnd):
+        return {"min_rtt": np.full(len(cwnd), np.inf, dtype=np.float32)}
+
+    def update(self, cwnd, path_idx, state, t, path_state):
+        rtt = path_state.rtt_ms[path_idx].astype(np.float32)
+        state["min_rtt"] = np.minimum(state["min_rtt"], rtt)
+        diff = cwnd * (1 - state["min_rtt"] / rtt)
+        step = np.where(diff < self.alpha, 1.0, np.where(diff > self.beta, -1.0, 0.0))
+        cwnd = np.where(path_state.congested[path_idx], cwnd * 0.5, cwnd + step).astype(cwnd.dtype)
+        return np.maximum(cwnd, self.floor, out=cwnd)
+
+    def on_switch(self, state, switched, t, cwnd):
+        state["min_rtt"][switched] = np.inf
+
+
+CONGESTION_CONTROLS = {cls.name: cls for cls in (AIMD, Cubic, BbrLike, DelayBased)}
+
+
+def make_congestion_control(model):
+    """Accepts a model instance or a registered name ("aimd", "cubic", "bbr", "delay")."""
+    if isinstance(model, CongestionControl):
+        return model
+    if model not in CONGESTION_CONTROLS:
+        raise ValueError(f"Unknown congestion control: {model}")
+    return CONGESTION_CONTROLS[model]()
+
+
+def population_groups(num_agents, congestion_control):
+    """Splits agent ids into contiguous (start, end, model) groups.
+
+    congestion_control is one model (or name) for the whole population, or a
+    list of (fraction, model) pairs whose fractions sum to 1.
+    """
+    if not isinstance(congestion_control, (list, tuple)):
+        return [(0, num_agents, make_congestion_control(congestion_control))]
+    groups, start, cumulative = [], 0, 0.0
+    for i, (fraction, model) in enumerate(congestion_control):
+        cumulative += fraction
+        end = num_agents if i == len(congestion_control) - 1 else round(cumulative * num_agents)
+        groups.append((start, end, make_congestion_control(model)))
+        start = end
+    return groups
@@ -0,0 +1,81 @@
+import json
+from collections import defaultdict
+
+from .main import Path
+
+# ==============================================================================
+# TOPOLOGY EVENTS: scheduled link failures and path changes during a run
+# ==============================================================================
+#
+# Events come from an "events" list in the topology config, or from a
+# separate file / list passed to the Simulator. Each event applies at the
+# start of step t, before loads are computed:
+#
+#   {"t": 100, "path": "path_2", "capacity_mbps": 100}                  (update)
+#   {"t": 120, "path": "path_3", "base_rtt_ms": 80, "add_attributes": ["high-cost"]}
+#   {"t": 150, "action": "remove", "path": "path_1"}                    (link failure)
+#   {"t": 200, "action": "add", "path": {"id": "path_4", "capacity_mbps": 150, "base_rtt_ms": 60}}
+#
+# Every change bumps Topology.version, which drops memoized strategy decisions.
+
+EVENT_ACTIONS = ("update", "add", "remove")
+
+
+def load_events(events):
+    """Accepts a list of events, or a JSON file holding a list or {"events": [...]}."""
+    if events is None:
+        return []
+    if isinstance(events, str):
+        with open(events) as f:
+            events = json.load(f)
+        if isinstance(events, dict):
+            events = events.get("events", [])
+    return list(events)
+
+
+class EventSchedule:
+    """Topology events grouped by the step they apply at."""
+
+    def __init__(self, events):
+        self.by_step = defaultdict(list)
+        for event in sorted(events, key=lambda e: e["t"]):
+            action = event.get("action", "update")
+            if action not in EVENT_ACTIONS:
+                raise ValueError(f"Unknown topology event action: {action}")
+            self.by_step[event["t"]].append(event)
+
+    def path_ids(self, topology):
+        """Ids of every path that exists at some point of the run, in first-seen order."""
+        ids = [path.id for path in topology.paths]
+        for t in sorted(self.by_step):
+            for event in self.by_step[t]:
+                if event.get("action") == "add" and event["path"]["id"] not in ids:
+                    ids.append(event["path"]["id"])
+        return ids
+
+    def apply(self, t, topology):
+        """Applies the events of step t; returns the Paths removed by them."""
+        removed = []
+        for event in self.by_step.get(t, ()):
+            action = event.get("action", "update")
+            if action == "add":
+                data = event["path"]
+                topology.add_path(Path(
+                    path_id=data["id"],
+                    capacity_mbps=data["capacity_mbps"],
+                    base_rtt_ms=data["base_rtt_ms"],
+                    attributes=data.get("attributes", []),
+                    weight=data.get("weight", 1)
+                ))
+            elif action == "remove":
+                removed.append(topology.remove_path(event["path"]))
+            else:
+                topology.update_path(
+                    event["path"],
+                    capacity_mbps=event.get("capacity_mbps"),
+                    base_rtt_ms=event.get("base_rtt_ms"),
+                    weight=event.get("weight"),
+                    add_attributes=event.get("add_attributes", ()),
+                    remove_attributes=event.get("remove_attributes", ())
+                )
+        return removed
@@ -0,0 +1,225 @@
+import random
+
+import numpy as np
+
+from .main import Simulator, reset_strategy_state
+from .strategy_codes import SHARD_STRATEGIES, SHARD_STRATEGY_NAMES, EPSILON_GREEDY
+from .sketch import CwndSketch
+from .vector_step import PathTables, StrategyState, choose_paths, static_choice, step_target
+
+# ==============================================================================
+# FLUID ENGINE: the population as a cwnd histogram per path
+# ==============================================================================
+#
+# Instead of agents, FluidSimulator keeps mass[p, k]: how many agents are on
+# path p with cwnd k x bin_width. Every step applies Agent.update_cwnd to
+# whole rows (halve on a congested path, +1 otherwise, never below 1) and
+# moves population fractions between paths as the strategy would, resetting
+# the cwnd of switching mass to 2.0. A step costs O(paths x bins) whatever
+# num_agents is, so 10^7+ agents cost the same as 100.
+#
+# All agents of a path see the same congestion, so for deterministic
+# strategies the fluid follows the agent-based dynamics exactly; the only
+# approximations are the cwnd grid (halving an odd bin splits its mass
+# between the two neighbouring bins, which preserves the mean) and using the
+# expected initial state (num_agents / paths per path, cwnd uniform on
+# [1, 5]) instead of one random draw. Round robin moves every agent in step
+# (their counters all start at 0), and epsilon-greedy sends epsilon / paths
+# of every path's mass to each path and the rest to the min-RTT path.
+# attribute_aware without a compliant path spreads every path's mass evenly.
+
+
+class FluidSimulator(Simulator):
+    """Mean-field simulator: per-path cwnd histograms instead of agents.
+
+    Supports the strategies of the sharded engine. The log has the
+    trace="paths" layout of the reference engine; trace="cwnd" adds the cwnd
+    summaries of the histograms, each bin weighted by its mass. cwnd above
+    max_cwnd is clipped into the top bin.
+    """
+    ENGINE = "fluid"
+    STRATEGIES = SHARD_STRATEGY_NAMES
+
+    def __init__(self, config_filepath, num_agents, duration, strategy_name, bin_width=0.5,
+                 max_cwnd=512.0, epsilon=0.1, telemetry=None, memory_budget_mb=None, trace="paths",
+                 profile_memory=False, congestion_control="aimd"):
+        if trace == "agents":
+            raise ValueError("The fluid engine has no agents to log")
+        if congestion_control != "aimd":
+            raise ValueError("The fluid engine only models AIMD congestion control")
+        self.step_bins = round(1.0 / bin_width)
+        if not np.isclose(self.step_bins * bin_width, 1.0):
+            raise ValueError("bin_width must divide 1 (the additive increase)")
+        self.bin_width = bin_width
+        self.cwnd_values = np.arange(round(max_cwnd / bin_width) + 1) * bin_width
+        self.epsilon = epsilon
+        super().__init__(config_filepath, num_agents, duration, strategy_name, telemetry=telemetry,
+                         trace=trace, memory_budget_mb=memory_budget_mb, profile_memory=profile_memory)
+        if self.events is not None:
+            raise ValueError("Topology events are not supported by the fluid engine")
+
+    def _create_agents(self):
+        """Builds the expected initial histogram; returns an empty Agent list."""
+        num_paths = len(self.topology.paths)
+        # Share of the uniform [1, 5] initial cwnd falling in each bin's cell
+        half = self.bin_width / 2
+        low = np.clip(self.cwnd_values - half, 1.0, 5.0)
+        high = np.clip(self.cwnd_values + half, 1.0, 5.0)
+        share = (high - low) / 4.0
+        self.mass = np.tile(share * (self.num_agents / num_paths), (num_paths, 1))
+        return []
+
+    def _bin(self, cwnd):
+        return round(cwnd / self.bin_width)
+
+    def _halve(self, mass):
+        """cwnd *= 0.5, then max(1.0, cwnd), on every row."""
+        result = np.zeros_like(mass)
+        even, odd = mass[:, 0::2], mass[:, 1::2]
+        result[:, :even.shape[1]] += even
+        # An odd bin lands halfway between two bins: split its mass evenly
+        result[:, :odd.shape[1]] += 0.5 * odd
+        result[:, 1:odd.shape[1] + 1] += 0.5 * odd
+        floor = self._bin(1.0)
+        result[:, floor] += result[:, :floor].sum(axis=1)
+        result[:, :floor] = 0.0
+        return result
+
+    def _increase(self, mass):
+        """cwnd += 1.0 on every row, clipping at the top bin."""
+        result = np.zeros_like(mass)
+        shift = self.step_bins
+        result[:, shift:] = mass[:, :-shift]
+        result[:, -1] += mass[:, -shift:].sum(axis=1)
+        return result
+
+    def run(self):
+        """The main loop over path histograms."""
+        print(f"\nStarting fluid simulation of {self.num_agents} agents for {self.duration} steps "
+              f"({len(self.cwnd_values)} cwnd bins)...")
+        paths = self.topology.paths
+        num_paths = len(paths)
+        tables = PathTables(self.topology)
+        capacity = tables.capacity
+        strategy = SHARD_STRATEGIES[self.strategy_func]
+        static = static_choice(strategy, self.strategy_func, self.topology)
+        reset_bin = self._bin(2.0)
+        # Every agent's round-robin state is identical, so one state drives them all
+        shared_state = StrategyState(1)
+        path_ids = [path.id for path in paths]
+        load_keys = [f'{path_id}_load' for path_id in path_ids]
+        loss_keys = [f'{path_id}_loss' for path_id in path_ids]
+        # Every (path, bin) cell as one weighted sample of the cwnd sketch
+        cell_cwnd = np.tile(self.cwnd_values, num_paths)
+        cell_path = np.repeat(np.arange(num_paths), len(self.cwnd_values))
+        self.profiler.lap("setup")
+
+        for t in range(self.duration):
+            # 1. Path loads: total cwnd mass per path
+            loads = self.mass @ self.cwnd_values
+
+            # 2. Congestion and loss per path. Fractional mass carries rounding error, and a
+            # load that sits exactly at capacity (every agent at cwnd 1) must not count as congested
+            congested = loads > capacity * (1 + 1e-9)
+            loss = np.where(congested, loads - capacity, 0.0)
+
+            # 3. AIMD on whole rows, then the strategy's transition between paths
+            mass = np.where(congested[:, None], self._halve(self.mass), self._increase(self.mass))
+            target = step_target(strategy, loads, tables.blest_mask, static)
+            if strategy != EPSILON_GREEDY and target is not None:
+                # Epsilon-greedy keeps the min-RTT target; its exploration is spread below
+                target = int(choose_paths(strategy, shared_state, slice(None), target, tables.weights, num_paths)[0])
+            # transition[p, q]: share of path p's mass choosing path q
+            transition = np.zeros((num_paths, num_paths))
+            if target is None:
+                # No shared choice: every agent draws a path uniformly at random
+                transition += 1.0 / num_paths
+            else:
+                transition[:, target] = 1.0
+            if strategy == EPSILON_GREEDY:
+                transition = (1 - self.epsilon) * transition + self.epsilon / num_paths
+
+            stay = np.diag(transition).copy()
+            moved = mass.sum(axis=1) @ (transition - np.diag(stay))
+            mass *= stay[:, None]
+            mass[:, reset_bin] += moved
+            self.mass = mass
+            self.profiler.lap("step")
+
+            # 4. Log aggregate state for the current time step `t`
+            log_entry = {
+                'timestep': t,
+                'total_throughput': float(mass.sum(axis=0) @ self.cwnd_values)
+            }
+            for key, load in zip(load_keys, loads.tolist()):
+                log_entry[key] = round(load, 2)
+            path_loss = [round(x, 2) for x in loss.tolist()]
+            for key, x in zip(loss_keys, path_loss):
+                log_entry[key] = x
+            log_entry['total_loss'] = round(sum(path_loss), 2)
+            if self.trace == "cwnd":
+                sketch = CwndSketch.from_arrays(cell_cwnd, cell_path, num_paths, weights=mass.ravel())
+                log_entry.update(self._cwnd_columns(sketch, path_ids))
+            self.log_data.append(log_entry)
+            self.profiler.lap("log")
+
+        print("Simulation finished.")
+
+
+def validate(config_filepath, agent_counts, duration, strategies, seeds=5, metrics=("throughput", "loss", "oscillation")):
+    """Compares fluid metrics with the mean over seeds of agent-based runs.
+
+    Returns one row per (strategy, agents, metric) with both values and the
+    relative error of the fluid value.
+    """
+    import io
+    from contextlib import redirect_stdout
+    import pandas as pd
+    from .metrics import run_metrics
+
+    rows = []
+    for strategy in strategies:
+        for num_agents in agent_counts:
+            with redirect_stdout(io.StringIO()):
+                fluid = FluidSimulator(config_filepath, num_agents, duration, strategy)
+                fluid.run()
+                reference = []
+                for seed in range(seeds):
+                    reset_strategy_state()
+                    random.seed(seed)
+                    sim = Simulator(config_filepath, num_agents, duration, strategy, trace="paths")
+                    sim.run()
+                    reference.append(run_metrics(pd.DataFrame(sim.log_data), list(metrics)))
+            fluid_values = run_metrics(pd.DataFrame(fluid.log_data), list(metrics))
+            for name in metrics:
+                expected = float(np.mean([values[name] for values in reference]))
+                rows.append({
+                    "strategy": strategy,
+                    "agents": num_agents,
+                    "metric": name,
+                    "agent_based": round(expected, 4),
+                    "fluid": round(fluid_values[name], 4),
+                    "relative_error": round(abs(fluid_values[name] - expected) / abs(expected), 4) if expected else None,
+                })
+    reset_strategy_state()
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from .main import create_topology_file
+
+    CONFIG_FILE = "topology.json"
+    create_topology_file(CONFIG_FILE)
+    STRATEGIES = ["min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin",
+                  "epsilon_greedy", "blest"]
+    print(validate(CONFIG_FILE, [100, 500, 2000], 300, STRATEGIES).to_string(index=False))
+
+    # Cost per step does not depend on the population size
+    for num_agents in (10**3, 10**7):
+        sim = FluidSimulator(CONFIG_FILE, num_agents, 300, "min_load")
+        start = time.perf_counter()
+        sim.run()
+        print(f"{num_agents} agents: {(time.perf_counter() - start) / 300 * 1000:.2f} ms/step")
+    os.remove(CONFIG_FILE)
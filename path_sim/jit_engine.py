@@ -0,0 +1,269 @@
+import random
+
+import numpy as np
+
+from . import main
+from .memory import CWND_CHUNK_AGENT_STEPS, path_index_dtype
+from .main import Simulator, select_round_robin, select_weighted_round_robin
+from .strategy_codes import KERNEL_STRATEGIES, STATIC_CHOICE, MIN_LOAD, ROUND_ROBIN, WEIGHTED_ROUND_ROBIN
+from .vector_step import PathTables, static_choice
+
+# ==============================================================================
+# JIT BACKEND: the whole per-step update compiled into one native loop
+# ==============================================================================
+#
+# The kernel dispatches on the codes of strategy_codes.py and reads the path
+# tables of vector_step.py; it applies the array engines' rules one agent at
+# a time, in agent order, so it reproduces the reference engine exactly.
+# Numba is imported (and the kernel compiled) only when a JitSimulator first
+# runs it, so importing this module stays cheap.
+
+
+def _step_loop(duration, strategy, path_idx, cwnd, capacity, static_choice,
+               blest_mask, weights, rr_counter, wrr_index, wrr_counter, record_agents,
+               out_path, out_cwnd, out_loads, out_counts, out_loss, out_throughput):
+    """Advances all agents for `duration` steps, mirroring Simulator.run.
+
+    Per-agent rows are only kept for every step when record_agents is set;
+    otherwise row 0 is overwritten each step.
+    """
+    num_agents = path_idx.shape[0]
+    num_paths = capacity.shape[0]
+    loads = np.zeros(num_paths)
+
+    for t in range(duration):
+        # 1. Path loads, accumulated in agent order like the reference engine
+        for p in range(num_paths):
+            loads[p] = 0.0
+            out_counts[t, p] = 0
+        for i in range(num_agents):
+            loads[path_idx[i]] += cwnd[i]
+            out_counts[t, path_idx[i]] += 1
+
+        # 2. Congestion and loss per path
+        for p in range(num_paths):
+            out_loads[t, p] = loads[p]
+            if loads[p] > capacity[p]:
+                out_loss[t, p] = loads[p] - capacity[p]
+            else:
+                out_loss[t, p] = 0.0
+
+        # Per-step argmin used by min_load and blest (first minimum wins)
+        min_load_idx = 0
+        for p in range(1, num_paths):
+            if loads[p] < loads[min_load_idx]:
+                min_load_idx = p
+        blest_idx = -1
+        for p in range(num_paths):
+            if blest_mask[p] and (blest_idx < 0 or loads[p] < loads[blest_idx]):
+                blest_idx = p
+
+        # 3. AIMD update, strategy decision and switch reset
+        row = t if record_agents else 0
+        throughput = 0.0
+        for i in range(num_agents):
+            current = path_idx[i]
+            if out_loss[t, current] > 0.0:
+                cwnd[i] *= 0.5
+            else:
+                cwnd[i] += 1.0
+            if cwnd[i] < 1.0:
+                cwnd[i] = 1.0
+
+            if strategy == STATIC_CHOICE:
+                new = static_choice
+            elif strategy == MIN_LOAD:
+                new = min_load_idx
+            elif strategy == ROUND_ROBIN:
+                new = rr_counter[i] % num_paths
+                rr_counter[i] += 1
+            elif strategy == WEIGHTED_ROUND_ROBIN:
+                if wrr_counter[i] < weights[wrr_index[i]]:
+                    wrr_counter[i] += 1
+                else:
+                    wrr_index[i] = (wrr_index[i] + 1) % num_paths
+                    wrr_counter[i] = 1
+                new = wrr_index[i]
+            else:
+                new = blest_idx
+
+            if new != current:
+                cwnd[i] = 2.0
+            path_idx[i] = new
+            out_path[row, i] = new
+            out_cwnd[row, i] = cwnd[i]
+            throughput += cwnd[i]
+        out_throughput[t] = throughput
+
+
+_compiled_step_loop = None
+
+
+def compiled_step_loop():
+    """The Numba-compiled _step_loop, or None when Numba is not installed."""
+    global _compiled_step_loop
+    if _compiled_step_loop is None:
+        try:
+            from numba import njit
+        except ImportError:
+            return None
+        _compiled_step_loop = njit(cache=True)(_step_loop)
+    return _compiled_step_loop
+
+
+class JitSimulator(Simulator):
+    """Simulator whose step loop runs as a Numba-compiled kernel when available.
+
+    Falls back to the pure-Python Simulator.run when Numba is not installed,
+    the strategy is not supported by the kernel, agents draw random paths
+    (attribute_aware without a compliant path), a congestion-control model
+    other than AIMD is selected, or a re-evaluation schedule or topology
+    events are set. Produces the same log_data as the reference
+    engine for the same random seed.
+    """
+    ENGINE = "jit"
+
+    def kernel_available(self):
+        """True when this run will execute on the compiled kernel."""
+        if compiled_step_loop() is None or self.strategy_func not in KERNEL_STRATEGIES:
+            return False
+        strategy = KERNEL_STRATEGIES[self.strategy_func]
+        return (self.reevaluation is None and self.events is None and self.cc_segments is None
+                and static_choice(strategy, self.strategy_func, self.topology) is not None)
+
+    def run(self):
+        """Runs the compiled kernel, or the reference loop as a fallback."""
+        if not self.kernel_available():
+            return super().run()
+
+        print(f"\nStarting simulation with {self.num_agents} agents for {self.duration} steps (numba)...")
+        self.profiler.lap("setup")
+        paths = self.topology.paths
+        index_of = {path.id: i for i, path in enumerate(paths)}
+        n, num_paths = len(self.agents), len(paths)
+
+        path_idx = np.array([index_of[a.current_path.id] for a in self.agents], dtype=np.int64)
+        cwnd = np.array([a.cwnd for a in self.agents], dtype=np.float64)
+        tables = PathTables(self.topology)
+        strategy = KERNEL_STRATEGIES[self.strategy_func]
+        # Static strategies are resolved once, exactly as the Python strategy would
+        static = static_choice(strategy, self.strategy_func, self.topology)
+
+        # Round-robin state lives in module-level dicts shared across runs
+        rr_counter = np.array([main.round_robin_counter.get(a.id, 0) for a in self.agents], dtype=np.int64)
+        wrr = [main.wrr_state[a.id] for a in self.agents] if self.strategy_func is select_weighted_round_robin else []
+        wrr_index = np.array([s['index'] for s in wrr] or [0] * n, dtype=np.int64)
+        wrr_counter = np.array([s['counter'] for s in wrr] or [0] * n, dtype=np.float64)
+
+        # trace="cwnd" records agents too, a chunk of steps at a time, and keeps only their sketches
+        record_agents = self.trace != "paths"
+        chunk = max(1, CWND_CHUNK_AGENT_STEPS // max(n, 1) if self.trace == "cwnd" else self.duration)
+        rows = min(chunk, self.duration) if record_agents else 1
+        out_path = np.empty((rows, n), dtype=path_index_dtype(num_paths))
+        out_cwnd = np.empty((rows, n), dtype=np.float64)
+        out_loads = np.empty((self.duration, num_paths), dtype=np.float64)
+        out_counts = np.empty((self.duration, num_paths), dtype=np.int64)
+        out_loss = np.empty((self.duration, num_paths), dtype=np.float64)
+        out_throughput = np.empty(self.duration, dtype=np.float64)
+        cwnd_columns = []
+
+        for start in range(0, self.duration, chunk):
+            stop = min(start + chunk, self.duration)
+            compiled_step_loop()(
+                stop - start, strategy, path_idx, cwnd, tables.capacity,
+                static, tables.blest_mask, tables.weights, rr_counter, wrr_index, wrr_counter, record_agents,
+                out_path, out_cwnd, out_loads[start:stop], out_counts[start:stop], out_loss[start:stop],
+                out_throughput[start:stop]
+            )
+            if self.trace == "cwnd":
+                from .sketch import CwndSketch
+                path_ids = [p.id for p in paths]
+                for row in range(stop - start):
+                    sketch = CwndSketch.from_arrays(out_cwnd[row], out_path[row], num_paths)
+                    cwnd_columns.append(self._cwnd_columns(sketch, path_ids))
+        self.profiler.lap("step")
+
+        # Write the final state back so the Agent objects stay authoritative
+        for i, agent in enumerate(self.agents):
+            agent.current_path = paths[path_idx[i]]
+            agent.cwnd = float(cwnd[i])
+            if self.strategy_func is select_round_robin:
+                main.round_robin_counter[agent.id] = int(rr_counter[i])
+            elif self.strategy_func is select_weighted_round_robin:
+                wrr[i]['index'] = int(wrr_index[i])
+                wrr[i]['counter'] = int(wrr_counter[i])
+
+        self._build_log(paths, out_path, out_cwnd, out_loads, out_counts, out_loss, out_throughput, cwnd_columns)
+        self.profiler.lap("log")
+        print("Simulation finished.")
+
+    def _build_log(self, paths, out_path, out_cwnd, out_loads, out_counts, out_loss, out_throughput,
+                   cwnd_columns=()):
+        """Converts the kernel output arrays (and trace="cwnd" summaries) into the reference log_data rows."""
+        path_ids = [p.id for p in paths]
+        agent_keys = [(f'agent_{agent.id}_path', f'agent_{agent.id}_cwnd') for agent in self.agents]
+        load_keys = [f'{path_id}_load' for path_id in path_ids]
+        loss_keys = [f'{path_id}_loss' for path_id in path_ids]
+        for t in range(self.duration):
+            if self.trace == "agents":
+                # Python's sum() keeps the throughput bit-identical to the reference
+                cwnds = out_cwnd[t].tolist()
+                log_entry = {'timestep': t, 'total_throughput': sum(cwnds)}
+                for (path_key, cwnd_key), p, c in zip(agent_keys, out_path[t].tolist(), cwnds):
+                    log_entry[path_key] = path_ids[p]
+                    log_entry[cwnd_key] = round(c, 2)
+            else:
+                log_entry = {'timestep': t, 'total_throughput': float(out_throughput[t])}
+            # Empty paths keep the integer 0 the reference engine starts from
+            counts = out_counts[t].tolist()
+            for key, load, count in zip(load_keys, out_loads[t].tolist(), counts):
+                log_entry[key] = round(load, 2) if count else 0
+            path_loss = [round(loss, 2) for loss in out_loss[t].tolist()]
+            for key, loss in zip(loss_keys, path_loss):
+                log_entry[key] = loss
+            log_entry['total_loss'] = round(sum(path_loss), 2)
+            if cwnd_columns:
+                log_entry.update(cwnd_columns[t])
+            self.log_data.append(log_entry)
+
+            # The kernel has finished, so frames are replayed after the fact
+            if self.telemetry is not None:
+                self._publish_step(
+                    t, dict(zip(path_ids, out_loads[t].tolist())), dict(zip(path_ids, path_loss)),
+                    {path_id for path_id, loss in zip(path_ids, out_loss[t].tolist()) if loss > 0},
+                    log_entry['total_throughput']
+                )
+
+
+def verify_equivalence(config_filepath, num_agents, duration, strategy_name, seed=0):
+    """Runs the reference and JIT engines from the same seed and compares their logs."""
+    logs = []
+    for engine in (Simulator, JitSimulator):
+        main.reset_strategy_state()
+        random.seed(seed)
+        sim = engine(config_filepath, num_agents, duration, strategy_name)
+        sim.run()
+        logs.append(sim.log_data)
+    main.reset_strategy_state()
+    return logs[0] == logs[1]
+
+
+if __name__ == "__main__":
+    import os
+    from .main import create_topology_file
+
+    CONFIG_FILE = "topology.json"
+    STRATEGIES = ["min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin", "epsilon_greedy", "blest"]
+
+    create_topology_file(CONFIG_FILE)
+    if compiled_step_loop() is None:
+        print("Numba is not installed; JitSimulator falls back to the Python engine.")
+
+    results = {}
+    for strategy in STRATEGIES:
+        for num_agents in [10, 100, 500]:
+            results[(strategy, num_agents)] = verify_equivalence(CONFIG_FILE, num_agents, 300, strategy)
+
+    os.remove(CONFIG_FILE)
+    for (strategy, num_agents), ok in results.items():
+        print(f"{strategy} with {num_agents} agents: {'OK' if ok else 'MISMATCH'}")
@@ -0,0 +1,124 @@
+import os
+import sys
+
+import pandas as pd
+
+from .main import create_topology_file
+from .metrics import run_metrics
+from .stats import mean_confidence_interval
+from .sweep import load_spec, build_simulator
+
+# ==============================================================================
+# ADAPTIVE KNEE SEARCH: where does a metric take off as agents are added?
+# ==============================================================================
+#
+# Configured by a "knee" section in a sweep spec:
+#
+#   "knee": {"metric": "loss", "threshold": 1.0, "min_agents": 1,
+#            "max_agents": 1000, "tolerance": 5, "seeds": 5,
+#            "output_file": "results/knee_loss.csv"}
+
+
+# metric name (see metrics.py) -> direction that counts as crossing the threshold
+METRICS = {
+    "loss": "above",
+    "oscillation": "above",
+    "fairness": "below",
+}
+
+
+class KneeSearch:
+    """Bisects agent count for the point where a metric crosses a threshold.
+
+    Each seed is searched independently, so the spread of the per-seed knees
+    gives the confidence interval. Assumes the metric crosses the threshold
+    once within [min_agents, max_agents]. Evaluations are cached, so no
+    (strategy, agents, seed) cell is simulated twice.
+    """
+    def __init__(self, spec, metric, threshold, min_agents=1, max_agents=1000, tolerance=5, seeds=5):
+        self.spec = spec
+        self.direction = METRICS[metric]
+        self.metric = metric
+        self.threshold = threshold
+        self.min_agents = min_agents
+        self.max_agents = max_agents
+        self.tolerance = tolerance
+        self.seeds = list(range(seeds))
+        self.config_file = os.path.join(spec["base_dir"], spec["topology"]["file"])
+        self.cache = {}
+
+    def evaluate(self, strategy, num_agents, seed):
+        """Metric value of one simulated cell."""
+        key = (strategy, num_agents, seed)
+        if key not in self.cache:
+            sim = build_simulator(
+                self.spec.get("engine", "reference"), self.config_file, num_agents,
+                self.spec["duration"], strategy, seed=seed, **self.spec.get("engine_options", {})
+            )
+            sim.run()
+            self.cache[key] = run_metrics(pd.DataFrame(sim.log_data), [self.metric])[self.metric]
+        return self.cache[key]
+
+    def crosses(self, strategy, num_agents, seed):
+        value = self.evaluate(strategy, num_agents, seed)
+        return value > self.threshold if self.direction == "above" else value < self.threshold
+
+    def knee_for_seed(self, strategy, seed):
+        """Smallest agent count (within tolerance) that crosses, or None if none does."""
+        low, high = self.min_agents, self.max_agents
+        if self.crosses(strategy, low, seed):
+            return low
+        if not self.crosses(strategy, high, seed):
+            return None
+        while high - low > self.tolerance:
+            mid = (low + high) // 2
+            if self.crosses(strategy, mid, seed):
+                high = mid
+            else:
+                low = mid
+        return high
+
+    def search(self, strategy):
+        """Knee of one strategy with its 95% confidence interval across seeds."""
+        before = len(self.cache)
+        knees = [self.knee_for_seed(strategy, seed) for seed in self.seeds]
+        found = [k for k in knees if k is not None]
+        mean, half_width = mean_confidence_interval(found) if found else (None, None)
+        return {
+            "strategy": strategy,
+            "metric": self.metric,
+            "threshold": self.threshold,
+            "knee_agents": None if mean is None else round(mean, 1),
+            "ci95_low": None if mean is None else round(mean - half_width, 1),
+            "ci95_high": None if mean is None else round(mean + half_width, 1),
+            "seeds_crossed": len(found),
+            "seeds": len(knees),
+            "simulations": len(self.cache) - before,
+        }
+
+
+def search_knees(spec):
+    """Runs the knee search of a spec for all its strategies."""
+    options = dict(spec["knee"])
+    output_file = options.pop("output_file", None)
+    search = KneeSearch(spec, **options)
+
+    create_topology_file(search.config_file, paths=spec["topology"]["paths"])
+    try:
+        rows = [search.search(strategy) for strategy in spec["strategies"]]
+    finally:
+        os.remove(search.config_file)
+
+    summary = pd.DataFrame(rows)
+    if output_file:
+        output_file = os.path.join(spec["base_dir"], output_file)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        summary.to_csv(output_file, index=False)
+    return summary
+
+
+if __name__ == "__main__":
+    # python -m path_sim.knee sweep.json
+    summary = search_knees(load_spec(sys.argv[1]))
+    print("\n=== Congestion knee ===\n")
+    print(summary.to_string(index=False))
@@ -0,0 +1,789 @@
+import json
+import csv
+import os
+import random
+from collections import defaultdict
+from functools import partial
+
+from .profiler import RunProfiler
+
+# ========================
+# ======================================================
+# COMPONENT 1: DATA MODELS (The Static World)
+# ==============================================================================
+
+class Path:
+    """A simple data class to hold the properties of a single network path."""
+    def __init__(self, path_id, capacity_mbps, base_rtt_ms, attributes=None, weight=1):
+        self.id = path_id
+        self.capacity_mbps = capacity_mbps
+        self.base_rtt_ms = base_rtt_ms
+        self.attributes = attributes if attributes is not None else []
+        self.weight = weight 
+
+    def __repr__(self):
+        """Provides a developer-friendly string representation of the object."""
+        return f"Path(id={self.id}, capacity={self.capacity_mbps}Mbps, rtt={self.base_rtt_ms}ms), attributes={self.attributes}, weight={self.weight})"
+
+class Topology:
+    """A container that loads and holds all Path objects from a config file."""
+    def __init__(self, config_filepath):
+        self.paths = []
+        self.paths_by_id = {}
+        # Bumped whenever the paths change, which invalidates memoized decisions
+        self.version = 0
+        # Scheduled topology events from the config (see events.py)
+        self.events = []
+        self._load_from_config(config_filepath)
+
+    def _load_from_config(self, config_filepath):
+        """Loads path definitions from a JSON file."""
+        print(f"Loading topology from: {config_filepath}")
+        try:
+            with open(config_filepath, 'r') as f:
+                data = json.load(f)
+                for path_data in data.get('paths', []):
+                    path = Path(
+                        path_id=path_data['id'],
+                        capacity_mbps=path_data['capacity_mbps'],
+                        base_rtt_ms=path_data['base_rtt_ms'],
+                        attributes=path_data.get('attributes', []),
+                        weight=path_data.get('weight', 1)
+                    )
+                    self.paths.append(path)
+                    self.paths_by_id[path.id] = path
+                self.events = data.get('events', [])
+            print(f"Successfully loaded {len(self.paths)} paths.")
+        except FileNotFoundError:
+            print(f"Error: Topology file not found at {config_filepath}")
+        except json.JSONDecodeError:
+            print(f"Error: Could not decode JSON from {config_filepath}")
+
+    def get_path_by_id(self, path_id):
+        """Utility method to retrieve a path by its ID."""
+        return self.paths_by_id.get(path_id)
+
+    def add_path(self, path):
+        """Adds a path at the end of the path list."""
+        if path.id in self.paths_by_id:
+            raise ValueError(f"Path already exists: {path.id}")
+        self.paths.append(path)
+        self.paths_by_id[path.id] = path
+        self.version += 1
+
+    def remove_path(self, path_id):
+        """Removes a path (e.g. a link failure) and returns it."""
+        path = self.paths_by_id.pop(path_id)
+        self.paths.remove(path)
+        self.version += 1
+        return path
+
+    def update_path(self, path_id, capacity_mbps=None, base_rtt_ms=None, weight=None,
+                    add_attributes=(), remove_attributes=()):
+        """Changes the properties of a path in place."""
+        path = self.paths_by_id[path_id]
+        if capacity_mbps is not None:
+            path.capacity_mbps = capacity_mbps
+        if base_rtt_ms is not None:
+            path.base_rtt_ms = base_rtt_ms
+        if weight is not None:
+            path.weight = weight
+        path.attributes = [a for a in path.attributes if a not in remove_attributes]
+        path.attributes += [a for a in add_attributes if a not in path.attributes]
+        self.version += 1
+
+# Utilization at which the queueing-delay term stops growing, so an overloaded
+# path reads as 20x its base RTT instead of infinity
+QUEUE_UTILIZATION_CAP = 0.95
+
+def effective_rtt(base_rtt_ms, utilization):
+    """Base RTT plus an M/M/1-style queueing delay of utilization / (1 - utilization)."""
+    utilization = min(utilization, QUEUE_UTILIZATION_CAP)
+    return base_rtt_ms * (1 + utilization / (1 - utilization))
+
+class PathState:
+    """Read-only table of path conditions, built once per step by the Simulator.
+
+    Every column is a tuple indexed like topology.paths, so strategies read
+    derived values instead of recomputing them per agent.
+    """
+    __slots__ = ('ids', 'load', 'capacity', 'utilization', 'loss', 'congested', 'base_rtt_ms', 'rtt_ms')
+
+    def __init__(self, topology, path_loads):
+        paths = topology.paths
+        self.ids = tuple(path.id for path in paths)
+        self.load = tuple(path_loads[path.id] for path in paths)
+        self.capacity = tuple(path.capacity_mbps for path in paths)
+        self.utilization = tuple(
+            load / capacity if capacity else float('inf') for load, capacity in zip(self.load, self.capacity)
+        )
+        self.congested = tuple(load > capacity for load, capacity in zip(self.load, self.capacity))
+        self.loss = tuple(
+            load - capacity if congested else 0.0
+            for load, capacity, congested in zip(self.load, self.capacity, self.congested)
+        )
+        self.base_rtt_ms = tuple(path.base_rtt_ms for path in paths)
+        self.rtt_ms = tuple(effective_rtt(rtt, u) for rtt, u in zip(self.base_rtt_ms, self.utilization))
+
+    def argmin(self, column, candidates=None):
+        """Index of the first smallest value of a column, optionally among candidate indexes."""
+        indexes = range(len(column)) if candidates is None else candidates
+        return min(indexes, key=column.__getitem__)
+
+# ==============================================================================
+# COMPONENT 4: ALGORITHMS (Path Selection Logic)
+# ==============================================================================
+#
+# Strategies are called as strategy(agent, topology, path_state), where
+# path_state is the PathState of the current step. Each strategy declares the
+# inputs its decision depends on, so the Simulator can memoize it:
+#
+#   topology     static Topology data only: decided once per topology version
+#   path_state   this step's PathState: decided once per step
+#   agent_state  mutable per-agent state: decided for every agent
+#   random       draws random numbers: decided for every agent
+#
+# A strategy that is shared by all agents except in a random fallback
+# declares its shared part with @shares: that part is memoized, and the
+# strategy itself runs per agent only while the shared part returns None.
+
+DEPENDENCIES = ("topology", "path_state", "agent_state", "random")
+
+def depends_on(*inputs):
+    """Declares the inputs a strategy decision depends on."""
+    unknown = set(inputs) - set(DEPENDENCIES)
+    if unknown:
+        raise ValueError(f"Unknown strategy dependencies: {sorted(unknown)}")
+    def declare(strategy):
+        strategy.depends_on = frozenset(inputs)
+        return strategy
+    return declare
+
+def cache_scope(strategy):
+    """Widest scope a strategy decision can be cached at: "topology", "step" or None."""
+    inputs = getattr(strategy, 'depends_on', None)
+    if inputs is None or inputs & {"agent_state", "random"}:
+        # Undeclared strategies are assumed to depend on everything
+        return None
+    return "step" if "path_state" in inputs else "topology"
+
+def shares(shared):
+    """Declares the memoizable part of a strategy; None from it means "decide per agent"."""
+    def declare(strategy):
+        strategy.shared = shared
+        return strategy
+    return declare
+
+class MemoizedStrategy:
+    """Calls a strategy once per cache scope and hands every agent the same decision.
+
+    The cached decision is dropped when the topology version or, for
+    step-scoped strategies, the PathState object changes. For a strategy
+    with a shared part, that part is cached and a None decision sends every
+    agent to the strategy itself.
+    """
+    __slots__ = ('func', 'shared', 'scope', '_topology', '_version', '_path_state', '_decision')
+
+    def __init__(self, func):
+        self.func = func
+        self.shared = getattr(func, 'shared', None)
+        self.scope = cache_scope(self.shared or func)
+        self._topology = None
+        self._version = None
+        self._path_state = None
+        self._decision = None
+
+    def __call__(self, agent, topology, path_state):
+        if self.scope is None:
+            return self.func(agent, topology, path_state)
+        if (topology is not self._topology or topology.version != self._version
+                or (self.scope == "step" and path_state is not self._path_state)):
+            self._decision = (self.shared or self.func)(agent, topology, path_state)
+            # Holding the PathState keeps its identity from being reused by the next step
+            self._topology, self._version, self._path_state = topology, topology.version, path_state
+        if self._decision is None and self.shared is not None:
+            return self.func(agent, topology, path_state)
+        return self._decision
+
+@depends_on("topology")
+def select_min_rtt(agent, topology, path_state, measured=False):
+    """Selects the path with the lowest base RTT, or lowest effective RTT if measured."""
+    if measured and path_state is not None:
+        return topology.paths[path_state.argmin(path_state.rtt_ms)]
+    return min(topology.paths, key=lambda path: path.base_rtt_ms)
+
+@depends_on("path_state")
+def select_min_load(agent, topology, path_state):
+    """Selects the path with the minimum current load."""
+    if path_state is None:
+        # Fallback if loads aren't available for some reason
+        return random.choice(topology.paths)
+
+    return topology.paths[path_state.argmin(path_state.load)]
+
+@depends_on("topology")
+def attribute_aware_choice(agent, topology, path_state):
+    """The min-RTT path among those that are not 'high-cost', or None if there is none."""
+    compliant_paths = [p for p in topology.paths if "high-cost" not in p.attributes]
+    if not compliant_paths:
+        return None
+    return min(compliant_paths, key=lambda path: path.base_rtt_ms)
+
+@shares(attribute_aware_choice)
+@depends_on("topology", "random")
+def select_attribute_aware(agent, topology, path_state):
+    """Selects based on Min-RTT, but only from paths that are not 'high-cost'."""
+    path = attribute_aware_choice(agent, topology, path_state)
+    if path is None:
+        # Fallback if no paths meet the criteria: each agent draws its own path
+        return random.choice(topology.paths)
+    return path
+
+round_robin_counter = {}
+
+@depends_on("agent_state")
+def select_round_robin(agent, topology, path_state):
+    """A simple round-robin selection strategy."""
+    if agent.id not in round_robin_counter:
+        round_robin_counter[agent.id] = 0
+    
+    # Get the current index for this agent
+    index = round_robin_counter[agent.id] % len(topology.paths)
+    selected_path = topology.paths[index]
+    
+    # Increment the counter for the next call
+    round_robin_counter[agent.id] += 1
+    
+    return selected_path
+
+weighted_path_cycle  = {}
+
+wrr_state = defaultdict(lambda: {'index': 0, 'counter': 0})
+
+@depends_on("agent_state")
+def select_weighted_round_robin(agent, topology, path_state):
+    state = wrr_state[agent.id]
+    counter = state['counter']
+
+    paths = topology.paths
+    if not paths:
+        return None
+    # The path list can shrink when a topology event removes a path
+    index = state['index'] % len(paths)
+    
+    current_path = paths[index]
+    weight = getattr(current_path, 'weight', 1)
+
+
+    if counter < weight:
+        state['counter'] += 1
+        return current_path
+    else:
+        state['index'] = (index + 1) % len(paths)
+        state['counter'] = 1
+        return paths[state['index']]
+    
+
+
+def reset_strategy_state():
+    """Clears the per-agent round-robin state that otherwise carries over between runs."""
+    round_robin_counter.clear()
+    wrr_state.clear()
+
+
+@depends_on("random", "path_state")
+def select_epsilon_greedy(agent, topology, path_state, epsilon=0.1, measured=False):
+    
+    paths  = topology.paths
+    if random.random() < epsilon:
+        return random.choice(topology.paths)
+
+    if measured and path_state is not None:
+        return paths[path_state.argmin(path_state.rtt_ms)]
+    best_path = min(paths, key=lambda path: path.base_rtt_ms)
+    return best_path
+
+
+@depends_on("path_state")
+def select_blest(agent, topology, path_state, measured=False, rtt_factor=1.5):
+    """
+    Blocking Estimation-based Selection:
+    Avoid using slower paths if a faster one would likely deliver the data sooner.
+    Paths slower than rtt_factor x the fastest RTT are skipped. With
+    measured=True the RTT comparison uses this step's effective RTT.
+    """
+    if measured and path_state is not None:
+        rtts = path_state.rtt_ms
+    else:
+        rtts = [path.base_rtt_ms for path in topology.paths]
+    best_rtt = min(rtts)
+
+    candidates = [i for i, rtt in enumerate(rtts) if rtt <= best_rtt * rtt_factor]
+
+    if path_state is not None:
+        return topology.paths[path_state.argmin(path_state.load, candidates)]
+    else:
+        return topology.paths[random.choice(candidates)]
+
+# Variants reacting to this step's effective RTT (see PathState)
+select_min_rtt_measured = depends_on("path_state")(partial(select_min_rtt, measured=True))
+select_epsilon_greedy_measured = depends_on("random", "path_state")(partial(select_epsilon_greedy, measured=True))
+select_blest_measured = depends_on("path_state")(partial(select_blest, measured=True))
+
+
+
+# ==============================================================================
+# COMPONENT 2: THE AGENT (The Dynamic Players)
+# ==============================================================================
+
+class Agent:
+    """Represents a single, independent data flow with its own state and logic."""
+    # No per-instance __dict__: keeps each agent to a fixed, small footprint
+    __slots__ = ('id', 'current_path', 'cwnd', 'strategy_func')
+
+    def __init__(self, agent_id, initial_path, strategy_func):
+        self.id = agent_id
+        self.current_path = initial_path
+        # Start with a small, randomized congestion window
+        self.cwnd = random.uniform(1.0, 5.0) 
+        self.strategy_func = strategy_func
+     
+
+    def update_cwnd(self, is_congested):
+        """Implements the AIMD (Additive Increase, Multiplicative Decrease) logic."""
+        if is_congested:
+            # Multiplicative Decrease
+            self.cwnd *= 0.5
+        else:
+            # Additive Increase
+            self.cwnd += 1.0
+        
+        # Ensure cwnd does not fall below a minimum value
+        self.cwnd = max(1.0, self.cwnd)
+
+    def choose_new_path(self, topology, path_state):
+        """Executes its assigned strategy to select a new path."""
+        new_path = self.strategy_func(self, topology, path_state)
+        if self.current_path.id != new_path.id:
+            # When an agent switches path, reset its cwnd to a base value
+            # This simulates the need to learn the new path's capacity
+            self.cwnd = 2.0 
+        self.current_path = new_path
+
+# ==============================================================================
+# COMPONENT 3: THE SIMULATOR (The Engine)
+# ==============================================================================
+
+TRACE_LEVELS = ("agents", "cwnd", "paths")
+
+# Strategies that learn from feedback (see bandits.py)
+LEARNING_STRATEGIES = ("epsilon_decay", "ucb", "thompson")
+
+class Simulator:
+    """Manages the overall state and progression of the simulation.
+
+    trace="agents" logs every agent's path and cwnd per step; trace="paths"
+    logs only throughput, path loads and losses; trace="cwnd" adds to those a
+    few columns summarizing the cwnd distribution, overall and per path (see
+    sketch.py), and keeps the run's pooled sketch in cwnd_sketch. With
+    memory_budget_mb set, the predicted peak footprint is checked before any
+    agent is created (see memory.py): the trace is downgraded to "cwnd" or
+    "paths" if that fits the budget, otherwise the run is refused with a
+    MemoryError.
+
+    With reevaluation set (a spec dict or ReevaluationSchedule, see
+    reevaluation.py) only the agents due at a step choose a new path.
+
+    Topology events (see events.py) from the config's "events" list and the
+    events argument (a list or a JSON file) change the paths during the run.
+    Agents on a removed path are moved to a random remaining path.
+
+    With sequential_updates=True, min_load and blest decisions see the
+    switches made earlier in the same step (see sequential.py) instead of
+    the loads at the start of the step.
+
+    congestion_control selects the cwnd model as in the sharded engine (see
+    congestion.py): a model or its name, or a list of (fraction, model)
+    pairs for contiguous agent groups. The default "aimd" is
+    Agent.update_cwnd; any other model updates every agent's window in one
+    array pass per step.
+
+    Every run records its wall time per phase (see profiler.py); with
+    profile_memory=True tracemalloc also measures the allocation of each
+    phase. run_cost() returns the totals that go into the run metadata.
+    """
+    # Engine name used by the memory estimator
+    ENGINE = "reference"
+    # Strategy names the engine runs (None: all), checked before anything is allocated
+    STRATEGIES = None
+
+    def __init__(self, config_filepath, num_agents, duration, strategy_name, telemetry=None,
+                 trace="agents", memory_budget_mb=None, reevaluation=None, events=None,
+                 sequential_updates=False, congestion_control="aimd", profile_memory=False):
+        if self.STRATEGIES is not None and strategy_name not in self.STRATEGIES:
+            raise ValueError(f"Strategy not supported by the {self.ENGINE} engine: {strategy_name}")
+        self.profiler = RunProfiler(trace_malloc=profile_memory)
+        self.topology = Topology(config_filepath)
+        self.num_agents = num_agents
+        self.duration = duration
+        self.strategy_name = strategy_name
+        # Optional TelemetryPublisher (see telemetry.py) that streams each step live
+        self.telemetry = telemetry
+        if trace not in TRACE_LEVELS:
+            raise ValueError(f"Unknown trace level: {trace}")
+        self.trace = trace
+        if memory_budget_mb is not None:
+            self._apply_memory_budget(memory_budget_mb)
+        self.strategy_map = {
+            "min_rtt": select_min_rtt,
+            "min_load": select_min_load,
+            "attribute_aware": select_attribute_aware,
+            "round_robin": select_round_robin,
+            "weighted_round_robin": select_weighted_round_robin,
+            "epsilon_greedy": select_epsilon_greedy,
+            "blest": select_blest,
+            "min_rtt_measured": select_min_rtt_measured,
+            "epsilon_greedy_measured": select_epsilon_greedy_measured,
+            "blest_measured": select_blest_measured
+        }
+
+        
+
+        self.learner = None
+        self.balancer = None
+        if strategy_name in LEARNING_STRATEGIES:
+            from .bandits import BanditLearner
+            self.learner = BanditLearner(strategy_name, self.num_agents, len(self.topology.paths))
+            self.strategy_func = self.learner.select
+        elif sequential_updates:
+            from .sequential import SequentialLoadBalancer
+            self.balancer = SequentialLoadBalancer(strategy_name)
+            self.strategy_func = self.balancer.select
+        else:
+            self.strategy_func = self.strategy_map.get(strategy_name)
+        if not self.strategy_func:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+        # Agents share one memoized entry point, so static and per-step decisions run once
+        self.decide = MemoizedStrategy(self.strategy_func)
+
+        self.agents = self._create_agents()
+        # (agent slice, model, model state) per group; None runs Agent.update_cwnd
+        self.cc_segments = None
+        if congestion_control != "aimd":
+            from .congestion import population_groups
+            self.cc_segments = [
+                (slice(start, end), model, model.init_state([agent.cwnd for agent in self.agents[start:end]]))
+                for start, end, model in population_groups(self.num_agents, congestion_control)
+            ]
+        self.reevaluation = None
+        if reevaluation is not None:
+            from .reevaluation import make_schedule
+            self.reevaluation = make_schedule(reevaluation, self.num_agents)
+        self.events = None
+        if self.topology.events or events is not None:
+            from .events import EventSchedule, load_events
+            self.events = EventSchedule(self.topology.events + load_events(events))
+        if self.learner is not None and self.events is not None:
+            raise ValueError("Learning strategies do not support topology events")
+        self.log_data = []
+        # Sketch of every agent's cwnd over all steps, filled when trace="cwnd"
+        self.cwnd_sketch = None
+
+    def _apply_memory_budget(self, memory_budget_mb):
+        """Downgrades the trace level, or refuses the run, if it would exceed the budget."""
+        from .memory import estimate_memory, format_bytes
+
+        budget = memory_budget_mb * 1024 * 1024
+        num_paths = len(self.topology.paths)
+        estimate = estimate_memory(self.ENGINE, self.num_agents, num_paths, self.duration, self.trace)
+        if estimate <= budget:
+            return
+        # Per-agent columns give way to the cwnd summaries first, then to path columns only
+        for level in TRACE_LEVELS[TRACE_LEVELS.index(self.trace) + 1:]:
+            reduced = estimate_memory(self.ENGINE, self.num_agents, num_paths, self.duration, level)
+            if reduced <= budget:
+                print(f"Estimated {format_bytes(estimate)} exceeds the {memory_budget_mb} MB budget; "
+                      f"downgrading trace to '{level}' ({format_bytes(reduced)}).")
+                self.trace = level
+                return
+            estimate = reduced
+        raise MemoryError(
+            f"Estimated peak of {format_bytes(estimate)} for {self.num_agents} agents x "
+            f"{self.duration} steps exceeds the {memory_budget_mb} MB budget"
+        )
+
+    def _create_agents(self):
+        """Creates all agent instances for the simulation."""
+        agents = []
+        for i in range(self.num_agents):
+            # Assign an initial path randomly to distribute agents at the start
+            initial_path = random.choice(self.topology.paths)
+            agent = Agent(agent_id=i, initial_path=initial_path, strategy_func=self.decide)
+            agents.append(agent)
+        return agents
+
+    def run(self):
+        """The main loop that executes for each time step."""
+        print(f"\nStarting simulation with {self.num_agents} agents for {self.duration} steps...")
+        self.profiler.lap("setup")
+
+        path_loads = {path.id: 0 for path in self.topology.paths}
+        # Column names are built once and shared by every log row
+        agent_keys = [(f'agent_{agent.id}_path', f'agent_{agent.id}_cwnd') for agent in self.agents]
+        # Paths added by topology events get their columns from the first step
+        column_ids = [path.id for path in self.topology.paths] if self.events is None \
+            else self.events.path_ids(self.topology)
+        load_keys = {path_id: f'{path_id}_load' for path_id in column_ids}
+        loss_keys = {path_id: f'{path_id}_loss' for path_id in column_ids}
+        column_index = {path_id: i for i, path_id in enumerate(column_ids)}
+
+        for t in range(self.duration):
+            # 0. Apply the topology events scheduled for this step
+            if self.events is not None:
+                self._apply_events(t)
+
+            # 1. Calculate path loads based on current agent cwnds
+            current_path_loads = {path.id: 0 for path in self.topology.paths}
+            for agent in self.agents:
+                current_path_loads[agent.current_path.id] += agent.cwnd
+            
+            # 2. Build the shared path state table and determine which paths are congested
+            path_state = PathState(self.topology, current_path_loads)
+            congested_paths = {path_id for path_id, c in zip(path_state.ids, path_state.congested) if c}
+            path_loss = {path_id: round(loss, 2) for path_id, loss in zip(path_state.ids, path_state.loss)}
+
+            # 3. Update agent CWNDs based on congestion and choose new paths for the *next* step
+            if self.learner is not None:
+                # Learning strategies fold this step's feedback in once, for all agents
+                path_index = {path_id: i for i, path_id in enumerate(path_state.ids)}
+                self.learner.observe([path_index[agent.current_path.id] for agent in self.agents], path_state)
+            if self.balancer is not None:
+                # Sequential decisions start from the windows counted in this step's loads
+                self.balancer.observe(self.agents, path_state)
+            if self.cc_segments is not None:
+                congested_agents = self._update_cwnd_models(t, path_state)
+                previous = [agent.current_path.id for agent in self.agents]
+                due = range(self.num_agents) if self.reevaluation is None \
+                    else self.reevaluation.due(t, congested_agents)
+                for i in due:
+                    self.agents[i].choose_new_path(self.topology, path_state)
+                self._reset_switched_models(t, previous)
+            elif self.reevaluation is None:
+                for agent in self.agents:
+                    is_congested = agent.current_path.id in congested_paths
+                    agent.update_cwnd(is_congested)
+                    agent.choose_new_path(self.topology, path_state)
+            else:
+                congested_agents = []
+                for i, agent in enumerate(self.agents):
+                    is_congested = agent.current_path.id in congested_paths
+                    agent.update_cwnd(is_congested)
+                    if is_congested:
+                        congested_agents.append(i)
+                # Only the agents due at this step run their strategy
+                for i in self.reevaluation.due(t, congested_agents):
+                    self.agents[i].choose_new_path(self.topology, path_state)
+            self.profiler.lap("step")
+            
+            # 4. Log the state of the system for the current time step `t`
+            log_entry = {
+                'timestep': t,
+                'total_throughput': sum(agent.cwnd for agent in self.agents)
+            }
+            # Log individual agent data
+            if self.trace == "agents":
+                for agent, (path_key, cwnd_key) in zip(self.agents, agent_keys):
+                    log_entry[path_key] = agent.current_path.id
+                    log_entry[cwnd_key] = round(agent.cwnd, 2)
+            # Log path load data (paths that do not exist at `t` log no load)
+            for path_id in column_ids:
+                log_entry[load_keys[path_id]] = round(current_path_loads.get(path_id, 0), 2)
+            
+            # log loss data
+            for path_id in column_ids:
+                log_entry[loss_keys[path_id]] = path_loss.get(path_id, 0.0)
+            log_entry['total_loss'] = round(sum(path_loss.values()),2)
+            if self.trace == "cwnd":
+                from .sketch import CwndSketch
+                sketch = CwndSketch.from_arrays([agent.cwnd for agent in self.agents],
+                                                [column_index[agent.current_path.id] for agent in self.agents],
+                                                len(column_ids))
+                log_entry.update(self._cwnd_columns(sketch, column_ids))
+
+            self.log_data.append(log_entry)
+
+            # 5. Stream the step to live subscribers, if a publisher is attached
+            self._publish_step(t, current_path_loads, path_loss, congested_paths, log_entry['total_throughput'])
+            self.profiler.lap("log")
+
+        print(f"t={t}: loads={current_path_loads}, capacity={[p.capacity_mbps for p in self.topology.paths]}, loss={path_loss}")
+
+
+
+        print("Simulation finished.")
+
+    def _update_cwnd_models(self, t, path_state):
+        """Applies the congestion-control models to every agent; returns the congested agents' indexes."""
+        import numpy as np
+        from .congestion import PathStateArrays
+
+        index_of = {path_id: i for i, path_id in enumerate(path_state.ids)}
+        path_idx = np.array([index_of[agent.current_path.id] for agent in self.agents], dtype=np.int64)
+        cwnd = np.array([agent.cwnd for agent in self.agents], dtype=np.float64)
+        arrays = PathStateArrays(np.array(path_state.load, dtype=np.float64),
+                                 np.array(path_state.capacity, dtype=np.float64),
+                                 np.array(path_state.base_rtt_ms, dtype=np.float64))
+        for segment, model, state in self.cc_segments:
+            cwnd[segment] = model.update(cwnd[segment], path_idx[segment], state, t, arrays)
+        for agent, value in zip(self.agents, cwnd.tolist()):
+            agent.cwnd = value
+        return np.flatnonzero(arrays.congested[path_idx]).tolist()
+
+    def _reset_switched_models(self, t, previous):
+        """Resets the model state of the agents whose path differs from `previous` (path ids)."""
+        import numpy as np
+
+        switched = np.array([agent.current_path.id != path_id for agent, path_id in zip(self.agents, previous)])
+        cwnd = np.array([agent.cwnd for agent in self.agents], dtype=np.float64)
+        for segment, model, state in self.cc_segments:
+            model.on_switch(state, switched[segment], t, cwnd[segment])
+
+    def _apply_events(self, t):
+        """Applies the topology events of step `t` and migrates agents off removed paths."""
+        removed = self.events.apply(t, self.topology)
+        if not removed:
+            return
+        if not self.topology.paths:
+            raise RuntimeError(f"Topology event at t={t} removed the last path")
+        removed_ids = {path.id for path in removed}
+        previous = [agent.current_path.id for agent in self.agents]
+        for agent in self.agents:
+            if agent.current_path.id in removed_ids:
+                agent.current_path = random.choice(self.topology.paths)
+                agent.cwnd = 2.0
+        if self.cc_segments is not None:
+            # Migrated flows restart their model state like any other switch
+            self._reset_switched_models(t, previous)
+
+    def _cwnd_columns(self, sketch, path_ids):
+        """The trace="cwnd" columns of one step's sketch; folds the step into cwnd_sketch."""
+        if self.cwnd_sketch is None:
+            self.cwnd_sketch = type(sketch)(sketch.num_paths)
+        self.cwnd_sketch.merge(sketch)
+        return sketch.summary(path_ids)
+
+    def _publish_step(self, t, path_loads, path_loss, congested_paths, total_throughput):
+        """Hands the path state of step `t` to the telemetry publisher without blocking."""
+        if self.telemetry is None:
+            return
+        self.telemetry.publish({
+            'strategy': self.strategy_name,
+            'agents': self.num_agents,
+            'timestep': t,
+            'loads': {path_id: round(load, 2) for path_id, load in path_loads.items()},
+            'loss': path_loss,
+            'congested': [path.id for path in self.topology.paths if path.id in congested_paths],
+            'throughput': round(total_throughput, 2)
+        })
+
+    def save_results(self, output_filepath="results_experiment_new_algorithms.csv", db=None):
+        """Writes the logged data to a CSV file, or into a results database.
+
+        With db (a ResultsDB or database path, see results_db.py) the trace is
+        stored under the CSV file name instead of being written to disk.
+        """
+        if not self.log_data:
+            print("No data to save.")
+            return
+
+        if db is not None:
+            from .results_db import open_db
+            name = os.path.basename(output_filepath)
+            print(f"Saving results to {name} in the results database...")
+            open_db(db).save_trace(name, self.log_data)
+            print("Results saved.")
+            self.profiler.lap("save")
+            return
+
+        print(f"Saving results to {output_filepath}...")
+        # The header is dynamic to accommodate any number of agents and paths
+        header = self.log_data[0].keys()
+        
+        with open(output_filepath, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=header)
+            writer.writeheader()
+            writer.writerows(self.log_data)
+        print("Results saved.")
+        self.profiler.lap("save")
+
+    def run_cost(self):
+        """Wall time, steps per second, trace size and peak memory of the run (see profiler.py)."""
+        return self.profiler.summary(len(self.log_data), self.log_data)
+
+# ==============================================================================
+# MAIN EXECUTION BLOCK
+# ==============================================================================
+
+def create_topology_file(filepath="topology.json", paths=None):
+    """A helper function to create the JSON config file (default paths unless given)."""
+    topo_data = {
+      "paths": paths if paths is not None else [
+        {
+          "id": "path_1",
+          "capacity_mbps": 100,
+          "weight": 100,
+          "base_rtt_ms": 50,
+          "attributes": []
+        },
+        {
+          "id": "path_2",
+          "capacity_mbps": 200,
+          "weight": 200,
+          "base_rtt_ms": 100,
+          "attributes": []
+        },
+        {
+          "id": "path_3",
+          "capacity_mbps": 80,
+          "weight": 80,
+          "base_rtt_ms": 50,
+          "attributes": ["high-cost"]
+        }
+      ]
+    }
+    with open(filepath, 'w') as f:
+        json.dump(topo_data, f, indent=2)
+
+
+def create_meta_file(result_filename, strategy, num_agents, config_file, duration, experiment, db=None,
+                     cost=None):
+    """Creates a .meta.json file containing metadata for the simulation.
+
+    With db the metadata row of the run is written to the results database instead.
+    cost (Simulator.run_cost()) adds the run's wall time and memory figures.
+    """
+    meta = {
+        "strategy": strategy,
+        "agents": num_agents,
+        "topology": config_file,
+        "duration": duration,
+        "experiment": experiment
+    }
+    if cost is not None:
+        meta.update(cost)
+
+    if db is not None:
+        from .results_db import open_db
+        open_db(db).save_meta(os.path.basename(result_filename), **meta)
+        return
+
+    with open(result_filename.replace(".csv", ".meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+
+
+if __name__ == "__main__":
+    # The new-algorithms sweep is declared in sweep.json and run by sweep.py
+    from .sweep import load_spec, run_sweep
+    run_sweep([load_spec("sweep.json")])
@@ -0,0 +1,65 @@
+import numpy as np
+
+# ==============================================================================
+# MEMORY MODEL: compact dtypes and a peak-footprint estimator per engine
+# ==============================================================================
+
+# cwnd values are small integers, halves and the initial uniform draw; float32 is plenty
+CWND_DTYPE = np.float32
+
+# Measured with tracemalloc on CPython 3.11 (see Simulator.trace)
+BYTES_PER_AGENT = {
+    "reference": 250,   # Agent with __slots__, its cwnd float and per-step transients
+    "jit": 320,         # Agent objects plus the kernel's state arrays
+    "sharded": 32,      # compact state arrays plus per-step temporaries
+    "churn": 200,       # flow table slots (4 per initial flow) plus per-step temporaries
+    "fluid": 0,         # per-path cwnd histograms, independent of the population
+    "multi": 260,       # each scenario's Agent objects plus the segmented state arrays
+}
+# Extra bytes per agent and step when trace="agents"
+TRACE_BYTES_PER_AGENT_STEP = {
+    "reference": 80,    # two log-row dict slots plus the rounded cwnd float
+    "jit": 90,          # same rows plus the kernel's int16 path / float64 cwnd output
+    "sharded": 0,       # the sharded engine never logs per-agent columns
+    "churn": 0,         # nor does the churn engine
+    "fluid": 0,         # or the fluid engine, which has no agents
+    "multi": 0,         # batched runs log trace="paths" only
+}
+BYTES_PER_PATH_STEP = 130
+BYTES_PER_STEP = 250
+# trace="cwnd": six summary columns per path and overall, per step, plus the
+# run's pooled sketch and a step sketch (count and sum per bin, see sketch.py)
+CWND_BYTES_PER_PATH_STEP = 480
+CWND_SKETCH_BYTES_PER_PATH = 4 * 384 * 8
+# The JIT engine records cwnd traces in chunks of this many agent-steps
+CWND_CHUNK_AGENT_STEPS = 1 << 21
+
+
+def path_index_dtype(num_paths):
+    """Smallest signed integer dtype able to index num_paths paths."""
+    return np.int16 if num_paths <= np.iinfo(np.int16).max else np.int32
+
+
+def estimate_memory(engine, num_agents, num_paths, duration, trace="agents"):
+    """Predicted peak bytes of a run, before anything is allocated."""
+    if engine not in BYTES_PER_AGENT:
+        raise ValueError(f"No memory model for engine: {engine}")
+    per_step = BYTES_PER_STEP + BYTES_PER_PATH_STEP * num_paths
+    fixed = BYTES_PER_AGENT[engine] * num_agents
+    if trace == "agents":
+        per_step += TRACE_BYTES_PER_AGENT_STEP[engine] * num_agents
+    elif trace == "cwnd":
+        per_step += CWND_BYTES_PER_PATH_STEP * (num_paths + 1)
+        fixed += CWND_SKETCH_BYTES_PER_PATH * num_paths
+        if engine == "jit":
+            # The kernel's int16 path / float64 cwnd output for one chunk
+            fixed += 10 * min(CWND_CHUNK_AGENT_STEPS, num_agents * duration)
+    return fixed + per_step * duration
+
+
+def format_bytes(num_bytes):
+    """Human-readable byte count."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
@@ -0,0 +1,372 @@
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# METRICS: one registry of summary metrics, computed across runs at once
+# ==============================================================================
+#
+# The path-level series of every run are stacked into one long-format table
+# (run_id, timestep, path, load, loss), next to a per-step table (run_id,
+# timestep, total_throughput, total_loss). Each registered metric is a single
+# grouped pass over those tables and returns one value per run_id. Metrics
+# are computed in registration order, so derived metrics (stability,
+# loss_avoidance) can read the ones registered before them.
+
+METRICS = {}
+
+# Per-step flow columns of churn runs, carried into the step table when present
+FLOW_COLUMNS = ('active_flows', 'completions', 'mean_fct')
+# Per-step cwnd distribution columns of trace="cwnd" runs (see sketch.py)
+CWND_COLUMNS = ('cwnd_p50', 'cwnd_p99', 'cwnd_gini')
+
+
+# Metrics computed only from the values of earlier metrics (never paths / steps)
+DERIVED_METRICS = set()
+
+
+def metric(name, derived=False):
+    """Registers a metric function(paths, steps, values) -> Series indexed by run_id.
+
+    derived=True declares that the function reads only `values`, so it also
+    works on the out-of-core aggregates.
+    """
+    def register(func):
+        METRICS[name] = func
+        if derived:
+            DERIVED_METRICS.add(name)
+        return func
+    return register
+
+
+def to_long(runs):
+    """Stacks (run_id, log DataFrame) pairs into the long path table and the step table."""
+    path_frames, step_frames = [], []
+    for run_id, df in runs:
+        load_cols = [col for col in df.columns if col.endswith('_load')]
+        path_ids = [col[:-len('_load')] for col in load_cols]
+        loss_cols = [f'{path_id}_loss' for path_id in path_ids]
+        timesteps = df['timestep'].to_numpy()
+        loads = df[load_cols].to_numpy(dtype=np.float64)
+        if all(col in df.columns for col in loss_cols):
+            losses = df[loss_cols].to_numpy(dtype=np.float64)
+        else:
+            losses = np.zeros_like(loads)
+        path_frames.append(pd.DataFrame({
+            'run_id': np.full(loads.size, run_id, dtype=object),
+            'timestep': np.repeat(timesteps, len(path_ids)),
+            'path': np.tile(np.array(path_ids, dtype=object), len(timesteps)),
+            'load': loads.ravel(),
+            'loss': losses.ravel(),
+        }))
+        throughput_col = 'total_throughput' if 'total_throughput' in df.columns else 'total_rate'
+        step_frames.append(pd.DataFrame({
+            'run_id': np.full(len(timesteps), run_id, dtype=object),
+            'timestep': timesteps,
+            'total_throughput': df[throughput_col].to_numpy(dtype=np.float64)
+            if throughput_col in df.columns else np.zeros(len(timesteps)),
+            'total_loss': df['total_loss'].to_numpy(dtype=np.float64),
+            # Flow-churn runs (churn.py) also log their flow population, and trace="cwnd"
+            # runs the cwnd distribution; NaN elsewhere
+            **{col: df[col].to_numpy(dtype=np.float64) if col in df.columns else np.full(len(timesteps), np.nan)
+               for col in FLOW_COLUMNS + CWND_COLUMNS},
+        }))
+    paths = pd.concat(path_frames, ignore_index=True)
+    paths['path'] = paths['path'].astype('category')
+    return paths, pd.concat(step_frames, ignore_index=True)
+
+
+@metric("oscillation")
+def _oscillation(paths, steps, values):
+    """Mean over paths of the standard deviation of each path's load."""
+    per_path = paths.groupby(['run_id', 'path'], observed=True, sort=False)['load'].std()
+    return per_path.groupby(level='run_id', sort=False).mean()
+
+
+@metric("loss")
+def _loss(paths, steps, values):
+    """Mean total loss per step (Mbps)."""
+    return steps.groupby('run_id', sort=False)['total_loss'].mean()
+
+
+@metric("throughput")
+def _throughput(paths, steps, values):
+    """Mean total throughput per step (Mbps)."""
+    return steps.groupby('run_id', sort=False)['total_throughput'].mean()
+
+
+@metric("efficiency")
+def _efficiency(paths, steps, values):
+    """Same as throughput; the name used by the experiment summaries."""
+    return values['throughput']
+
+
+@metric("fairness")
+def _fairness(paths, steps, values):
+    """Jain's index over the per-step total load: (sum x)^2 / (n * sum x^2)."""
+    load = paths.groupby(['run_id', 'timestep'], sort=False)['load'].sum()
+    grouped = load.groupby(level='run_id', sort=False)
+    numerator = grouped.sum() ** 2
+    denominator = grouped.count() * (load ** 2).groupby(level='run_id', sort=False).sum()
+    return (numerator / denominator).where(denominator != 0, 0)
+
+
+@metric("fairness_std")
+def _fairness_std(paths, steps, values):
+    """Standard deviation across paths of each path's mean load."""
+    per_path = paths.groupby(['run_id', 'path'], observed=True, sort=False)['load'].mean()
+    return per_path.groupby(level='run_id', sort=False).std()
+
+
+@metric("stability", derived=True)
+def _stability(paths, steps, values):
+    return 1 / (1 + values['oscillation'])
+
+
+@metric("loss_avoidance", derived=True)
+def _loss_avoidance(paths, steps, values):
+    return 1 / (1 + values['loss'])
+
+
+@metric("active_flows")
+def _active_flows(paths, steps, values):
+    """Mean number of active flows per step (churn runs only)."""
+    return steps.groupby('run_id', sort=False)['active_flows'].mean()
+
+
+@metric("fct")
+def _fct(paths, steps, values):
+    """Mean flow completion time in steps, over all completed flows (churn runs only)."""
+    completed = steps['completions'].where(steps['completions'] > 0)
+    weighted = (steps['mean_fct'] * completed).groupby(steps['run_id'], sort=False).sum(min_count=1)
+    return weighted / completed.groupby(steps['run_id'], sort=False).sum(min_count=1)
+
+
+@metric("cwnd_gini")
+def _cwnd_gini(paths, steps, values):
+    """Mean Gini coefficient of the agents' cwnd per step (trace="cwnd" runs only)."""
+    return steps.groupby('run_id', sort=False)['cwnd_gini'].mean()
+
+
+def compute_metrics(paths, steps, names=None):
+    """DataFrame of the named metrics (default: all), one row per run_id in input order."""
+    values = {}
+    for name, func in METRICS.items():
+        values[name] = func(paths, steps, values)
+    run_ids = pd.unique(steps['run_id'])
+    table = pd.DataFrame(values).reindex(run_ids)
+    return table[list(names)] if names is not None else table
+
+
+def summarize_runs(runs, names=None):
+    """Metrics of (run_id, log DataFrame) pairs, computed in one pass over all runs."""
+    runs = list(runs)
+    if not runs:
+        return pd.DataFrame(columns=list(names if names is not None else METRICS))
+    return compute_metrics(*to_long(runs), names=names)
+
+
+def run_metrics(df, names=None):
+    """Metrics of a single run's log DataFrame, as a dict."""
+    return summarize_runs([(0, df)], names).iloc[0].to_dict()
+
+
+# ==============================================================================
+# OUT-OF-CORE: mergeable per-run aggregates over bounded-size chunks
+# ==============================================================================
+#
+# A RunAggregate keeps, per path, the count, mean, sum of squared deviations
+# (Chan et al.'s parallel variance), min and max of the load, plus the sums
+# behind loss, throughput and Jain's fairness. Aggregates of consecutive
+# chunks merge exactly, so memory stays constant whatever the trace length.
+
+
+class RunAggregate:
+    """Mergeable summary of one run's trace."""
+
+    def __init__(self, path_ids):
+        num_paths = len(path_ids)
+        self.path_ids = list(path_ids)
+        self.count = 0
+        self.mean = np.zeros(num_paths)
+        self.m2 = np.zeros(num_paths)
+        self.min = np.full(num_paths, np.inf)
+        self.max = np.full(num_paths, -np.inf)
+        self.loss_sum = 0.0
+        self.throughput_sum = 0.0
+        # Per-step total load, for Jain's fairness index
+        self.total_sum = 0.0
+        self.total_sq_sum = 0.0
+        # Flow columns of churn runs: steps that log them, and the sums behind active_flows and fct
+        self.flow_steps = 0
+        self.active_flows_sum = 0.0
+        self.completions_sum = 0.0
+        self.fct_sum = 0.0
+        # Steps with a cwnd distribution, and the sum of their Gini coefficients
+        self.cwnd_steps = 0
+        self.cwnd_gini_sum = 0.0
+
+    @classmethod
+    def from_frame(cls, df):
+        """Aggregate of one chunk (or a whole run) of a log DataFrame."""
+        load_cols = [col for col in df.columns if col.endswith('_load')]
+        agg = cls([col[:-len('_load')] for col in load_cols])
+        loads = df[load_cols].to_numpy(dtype=np.float64)
+        agg.count = len(df)
+        if agg.count:
+            agg.mean = loads.mean(axis=0)
+            agg.m2 = ((loads - agg.mean) ** 2).sum(axis=0)
+            agg.min = loads.min(axis=0)
+            agg.max = loads.max(axis=0)
+        throughput_col = 'total_throughput' if 'total_throughput' in df.columns else 'total_rate'
+        if throughput_col in df.columns:
+            agg.throughput_sum = float(df[throughput_col].sum())
+        agg.loss_sum = float(df['total_loss'].sum())
+        totals = loads.sum(axis=1)
+        agg.total_sum = float(totals.sum())
+        agg.total_sq_sum = float((totals ** 2).sum())
+        if 'active_flows' in df.columns:
+            agg.flow_steps = int(df['active_flows'].notna().sum())
+            agg.active_flows_sum = float(df['active_flows'].sum())
+            completed = df['completions'].where(df['completions'] > 0)
+            agg.completions_sum = float(completed.sum())
+            agg.fct_sum = float((df['mean_fct'] * completed).sum())
+        if 'cwnd_gini' in df.columns:
+            agg.cwnd_steps = int(df['cwnd_gini'].notna().sum())
+            agg.cwnd_gini_sum = float(df['cwnd_gini'].sum())
+        return agg
+
+    def merge(self, other):
+        """Folds the aggregate of the following rows into this one."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = count
+        self.loss_sum += other.loss_sum
+        self.throughput_sum += other.throughput_sum
+        self.total_sum += other.total_sum
+        self.total_sq_sum += other.total_sq_sum
+        self.flow_steps += other.flow_steps
+        self.active_flows_sum += other.active_flows_sum
+        self.completions_sum += other.completions_sum
+        self.fct_sum += other.fct_sum
+        self.cwnd_steps += other.cwnd_steps
+        self.cwnd_gini_sum += other.cwnd_gini_sum
+        return self
+
+    def std(self):
+        """Sample standard deviation of each path's load (ddof=1, like pandas)."""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.full(len(self.path_ids), np.nan)
+
+    def oscillation(self):
+        return float(self.std().mean())
+
+    def loss(self):
+        return self.loss_sum / self.count
+
+    def throughput(self):
+        return self.throughput_sum / self.count
+
+    def fairness(self):
+        denominator = self.count * self.total_sq_sum
+        return self.total_sum ** 2 / denominator if denominator != 0 else 0
+
+    def fairness_std(self):
+        return float(pd.Series(self.mean).std())
+
+    def active_flows(self):
+        return self.active_flows_sum / self.flow_steps if self.flow_steps else np.nan
+
+    def fct(self):
+        return self.fct_sum / self.completions_sum if self.completions_sum else np.nan
+
+    def cwnd_gini(self):
+        return self.cwnd_gini_sum / self.cwnd_steps if self.cwnd_steps else np.nan
+
+
+# Base metrics computed from a RunAggregate; derived metrics reuse their
+# registry functions on the resulting values
+AGGREGATE_METRICS = {
+    "oscillation": RunAggregate.oscillation,
+    "loss": RunAggregate.loss,
+    "throughput": RunAggregate.throughput,
+    "efficiency": RunAggregate.throughput,
+    "fairness": RunAggregate.fairness,
+    "fairness_std": RunAggregate.fairness_std,
+    "active_flows": RunAggregate.active_flows,
+    "fct": RunAggregate.fct,
+    "cwnd_gini": RunAggregate.cwnd_gini,
+}
+
+
+def aggregate_metrics(agg, names=None):
+    """Registered metrics of one RunAggregate, as a dict.
+
+    Base metrics without an AGGREGATE_METRICS entry are NaN when all metrics
+    are asked for, and an error when asked for by name.
+    """
+    missing = [name for name in (names or ()) if name not in AGGREGATE_METRICS and name not in DERIVED_METRICS]
+    if missing:
+        raise ValueError(f"Metrics not available out of core (no RunAggregate form): {missing}")
+    values = {}
+    for name, func in METRICS.items():
+        if name in AGGREGATE_METRICS:
+            values[name] = AGGREGATE_METRICS[name](agg)
+        elif name in DERIVED_METRICS:
+            values[name] = func(None, None, values)
+        else:
+            values[name] = np.nan
+    return {name: values[name] for name in (names if names is not None else METRICS)}
+
+
+def _aggregate_column(col):
+    """True for the columns a RunAggregate reads: path, total, flow and cwnd_gini columns."""
+    return (col.endswith(('_load', '_loss')) or col.startswith('total_') or col in FLOW_COLUMNS
+            or col == 'cwnd_gini')
+
+
+def aggregate_chunks(chunks, path_ids=()):
+    """Merges the aggregates of a run's successive chunks (an empty run has path_ids and no rows)."""
+    agg = None
+    for chunk in chunks:
+        part = RunAggregate.from_frame(chunk)
+        agg = part if agg is None else agg.merge(part)
+    return agg if agg is not None else RunAggregate(path_ids)
+
+
+def aggregate_file(csv_path, chunksize=100_000):
+    """Aggregates a result CSV chunk by chunk, reading only the path, total and flow columns."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [col for col in header if _aggregate_column(col)]
+    return aggregate_chunks(pd.read_csv(csv_path, usecols=usecols, chunksize=chunksize),
+                            [col[:-len('_load')] for col in usecols if col.endswith('_load')])
+
+
+def summarize_files(csv_paths, names=None, chunksize=100_000):
+    """Metrics of result CSVs in bounded memory, one row per file in input order."""
+    rows = [aggregate_metrics(aggregate_file(path, chunksize), names) for path in csv_paths]
+    return pd.DataFrame(rows, columns=list(names if names is not None else METRICS))
+
+
+def summarize_database(db, names=None, chunksize=100_000, **filters):
+    """Metrics of the runs of a results database in bounded memory, like summarize_files.
+
+    Each trace is parsed `chunksize` rows at a time and folded into a
+    RunAggregate, so only one chunk of one run is held as a DataFrame.
+    Returns the metadata dicts of the matching runs that have a trace and
+    their metric table, in the same order.
+    """
+    from .results_db import open_db
+
+    metas, rows = [], []
+    for meta, chunks in open_db(db).iter_runs(usecols=_aggregate_column, chunksize=chunksize, **filters):
+        metas.append(meta)
+        rows.append(aggregate_metrics(aggregate_chunks(chunks), names))
+    return metas, pd.DataFrame(rows, columns=list(names if names is not None else METRICS))
@@ -0,0 +1,279 @@
+import random
+
+import numpy as np
+
+from .main import Simulator, reset_strategy_state
+from .profiler import RunProfiler, trace_nbytes
+from .strategy_codes import KERNEL_STRATEGIES, KERNEL_STRATEGY_NAMES
+from .vector_step import PathTables, StrategyState, aimd, choose_paths, static_choice, step_target
+
+# ==============================================================================
+# MULTI-SCENARIO ENGINE: many small independent simulations in one step loop
+# ==============================================================================
+#
+# Small cells (tens of agents) spend most of their time in per-step Python
+# overhead. This engine concatenates the agents of every scenario into one
+# segmented array (agent -> scenario) and pads every topology to the widest
+# path count, so one vectorized step advances all scenarios at once.
+#
+# A scenario is a dict: {"config_file", "num_agents", "duration",
+# "strategy", "seed"}. Scenarios may mix agent counts, durations, seeds,
+# topologies and any strategy in BATCHABLE_STRATEGIES.
+# Each scenario produces the same trace="paths" log as the reference engine.
+# A scenario whose agents each draw a random path (attribute_aware with no
+# compliant path) needs the reference engine's random stream, so it is run
+# on its own Simulator before the batch.
+#
+# run_costs() gives each scenario its own cost row. A scenario run on its own
+# keeps its Simulator's cost. The batched step loop is shared, so its wall
+# time is split among the batched scenarios by agent-steps, and their rows
+# carry batched_runs; peak RSS and the tracemalloc peak stay those of the
+# whole batch.
+
+# Strategies the batched step can run (the ones with a kernel in jit_engine.py)
+BATCHABLE_STRATEGIES = KERNEL_STRATEGY_NAMES
+
+
+def batchable(strategy_name):
+    """True when a strategy can run inside a multi-scenario batch."""
+    return strategy_name in BATCHABLE_STRATEGIES
+
+
+class MultiScenarioSimulator:
+    """Runs a batch of independent scenarios as one segmented simulation.
+
+    Every scenario gets a reference Simulator, created from its seed exactly
+    as the sweep would, which supplies the initial agents and afterwards
+    holds the scenario's log_data (so save_results works as usual).
+    """
+
+    def __init__(self, scenarios, profile_memory=False):
+        self.profiler = RunProfiler(trace_malloc=profile_memory)
+        self.scenarios = list(scenarios)
+        self.simulators = []
+        for scenario in self.scenarios:
+            if not batchable(scenario["strategy"]):
+                raise ValueError(f"Strategy not supported by the multi-scenario engine: {scenario['strategy']}")
+            reset_strategy_state()
+            if scenario.get("seed") is not None:
+                random.seed(scenario["seed"])
+            sim = Simulator(scenario["config_file"], scenario["num_agents"], scenario["duration"],
+                            scenario["strategy"], trace="paths")
+            if sim.events is not None:
+                raise ValueError("Topology events are not supported by the multi-scenario engine")
+            self.simulators.append(sim)
+        self.unbatched = [
+            s for s, sim in enumerate(self.simulators)
+            if static_choice(KERNEL_STRATEGIES[sim.strategy_func], sim.strategy_func, sim.topology) is None
+        ]
+        self.batched = [s for s in range(len(self.simulators)) if s not in self.unbatched]
+        self.unbatched_costs = {}
+        if self.batched:
+            self._build_arrays()
+        self.profiler.lap("setup")
+
+    def _build_arrays(self):
+        """Lays every batched scenario out in the segmented agent arrays and padded path arrays."""
+        sims = [self.simulators[s] for s in self.batched]
+        num_scenarios = len(sims)
+        self.num_paths = np.array([len(sim.topology.paths) for sim in sims], dtype=np.int64)
+        max_paths = int(self.num_paths.max())
+        self.max_paths = max_paths
+
+        # Padded paths never congest and are never the argmin
+        self.capacity = np.full((num_scenarios, max_paths), np.inf)
+        self.weights = np.ones((num_scenarios, max_paths))
+        self.valid = np.zeros((num_scenarios, max_paths), dtype=bool)
+        self.blest_mask = np.zeros((num_scenarios, max_paths), dtype=bool)
+        self.static_choice = np.zeros(num_scenarios, dtype=np.int64)
+        self.strategy = np.array([KERNEL_STRATEGIES[sim.strategy_func] for sim in sims], dtype=np.int64)
+        self.duration = np.array([sim.duration for sim in sims], dtype=np.int64)
+
+        scenario_of, path_idx, cwnd = [], [], []
+        for s, sim in enumerate(sims):
+            paths = sim.topology.paths
+            index_of = {path.id: i for i, path in enumerate(paths)}
+            tables = PathTables(sim.topology)
+            self.capacity[s, :len(paths)] = tables.capacity
+            self.weights[s, :len(paths)] = tables.weights
+            self.valid[s, :len(paths)] = True
+            self.blest_mask[s, :len(paths)] = tables.blest_mask
+            self.static_choice[s] = static_choice(self.strategy[s], sim.strategy_func, sim.topology)
+            scenario_of.extend([s] * len(sim.agents))
+            path_idx.extend(index_of[a.current_path.id] for a in sim.agents)
+            cwnd.extend(a.cwnd for a in sim.agents)
+
+        self.scenario_of = np.array(scenario_of, dtype=np.int64)
+        self.path_idx = np.array(path_idx, dtype=np.int64)
+        self.cwnd = np.array(cwnd, dtype=np.float64)
+        self.agent_strategy = self.strategy[self.scenario_of]
+        self.agent_num_paths = self.num_paths[self.scenario_of]
+
+    def run(self):
+        """Advances every scenario for its own duration, then fills each Simulator's log_data."""
+        # Scenarios run on their own go first: each resets the peak RSS when it starts,
+        # so the batch's peak is read after the last of them
+        for s in self.unbatched:
+            self._run_alone(s)
+        if self.batched:
+            self._run_batched()
+
+    def _run_alone(self, s):
+        """Runs scenario s on a fresh reference Simulator, seeded as the sweep would."""
+        scenario = self.scenarios[s]
+        reset_strategy_state()
+        if scenario.get("seed") is not None:
+            random.seed(scenario["seed"])
+        sim = Simulator(scenario["config_file"], scenario["num_agents"], scenario["duration"],
+                        scenario["strategy"], trace="paths")
+        sim.run()
+        self.simulators[s] = sim
+        self.unbatched_costs[s] = sim.run_cost()
+        self.profiler.lap("unbatched")
+
+    def _run_batched(self):
+        """The segmented step loop over the batched scenarios."""
+        num_scenarios, max_paths = self.capacity.shape
+        num_cells = num_scenarios * max_paths
+        max_duration = int(self.duration.max())
+        total_agents = len(self.cwnd)
+        print(f"\nStarting {num_scenarios} scenarios ({total_agents} agents) for up to {max_duration} steps (multi)...")
+
+        scenario_of, path_idx, cwnd = self.scenario_of, self.path_idx, self.cwnd
+        masks = {code: np.flatnonzero(self.agent_strategy == code) for code in np.unique(self.agent_strategy)}
+        strategy_state = StrategyState(total_agents)
+        self.profiler.lap("setup")
+
+        out_loads = np.empty((max_duration, num_scenarios, max_paths))
+        out_counts = np.empty((max_duration, num_scenarios, max_paths), dtype=np.int64)
+        out_loss = np.empty((max_duration, num_scenarios, max_paths))
+        out_throughput = np.empty((max_duration, num_scenarios))
+
+        for t in range(max_duration):
+            # 1. Path loads of every (scenario, path) cell, accumulated in agent order
+            cell = scenario_of * max_paths + path_idx
+            loads = np.bincount(cell, weights=cwnd, minlength=num_cells).reshape(num_scenarios, max_paths)
+            out_counts[t] = np.bincount(cell, minlength=num_cells).reshape(num_scenarios, max_paths)
+
+            # 2. Congestion and loss per path
+            congested = loads > self.capacity
+            out_loads[t] = loads
+            out_loss[t] = np.where(congested, loads - self.capacity, 0.0)
+
+            # 3. AIMD update, per-scenario strategy decisions and switch reset
+            cwnd = aimd(cwnd, congested.ravel()[cell])
+            new = path_idx.copy()
+            for code, idx in masks.items():
+                scenario = scenario_of[idx]
+                target = step_target(code, loads, self.blest_mask, self.static_choice, self.valid)[scenario]
+                new[idx] = choose_paths(code, strategy_state, idx, target, self.weights, self.agent_num_paths[idx],
+                                        weight_rows=scenario)
+            cwnd = np.where(new != path_idx, 2.0, cwnd)
+            path_idx = new
+            out_throughput[t] = np.bincount(scenario_of, weights=cwnd, minlength=num_scenarios)
+        self.profiler.lap("step")
+
+        self.path_idx, self.cwnd = path_idx, cwnd
+        for b, s in enumerate(self.batched):
+            self._scatter_log(b, self.simulators[s], out_loads, out_counts, out_loss, out_throughput)
+        self.profiler.lap("log")
+        print("Simulation finished.")
+
+    def run_costs(self):
+        """Cost of every scenario, in scenario order, like Simulator.run_cost().
+
+        Batched scenarios share the batch's step loop: each is charged the
+        share of its wall time given by its agent-steps, and is flagged with
+        the number of batched runs.
+        """
+        costs = dict(self.unbatched_costs)
+        if self.batched:
+            batch = self.profiler.summary(0, [])
+            phases = {name: phase["seconds"] for name, phase in batch["phases"].items() if name != "unbatched"}
+            wall = sum(phases.values())
+            loop = sum(seconds for name, seconds in phases.items() if name not in ("setup", "save"))
+            work = np.array([max(len(self.simulators[s].agents), 1) * self.simulators[s].duration
+                             for s in self.batched], dtype=np.float64)
+            for s, share in zip(self.batched, work / work.sum()):
+                sim = self.simulators[s]
+                costs[s] = dict(
+                    batch,
+                    wall_seconds=round(wall * share, 4),
+                    steps_per_second=round(sim.duration / (loop * share), 1) if loop > 0 else None,
+                    trace_mb=round(trace_nbytes(sim.log_data) / 2**20, 2),
+                    batched_runs=len(self.batched),
+                    phases={name: {"seconds": round(seconds * share, 4)} for name, seconds in phases.items()},
+                )
+        return [costs[s] for s in range(len(self.simulators))]
+
+    def _scatter_log(self, s, sim, out_loads, out_counts, out_loss, out_throughput):
+        """Writes batch row s into its Simulator, in the reference trace="paths" format."""
+        duration, num_paths = sim.duration, len(sim.topology.paths)
+        path_ids = [path.id for path in sim.topology.paths]
+        load_keys = [f'{path_id}_load' for path_id in path_ids]
+        loss_keys = [f'{path_id}_loss' for path_id in path_ids]
+        loads = out_loads[:duration, s, :num_paths].tolist()
+        counts = out_counts[:duration, s, :num_paths].tolist()
+        losses = out_loss[:duration, s, :num_paths].tolist()
+        throughput = out_throughput[:duration, s].tolist()
+        sim.log_data = []
+        for t in range(duration):
+            log_entry = {'timestep': t, 'total_throughput': throughput[t]}
+            # Empty paths keep the integer 0 the reference engine starts from
+            for key, load, count in zip(load_keys, loads[t], counts[t]):
+                log_entry[key] = round(load, 2) if count else 0
+            path_loss = [round(loss, 2) for loss in losses[t]]
+            for key, loss in zip(loss_keys, path_loss):
+                log_entry[key] = loss
+            log_entry['total_loss'] = round(sum(path_loss), 2)
+            sim.log_data.append(log_entry)
+
+        # Final agent state, so the Simulator looks as if it had run itself
+        offset = int(np.flatnonzero(self.scenario_of == s)[0]) if len(sim.agents) else 0
+        for i, agent in enumerate(sim.agents):
+            agent.current_path = sim.topology.paths[self.path_idx[offset + i]]
+            agent.cwnd = float(self.cwnd[offset + i])
+
+
+def verify_equivalence(scenarios):
+    """Runs the scenarios batched and one by one on the reference engine; compares the logs."""
+    batch = MultiScenarioSimulator(scenarios)
+    batch.run()
+    results = []
+    for scenario, batched in zip(scenarios, batch.simulators):
+        reset_strategy_state()
+        random.seed(scenario["seed"])
+        sim = Simulator(scenario["config_file"], scenario["num_agents"], scenario["duration"],
+                        scenario["strategy"], trace="paths")
+        sim.run()
+        results.append(sim.log_data == batched.log_data)
+    reset_strategy_state()
+    return results
+
+
+if __name__ == "__main__":
+    import os
+    import time
+    from .main import create_topology_file
+
+    CONFIG_FILE = "topology.json"
+    create_topology_file(CONFIG_FILE)
+    STRATEGIES = ["min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin", "blest"]
+    scenarios = [
+        {"config_file": CONFIG_FILE, "num_agents": n, "duration": 300, "strategy": strategy, "seed": seed}
+        for strategy in STRATEGIES for n in (10, 25, 50, 100, 150) for seed in range(2)
+    ]
+
+    ok = verify_equivalence(scenarios)
+    print(f"\n{sum(ok)}/{len(ok)} scenarios identical to the reference engine")
+
+    start = time.perf_counter()
+    MultiScenarioSimulator(scenarios).run()
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    for scenario in scenarios:
+        Simulator(scenario["config_file"], scenario["num_agents"], scenario["duration"],
+                  scenario["strategy"], trace="paths").run()
+    sequential = time.perf_counter() - start
+    os.remove(CONFIG_FILE)
+    print(f"{len(scenarios)} scenarios: batched {batched:.2f}s, one by one {sequential:.2f}s")
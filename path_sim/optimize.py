@@ -0,0 +1,220 @@
+import io
+import os
+import random
+import sys
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+
+from . import main
+from .main import Simulator, create_topology_file
+from .metrics import summarize_runs
+from .strategy_codes import BLEST
+from .sweep import load_spec
+from .vector_step import PathTables, aimd, epsilon_greedy, step_target, weighted_round_robin
+
+# ==============================================================================
+# BATCHED PARAMETER OPTIMIZATION: many candidate parameter sets in one simulation
+# ==============================================================================
+#
+# BatchedSimulator steps every candidate at once: agent state is a
+# (candidates, agents) array, so C candidates cost one vectorized pass per
+# step instead of C Simulator runs. All candidates start from the same agents
+# (taken from a seeded Simulator) and share the random draws of each step, so
+# differences between candidates come from the parameters alone.
+#
+# Configured by an "optimize" section in a sweep spec:
+#
+#   "optimize": {"strategy": "weighted_round_robin", "parameter": "weights",
+#                "objective": "efficiency", "direction": "max", "agents": 100,
+#                "candidates": 64, "rounds": 4, "seed": 0,
+#                "output_file": "results/optimize_wrr_weights.csv"}
+#
+# Parameters: "weights" (weighted_round_robin), "epsilon" (epsilon_greedy)
+# and "rtt_factor" (blest). The objective is any metric in metrics.py.
+
+PARAMETERS = {
+    "weights": "weighted_round_robin",
+    "epsilon": "epsilon_greedy",
+    "rtt_factor": "blest",
+}
+
+
+class BatchedSimulator:
+    """Runs one strategy for a batch of candidate parameter sets at once."""
+
+    def __init__(self, config_filepath, num_agents, duration, strategy_name, seed=0):
+        if strategy_name not in PARAMETERS.values():
+            raise ValueError(f"Strategy not supported by the batched simulator: {strategy_name}")
+        # The initial agents come from a seeded reference Simulator
+        main.reset_strategy_state()
+        random.seed(seed)
+        with redirect_stdout(io.StringIO()):
+            reference = Simulator(config_filepath, num_agents, duration, strategy_name, trace="paths")
+        self.paths = reference.topology.paths
+        self.path_ids = [path.id for path in self.paths]
+        index_of = {path_id: i for i, path_id in enumerate(self.path_ids)}
+        self.initial_path = np.array([index_of[a.current_path.id] for a in reference.agents], dtype=np.int64)
+        self.initial_cwnd = np.array([a.cwnd for a in reference.agents])
+        tables = PathTables(reference.topology)
+        self.capacity = tables.capacity
+        self.base_rtt = tables.base_rtt
+        self.min_rtt_idx = tables.min_rtt_idx
+        self.num_agents = num_agents
+        self.duration = duration
+        self.strategy_name = strategy_name
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, weights=None, epsilon=None, rtt_factor=None):
+        """Simulates every candidate; the parameter arrays have one row per candidate.
+
+        Returns loads and losses of shape (candidates, duration, paths) and the
+        total throughput of shape (candidates, duration).
+        """
+        if self.strategy_name == "weighted_round_robin":
+            weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+            num_candidates = weights.shape[0]
+        elif self.strategy_name == "epsilon_greedy":
+            epsilon = np.atleast_1d(np.asarray(epsilon, dtype=np.float64))
+            num_candidates = epsilon.shape[0]
+        else:
+            rtt_factor = np.atleast_1d(np.asarray(rtt_factor, dtype=np.float64))
+            num_candidates = rtt_factor.shape[0]
+            # Paths within rtt_factor x the fastest RTT, per candidate
+            blest_mask = self.base_rtt[None, :] <= self.base_rtt.min() * rtt_factor[:, None]
+
+        num_paths = len(self.paths)
+        rows = np.arange(num_candidates)[:, None]
+        path_idx = np.tile(self.initial_path, (num_candidates, 1))
+        cwnd = np.tile(self.initial_cwnd, (num_candidates, 1))
+        wrr_index = np.zeros_like(path_idx)
+        wrr_counter = np.zeros_like(cwnd)
+
+        out_loads = np.empty((num_candidates, self.duration, num_paths))
+        out_loss = np.empty_like(out_loads)
+        out_throughput = np.empty((num_candidates, self.duration))
+
+        for t in range(self.duration):
+            # 1. Path loads of every candidate: bincount over (candidate, path) cells
+            flat = (rows * num_paths + path_idx).ravel()
+            loads = np.bincount(flat, weights=cwnd.ravel(), minlength=num_candidates * num_paths)
+            loads = loads.reshape(num_candidates, num_paths)
+
+            # 2. Congestion and loss per path
+            congested = loads > self.capacity
+            out_loads[:, t] = loads
+            out_loss[:, t] = np.where(congested, loads - self.capacity, 0.0)
+
+            # 3. AIMD update and the strategy decision
+            cwnd = aimd(cwnd, congested[rows, path_idx])
+            if self.strategy_name == "weighted_round_robin":
+                weight = weights[rows, wrr_index]
+                wrr_index, wrr_counter = weighted_round_robin(wrr_index, wrr_counter, weight, num_paths)
+                new = wrr_index
+            elif self.strategy_name == "epsilon_greedy":
+                # Shared draws: candidates differ only in the exploration threshold
+                new = epsilon_greedy(self.rng, self.num_agents, num_paths, epsilon, self.min_rtt_idx)
+            else:
+                choice = step_target(BLEST, loads, blest_mask, None)
+                new = np.broadcast_to(choice[:, None], path_idx.shape)
+
+            cwnd = np.where(new != path_idx, 2.0, cwnd)
+            path_idx = np.array(new)
+            out_throughput[:, t] = cwnd.sum(axis=1)
+
+        return {"loads": out_loads, "loss": out_loss, "throughput": out_throughput}
+
+    def candidate_frames(self, result):
+        """Per-candidate log DataFrames in the Simulator's column layout."""
+        frames = []
+        for c in range(result["throughput"].shape[0]):
+            df = pd.DataFrame({"timestep": np.arange(self.duration), "total_throughput": result["throughput"][c]})
+            for p, path_id in enumerate(self.path_ids):
+                df[f"{path_id}_load"] = result["loads"][c, :, p]
+            for p, path_id in enumerate(self.path_ids):
+                df[f"{path_id}_loss"] = result["loss"][c, :, p]
+            df["total_loss"] = result["loss"][c].sum(axis=1)
+            frames.append((c, df))
+        return frames
+
+    def evaluate(self, objective, **parameters):
+        """Objective metric of every candidate, as an array."""
+        result = self.run(**parameters)
+        return summarize_runs(self.candidate_frames(result), [objective])[objective].to_numpy()
+
+
+def _propose(parameter, best, num_candidates, rng, scale, bounds):
+    """Candidates around the current best (or spread over the bounds when best is None)."""
+    if parameter == "weights":
+        if best is None:
+            # Random weight vectors on the same total as the capacities
+            return np.maximum(rng.dirichlet(np.ones(len(bounds)), size=num_candidates) * bounds.sum(), 1.0)
+        spread = best * np.exp(rng.normal(0, scale, size=(num_candidates, best.shape[0])))
+        return np.vstack([best, np.maximum(spread[1:], 1.0)])
+    low, high = bounds
+    if best is None:
+        return np.linspace(low, high, num_candidates)
+    return np.clip(np.concatenate([[best], best + rng.normal(0, scale * (high - low), num_candidates - 1)]),
+                   low, high)
+
+
+def optimize(config_filepath, strategy, parameter, objective="efficiency", direction="max", agents=100,
+             duration=300, candidates=64, rounds=4, seed=0, bounds=None):
+    """Batched search of one strategy parameter; returns (best value, table of all candidates).
+
+    The first round spreads candidates over the search space (random weight
+    vectors, or a grid for epsilon and rtt_factor). Later rounds perturb
+    the best candidate so far with a shrinking step.
+    """
+    if PARAMETERS.get(parameter) != strategy:
+        raise ValueError(f"Parameter {parameter} does not belong to strategy {strategy}")
+    sim = BatchedSimulator(config_filepath, agents, duration, strategy, seed=seed)
+    rng = np.random.default_rng(seed)
+    if bounds is None:
+        bounds = {"weights": sim.capacity, "epsilon": (0.0, 0.5), "rtt_factor": (1.0, 3.0)}[parameter]
+    bounds = np.asarray(bounds, dtype=np.float64)
+    sign = 1 if direction == "max" else -1
+
+    best, best_score, rows = None, None, []
+    for round_index in range(rounds):
+        values = _propose(parameter, best, candidates, rng, 0.5 / (round_index + 1), bounds)
+        if parameter == "weights" and round_index == 0:
+            # Include the capacity-proportional weights used by create_topology_file
+            values[0] = sim.capacity
+        scores = sim.evaluate(objective, **{parameter: values})
+        for value, score in zip(values, scores):
+            rows.append({"round": round_index, parameter: np.round(value, 4).tolist(), objective: score})
+        i = int(np.argmax(sign * scores))
+        if best_score is None or sign * scores[i] > sign * best_score:
+            best, best_score = values[i], scores[i]
+    table = pd.DataFrame(rows).sort_values(objective, ascending=direction != "max", kind="stable")
+    return best, table
+
+
+def optimize_spec(spec):
+    """Runs the optimize section of a spec and writes its candidate table."""
+    options = dict(spec["optimize"])
+    output_file = options.pop("output_file", None)
+    options.setdefault("duration", spec["duration"])
+    config_file = os.path.join(spec["base_dir"], spec["topology"]["file"])
+
+    create_topology_file(config_file, paths=spec["topology"]["paths"])
+    try:
+        best, table = optimize(config_file, **options)
+    finally:
+        os.remove(config_file)
+
+    if output_file:
+        output_file = os.path.join(spec["base_dir"], output_file)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        table.to_csv(output_file, index=False)
+    return best, table
+
+
+if __name__ == "__main__":
+    # python -m path_sim.optimize sweep.json
+    best, table = optimize_spec(load_spec(sys.argv[1]))
+    print("\n=== Best candidates ===\n")
+    print(table.head(10).to_string(index=False))
+    print(f"\nBest: {np.round(best, 4).tolist()}")
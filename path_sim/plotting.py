@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+# ==============================================================================
+# PLOTTING PIPELINE: the matplotlib_data figure types, rendered from results
+# ==============================================================================
+
+MANIFEST_FILE = ".plot_manifest.json"
+
+FIGURE_SIZES = {
+    "path_loads": (12.8, 6.5),
+    "throughput_over_time": (10, 5),
+    "average_throughput": (10, 6),
+}
+
+# One Figure per figure type, reused for every plot a worker process renders
+_figures = {}
+
+
+def minmax_decimate(x, y, max_points=2000):
+    """Reduces a series to at most max_points while keeping every peak and trough.
+
+    The series is split into max_points // 2 buckets and the minimum and
+    maximum of each bucket are kept in time order, so oscillation amplitude
+    survives decimation.
+    """
+    x, y = np.asarray(x), np.asarray(y, dtype=np.float64)
+    num_buckets = max_points // 2
+    if len(y) <= max_points or num_buckets < 1:
+        return x, y
+    edges = np.linspace(0, len(y), num_buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(num_buckets), np.diff(edges))
+    # Sorting by (bucket, value) puts each bucket's min first and its max last
+    order = np.lexsort((y, bucket))
+    keep = np.unique(np.concatenate([order[edges[:-1]], order[edges[1:] - 1]]))
+    return x[keep], y[keep]
+
+
+def _get_figure(kind):
+    """Returns the cached Figure for this figure type, cleared for reuse."""
+    fig = _figures.get(kind)
+    if fig is None:
+        fig = Figure(figsize=FIGURE_SIZES[kind])
+        _figures[kind] = fig
+    fig.clear()
+    return fig
+
+
+def _plot_path_loads(job, ax, max_points):
+    """Load on each path over time for one run."""
+    df = pd.read_csv(job["inputs"][0], usecols=lambda c: c == "timestep" or c.endswith("_load"))
+    for col in df.columns:
+        if col == "timestep":
+            continue
+        x, y = minmax_decimate(df["timestep"], df[col], max_points)
+        ax.plot(x, y, label=f"{job['label']} - {col[:-len('_load')]}")
+    ax.set_title(f"Path Loads - {job['label']}")
+    ax.set_xlabel("Timestep")
+    ax.set_ylabel("Load (Mbps)")
+
+
+def _plot_throughput_over_time(job, ax, max_points):
+    """Total throughput over time, one line per run."""
+    for path, label in zip(job["inputs"], job["labels"]):
+        df = pd.read_csv(path, usecols=["timestep", "total_throughput"])
+        x, y = minmax_decimate(df["timestep"], df["total_throughput"], max_points)
+        ax.plot(x, y, label=label)
+    ax.set_title("Throughput Over Time")
+    ax.set_xlabel("Timestep")
+    ax.set_ylabel("Throughput (Mbps)")
+
+
+def _plot_average_throughput(job, ax, max_points):
+    """Grouped bars of mean throughput per strategy and agent count.
+
+    Reads a metric summary (throughput or efficiency column) for jobs made by
+    summary_figure_job, otherwise the mean of each result file.
+    """
+    if len(job["inputs"]) == 1 and "labels" not in job:
+        summary = pd.read_csv(job["inputs"][0])
+        value_col = "throughput" if "throughput" in summary.columns else "efficiency"
+        table = summary.pivot_table(index="agents", columns="strategy", values=value_col, sort=False)
+    else:
+        rows = [
+            {"strategy": label, "agents": agents,
+             "throughput": pd.read_csv(path, usecols=["total_throughput"])["total_throughput"].mean()}
+            for path, label, agents in zip(job["inputs"], job["labels"], job["agents"])
+        ]
+        table = pd.DataFrame(rows).pivot_table(index="agents", columns="strategy", values="throughput", sort=False)
+    table = table.sort_index()
+
+    positions = np.arange(len(table.index))
+    width = 0.7 / max(1, len(table.columns))
+    for i, strategy in enumerate(table.columns):
+        ax.bar(positions + (i - (len(table.columns) - 1) / 2) * width, table[strategy], width, label=strategy)
+    ax.set_xticks(positions)
+    ax.set_xticklabels([f"{agents} agents" for agents in table.index])
+    ax.set_title("Average Throughput with Increasing Number of Agents")
+    ax.set_ylabel("Average Throughput (Mbps)")
+
+
+PLOTTERS = {
+    "path_loads": _plot_path_loads,
+    "throughput_over_time": _plot_throughput_over_time,
+    "average_throughput": _plot_average_throughput,
+}
+
+
+def render_figure(job, output_dir, max_points=2000):
+    """Renders one figure job to output_dir/job['output'] on a reused Figure."""
+    fig = _get_figure(job["kind"])
+    ax = fig.add_subplot()
+    PLOTTERS[job["kind"]](job, ax, max_points)
+    ax.grid(True)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(os.path.join(output_dir, job["output"]))
+    return job["output"]
+
+
+def job_fingerprint(job, max_points):
+    """Hash of the job definition and the size/mtime of every input file."""
+    h = hashlib.sha1(json.dumps(job, sort_keys=True).encode())
+    h.update(str(max_points).encode())
+    for path in job["inputs"]:
+        stat = os.stat(path)
+        h.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def plan_sweep_figures(result_dir):
+    """Builds the figure jobs for every results_*.csv (with .meta.json) in a folder.
+
+    One path-load figure per run, one throughput-over-time figure per
+    (experiment, agents) and one average-throughput figure per experiment.
+    """
+    runs = []
+    for file in sorted(os.listdir(result_dir)):
+        if file.endswith(".csv") and file.startswith("results_"):
+            csv_path = os.path.join(result_dir, file)
+            meta_path = csv_path.replace(".csv", ".meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    runs.append((csv_path, json.load(f)))
+
+    jobs = []
+    by_cell = defaultdict(list)
+    by_experiment = defaultdict(list)
+    for csv_path, meta in runs:
+        experiment = meta.get("experiment", "unknown")
+        jobs.append({
+            "kind": "path_loads",
+            "output": f"{experiment}_path_loads_{meta['strategy']}_{meta['agents']}_agents.png",
+            "inputs": [csv_path],
+            "label": meta["strategy"],
+        })
+        by_cell[(experiment, meta["agents"])].append((csv_path, meta))
+        by_experiment[experiment].append((csv_path, meta))
+
+    for (experiment, agents), cell in sorted(by_cell.items()):
+        jobs.append({
+            "kind": "throughput_over_time",
+            "output": f"{experiment}_throughput_over_time_{agents}_agents.png",
+            "inputs": [csv_path for csv_path, _ in cell],
+            "labels": [meta["strategy"] for _, meta in cell],
+        })
+    for experiment, cell in sorted(by_experiment.items()):
+        jobs.append({
+            "kind": "average_throughput",
+            "output": f"{experiment}_average_throughput.png",
+            "inputs": [csv_path for csv_path, _ in cell],
+            "labels": [meta["strategy"] for _, meta in cell],
+            "agents": [meta["agents"] for _, meta in cell],
+        })
+    return jobs
+
+
+def summary_figure_job(summary_csv, output):
+    """Average-throughput figure job for a metric summary CSV."""
+    return {"kind": "average_throughput", "output": output, "inputs": [summary_csv]}
+
+
+def render_all(jobs, output_dir, workers=None, max_points=2000, force=False):
+    """Renders jobs in parallel worker processes, skipping unchanged figures.
+
+    Returns (rendered, skipped) output names. The fingerprints of rendered
+    figures are kept in a manifest file in output_dir.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    pending, skipped = [], []
+    for job in jobs:
+        fingerprint = job_fingerprint(job, max_points)
+        up_to_date = manifest.get(job["output"]) == fingerprint and \
+            os.path.exists(os.path.join(output_dir, job["output"]))
+        if up_to_date and not force:
+            skipped.append(job["output"])
+        else:
+            pending.append((job, fingerprint))
+
+    rendered = []
+    if pending:
+        if workers == 1 or len(pending) == 1:
+            outputs = [render_figure(job, output_dir, max_points) for job, _ in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outputs = list(pool.map(
+                    render_figure,
+                    [job for job, _ in pending],
+                    [output_dir] * len(pending),
+                    [max_points] * len(pending),
+                    chunksize=max(1, len(pending) // (4 * (workers or os.cpu_count() or 1)))
+                ))
+        for (job, fingerprint), output in zip(pending, outputs):
+            manifest[output] = fingerprint
+            rendered.append(output)
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return rendered, skipped
+
+
+if __name__ == "__main__":
+    # python -m path_sim.plotting [result_dir] [output_dir]
+    RESULT_DIR = sys.argv[1] if len(sys.argv) > 1 else "results"
+    OUTPUT_DIR = sys.argv[2] if len(sys.argv) > 2 else os.path.join(RESULT_DIR, "plots")
+
+    rendered, skipped = render_all(plan_sweep_figures(RESULT_DIR), OUTPUT_DIR)
+    print(f"Rendered {len(rendered)} figures, skipped {len(skipped)} unchanged, into {OUTPUT_DIR}")
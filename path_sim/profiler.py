@@ -0,0 +1,123 @@
+import copy
+import sys
+import time
+import tracemalloc
+
+# ==============================================================================
+# RUN INSTRUMENTATION: wall time, allocations per phase, trace size and peak RSS
+# ==============================================================================
+#
+# Every Simulator carries a RunProfiler. Wall time per phase is always
+# recorded; with profile_memory=True tracemalloc also charges the net
+# allocation of each phase (slower, so off by default). Phases that repeat
+# every step ("step", "log") accumulate over the run.
+#
+# Peak RSS is per run: a RunProfiler resets the kernel's high-water mark
+# (VmHWM, Linux only) when it starts, so a sweep worker's earlier, larger
+# runs do not leak into later rows. Where the mark cannot be reset the
+# process-lifetime peak says nothing about one run, and peak_rss_mb is None;
+# alloc_peak_mb (profile_memory=True) is then the per-run memory figure.
+# Runs of a multi-engine batch share one step loop: batched_runs is the
+# number of runs in the batch (None for a run simulated on its own).
+
+# Cost fields of Simulator.run_cost(), in the order they are stored in run metadata
+COST_COLUMNS = ("wall_seconds", "steps_per_second", "peak_rss_mb", "trace_mb", "alloc_peak_mb", "batched_runs")
+
+
+def reset_peak_rss():
+    """Restarts the peak RSS of this process at its current RSS; False where the OS cannot."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_bytes():
+    """Peak resident set size since the last reset_peak_rss(), or None where unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def trace_nbytes(log_data):
+    """Bytes held by a list of log rows: the list, each row dict and its float values.
+
+    Rows share their keys (and small ints are cached), so one row is measured
+    and scaled by the row count.
+    """
+    if not log_data:
+        return sys.getsizeof(log_data)
+    row = log_data[0]
+    row_bytes = sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values() if isinstance(v, float))
+    return sys.getsizeof(log_data) + row_bytes * len(log_data)
+
+
+class RunProfiler:
+    """Charges the time (and allocation) between consecutive lap() calls to named phases."""
+
+    def __init__(self, trace_malloc=False):
+        self.trace_malloc = trace_malloc
+        self._started_tracing = False
+        if trace_malloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+        self.rss_per_run = reset_peak_rss()
+        self.phases = {}
+        self._cost = None
+        self._start = self._last_time = time.perf_counter()
+        self._last_alloc = self._traced()
+
+    def _traced(self):
+        return tracemalloc.get_traced_memory()[0] if self.trace_malloc else 0
+
+    def lap(self, name):
+        """Charges everything since the previous lap to phase `name`."""
+        now, alloc = time.perf_counter(), self._traced()
+        phase = self.phases.setdefault(name, {"seconds": 0.0, "alloc_bytes": 0})
+        phase["seconds"] += now - self._last_time
+        phase["alloc_bytes"] += alloc - self._last_alloc
+        self._last_time, self._last_alloc = now, alloc
+
+    def summary(self, steps, log_data):
+        """Cost of the run: COST_COLUMNS plus the per-phase breakdown.
+
+        The first call measures the cost and stops tracemalloc if this
+        profiler started it; later calls return the same numbers.
+        """
+        if self._cost is None:
+            self._cost = self._measure(steps, log_data)
+        return copy.deepcopy(self._cost)
+
+    def _measure(self, steps, log_data):
+        wall = self._last_time - self._start
+        # Steps per second counts the step loop only, not setup or saving
+        loop = sum(phase["seconds"] for name, phase in self.phases.items() if name not in ("setup", "save"))
+        rss = peak_rss_bytes() if self.rss_per_run else None
+        cost = {
+            "wall_seconds": round(wall, 4),
+            "steps_per_second": round(steps / loop, 1) if loop > 0 else None,
+            "peak_rss_mb": round(rss / 2**20, 1) if rss is not None else None,
+            "trace_mb": round(trace_nbytes(log_data) / 2**20, 2),
+            "alloc_peak_mb": None,
+            "batched_runs": None,
+            "phases": {
+                name: {"seconds": round(phase["seconds"], 4),
+                       **({"alloc_mb": round(phase["alloc_bytes"] / 2**20, 2)} if self.trace_malloc else {})}
+                for name, phase in self.phases.items()
+            },
+        }
+        if self.trace_malloc:
+            cost["alloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+        return cost
@@ -0,0 +1,98 @@
+import math
+import random
+
+# ==============================================================================
+# AMORTIZED RE-EVALUATION: agents re-run their strategy on a schedule
+# ==============================================================================
+#
+# By default every agent calls choose_new_path on every step. A schedule
+# limits that to the agents that are due, so strategy cost drops by the
+# re-evaluation factor and probing looks more like real endpoints:
+#
+#   {"mode": "period", "interval": 10}       every 10 steps, random phase per agent
+#   {"mode": "poisson", "interval": 10}      exponential gaps with a mean of 10 steps
+#   {"mode": "congestion", "interval": 50}   when the agent's own path is congested,
+#                                            and at least every 50 steps otherwise
+#
+# Agents that are not due keep their path; their cwnd is still updated.
+
+REEVALUATION_MODES = ("period", "poisson", "congestion")
+
+
+class TimingWheel:
+    """Buckets agent indexes by the step at which they are next due.
+
+    Slots are indexed by step modulo the wheel size. Entries carry their due
+    step, so delays longer than the wheel stay in their slot until the wheel
+    comes round to the right lap.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.slots = [[] for _ in range(size)]
+
+    def schedule(self, index, due):
+        self.slots[due % self.size].append((due, index))
+
+    def pop_due(self, t):
+        """Removes and returns the (due, index) entries due at step t."""
+        slot = self.slots[t % self.size]
+        if not slot:
+            return []
+        due = [entry for entry in slot if entry[0] == t]
+        if len(due) < len(slot):
+            slot[:] = [entry for entry in slot if entry[0] != t]
+        else:
+            slot.clear()
+        return due
+
+
+class ReevaluationSchedule:
+    """Decides which agents re-evaluate their path at each step."""
+
+    def __init__(self, num_agents, mode="period", interval=10):
+        if mode not in REEVALUATION_MODES:
+            raise ValueError(f"Unknown re-evaluation mode: {mode}")
+        if interval < 1:
+            raise ValueError("The re-evaluation interval must be at least 1 step")
+        self.mode = mode
+        self.interval = interval
+        self.wheel = TimingWheel(max(1, math.ceil(interval)))
+        # Step at which each agent is next due; wheel entries that disagree are stale
+        self.next_due = [0] * num_agents
+        for i in range(num_agents):
+            if mode == "period":
+                first = random.randrange(math.ceil(interval))
+            else:
+                first = self._gap() - 1
+            self._schedule(i, first)
+
+    def _gap(self):
+        """Steps until the next re-evaluation of one agent."""
+        if self.mode == "poisson":
+            return max(1, math.ceil(random.expovariate(1 / self.interval)))
+        return math.ceil(self.interval)
+
+    def _schedule(self, index, due):
+        self.next_due[index] = due
+        self.wheel.schedule(index, due)
+
+    def due(self, t, congested=()):
+        """Sorted indexes of the agents re-evaluating at step t, rescheduled for later.
+
+        congested holds the indexes of agents whose path is congested at t;
+        they are due immediately in "congestion" mode.
+        """
+        due = {index for due_at, index in self.wheel.pop_due(t) if self.next_due[index] == due_at}
+        if self.mode == "congestion":
+            due.update(congested)
+        due = sorted(due)
+        for index in due:
+            self._schedule(index, t + self._gap())
+        return due
+
+
+def make_schedule(reevaluation, num_agents):
+    """Accepts a ReevaluationSchedule or a spec dict such as {"mode": "period", "interval": 10}."""
+    if reevaluation is None or isinstance(reevaluation, ReevaluationSchedule):
+        return reevaluation
+    return ReevaluationSchedule(num_agents, **reevaluation)
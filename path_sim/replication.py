@@ -0,0 +1,153 @@
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .main import create_topology_file
+from .stats import mean_confidence_interval, replications_needed
+from .sweep import load_spec, build_simulator
+
+# ==============================================================================
+# SEQUENTIAL REPLICATION: add seeds to a cell until its confidence interval is tight
+# ==============================================================================
+#
+# Configured by a "replication" section in a sweep spec:
+#
+#   "replication": {"metric": "oscillation", "target_half_width": 1.0,
+#                   "relative_half_width": 0.05, "min_seeds": 3, "max_seeds": 30,
+#                   "output_file": "results/replication_oscillation.csv"}
+#
+# A cell (strategy, agents) has converged when the 95% half width of its
+# metric is at most target_half_width, or at most relative_half_width x
+# |mean| (either may be omitted). Cells are seeded 0, 1, 2, ... and only
+# re-evaluated once all their in-flight seeds are back, so the seeds a cell
+# ends up with do not depend on worker timing.
+
+
+def evaluate_seed(config_filepath, duration, engine, engine_options, strategy, num_agents, seed, metric):
+    """Metric value of one replication (runs in a worker process)."""
+    import pandas as pd
+    from .metrics import run_metrics
+
+    sim = build_simulator(engine, config_filepath, num_agents, duration, strategy, seed=seed, **engine_options)
+    sim.run()
+    return run_metrics(pd.DataFrame(sim.log_data), [metric])[metric]
+
+
+class ReplicationController:
+    """Schedules replications of every cell across a worker pool.
+
+    Noisy cells get more seeds: after each round, a cell that has not
+    converged is given as many new seeds as its current variance says it
+    needs (at least one, at most max_seeds in total).
+    """
+    def __init__(self, spec, metric, target_half_width=None, relative_half_width=None,
+                 min_seeds=3, max_seeds=30, workers=None):
+        if target_half_width is None and relative_half_width is None:
+            raise ValueError("Set target_half_width and/or relative_half_width")
+        self.spec = spec
+        self.metric = metric
+        self.target_half_width = target_half_width
+        self.relative_half_width = relative_half_width
+        self.min_seeds = max(2, min_seeds)
+        self.max_seeds = max(self.min_seeds, max_seeds)
+        self.workers = workers or spec.get("workers", 1)
+        self.config_file = os.path.join(spec["base_dir"], spec["topology"]["file"])
+
+    def target(self, mean):
+        """Half width a cell with this mean has to reach."""
+        targets = []
+        if self.target_half_width is not None:
+            targets.append(self.target_half_width)
+        if self.relative_half_width is not None:
+            targets.append(self.relative_half_width * abs(mean))
+        return max(targets)
+
+    def converged(self, values):
+        mean, half_width = mean_confidence_interval(values)
+        return half_width <= self.target(mean)
+
+    def run(self):
+        """Replicates every cell of the spec; returns one summary row per cell."""
+        cells = [(strategy, num_agents) for strategy in self.spec["strategies"]
+                 for num_agents in self.spec["agent_counts"]]
+        values = {cell: {} for cell in cells}
+        started = {cell: 0 for cell in cells}
+        in_flight = {cell: 0 for cell in cells}
+        pool_type = ThreadPoolExecutor if self.workers == 1 else ProcessPoolExecutor
+
+        with pool_type(max_workers=self.workers) as pool:
+            pending = {}
+
+            def submit(cell, count):
+                for _ in range(count):
+                    seed = started[cell]
+                    future = pool.submit(
+                        evaluate_seed, self.config_file, self.spec["duration"],
+                        self.spec.get("engine", "reference"), self.spec.get("engine_options", {}),
+                        cell[0], cell[1], seed, self.metric
+                    )
+                    pending[future] = (cell, seed)
+                    started[cell] += 1
+                    in_flight[cell] += 1
+
+            for cell in cells:
+                submit(cell, self.min_seeds)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cell, seed = pending.pop(future)
+                    values[cell][seed] = future.result()
+                    in_flight[cell] -= 1
+                    if in_flight[cell] or started[cell] >= self.max_seeds:
+                        continue
+                    sample = [values[cell][s] for s in sorted(values[cell])]
+                    if not self.converged(sample):
+                        mean, _ = mean_confidence_interval(sample)
+                        needed = replications_needed(sample, self.target(mean), self.max_seeds)
+                        submit(cell, needed - started[cell])
+
+        rows = []
+        for strategy, num_agents in cells:
+            sample = [values[(strategy, num_agents)][s] for s in sorted(values[(strategy, num_agents)])]
+            mean, half_width = mean_confidence_interval(sample)
+            rows.append({
+                "strategy": strategy,
+                "agents": num_agents,
+                "metric": self.metric,
+                "mean": round(mean, 4),
+                "ci95_low": round(mean - half_width, 4),
+                "ci95_high": round(mean + half_width, 4),
+                "seeds": len(sample),
+                "converged": self.converged(sample),
+            })
+        return rows
+
+
+def replicate(spec, workers=None):
+    """Runs the replication section of a spec and writes its summary."""
+    import pandas as pd
+
+    options = dict(spec["replication"])
+    output_file = options.pop("output_file", None)
+    controller = ReplicationController(spec, workers=workers, **options)
+
+    create_topology_file(controller.config_file, paths=spec["topology"]["paths"])
+    try:
+        rows = controller.run()
+    finally:
+        os.remove(controller.config_file)
+
+    summary = pd.DataFrame(rows)
+    if output_file:
+        output_file = os.path.join(spec["base_dir"], output_file)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        summary.to_csv(output_file, index=False)
+    return summary
+
+
+if __name__ == "__main__":
+    # python -m path_sim.replication sweep.json
+    summary = replicate(load_spec(sys.argv[1]))
+    print("\n=== Sequential replication ===\n")
+    print(summary.to_string(index=False))
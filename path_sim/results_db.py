@@ -0,0 +1,166 @@
+import io
+import sqlite3
+import zlib
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .profiler import COST_COLUMNS
+
+# ==============================================================================
+# RESULTS DATABASE: run metadata and traces in one SQLite file
+# ==============================================================================
+#
+# Replaces the results_*.csv + .meta.json pairs when a database is given to
+# Simulator.save_results / create_meta_file. Runs are keyed by the name their
+# CSV would have had, metadata columns are indexed, and each trace is stored
+# as one compressed CSV blob:
+#
+#   db = ResultsDB("results/results.db")
+#   runs = db.find_runs(strategy="blest", min_agents=250)
+#   df = db.load_trace(runs["name"].iloc[0])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    name TEXT PRIMARY KEY,
+    experiment TEXT,
+    strategy TEXT,
+    agents INTEGER,
+    topology TEXT,
+    duration INTEGER,
+    wall_seconds REAL,
+    steps_per_second REAL,
+    peak_rss_mb REAL,
+    trace_mb REAL,
+    alloc_peak_mb REAL,
+    batched_runs INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_strategy_agents ON runs (strategy, agents);
+CREATE INDEX IF NOT EXISTS runs_experiment ON runs (experiment, strategy, agents);
+CREATE TABLE IF NOT EXISTS traces (
+    name TEXT PRIMARY KEY,
+    num_rows INTEGER,
+    data BLOB
+);
+"""
+
+META_COLUMNS = ("experiment", "strategy", "agents", "topology", "duration") + COST_COLUMNS
+
+
+def _schema_types():
+    """Declared type of every column of the runs table in SCHEMA."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.executescript(SCHEMA)
+        return {row[1]: row[2] for row in conn.execute("PRAGMA table_info(runs)")}
+    finally:
+        conn.close()
+
+
+class ResultsDB:
+    """Run metadata and traces in one SQLite file.
+
+    A connection is opened per call, so one database can be written by the
+    worker processes of a sweep (SQLite serializes the writes).
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            # Databases written before runs recorded their cost lack those columns
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+            types = _schema_types()
+            for column in COST_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {types[column]}")
+
+    @contextmanager
+    def _connect(self):
+        """A connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.filepath, timeout=60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def save_meta(self, name, **meta):
+        """Inserts or updates the metadata row of a run."""
+        values = [meta.get(column) for column in META_COLUMNS]
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO runs (name, {', '.join(META_COLUMNS)}) VALUES ({', '.join('?' * (len(META_COLUMNS) + 1))}) "
+                f"ON CONFLICT(name) DO UPDATE SET "
+                + ", ".join(f"{column} = excluded.{column}" for column in META_COLUMNS),
+                [name] + values
+            )
+
+    def load_meta(self, name):
+        """The metadata row of one run as a dict, or None if it has none."""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(META_COLUMNS)} FROM runs WHERE name = ?", (name,)).fetchone()
+        return dict(zip(META_COLUMNS, row)) if row is not None else None
+
+    def save_trace(self, name, log_data):
+        """Stores a trace (list of log rows or DataFrame) under a run name."""
+        df = log_data if isinstance(log_data, pd.DataFrame) else pd.DataFrame(log_data)
+        blob = zlib.compress(df.to_csv(index=False).encode())
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO traces (name, num_rows, data) VALUES (?, ?, ?)",
+                         (name, len(df), blob))
+
+    def copy_trace(self, source, target):
+        """Stores the trace of run `source` again under `target`, without decoding it."""
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO traces (name, num_rows, data) "
+                         "SELECT ?, num_rows, data FROM traces WHERE name = ?", (target, source))
+
+    def load_trace(self, name, usecols=None, chunksize=None):
+        """The trace of one run as a DataFrame, as pd.read_csv would return it.
+
+        With a chunksize, an iterator of DataFrames of that many rows instead.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM traces WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No trace stored for {name}")
+        return pd.read_csv(io.BytesIO(zlib.decompress(row[0])), usecols=usecols, chunksize=chunksize)
+
+    def find_runs(self, experiment=None, strategy=None, min_agents=None, max_agents=None):
+        """Metadata of the runs matching every given filter, using the indexes."""
+        clauses, params = [], []
+        if experiment is not None:
+            clauses.append("experiment = ?")
+            params.append(experiment)
+        if strategy is not None:
+            clauses.append("strategy = ?")
+            params.append(strategy)
+        if min_agents is not None:
+            clauses.append("agents >= ?")
+            params.append(min_agents)
+        if max_agents is not None:
+            clauses.append("agents <= ?")
+            params.append(max_agents)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                f"SELECT name, {', '.join(META_COLUMNS)} FROM runs{where} "
+                f"ORDER BY experiment, strategy, agents", conn, params=params
+            )
+
+    def iter_runs(self, usecols=None, chunksize=None, **filters):
+        """Yields (metadata dict, trace DataFrame) for every matching run that has a trace.
+
+        With a chunksize, the trace is an iterator of chunks (see load_trace).
+        """
+        for meta in self.find_runs(**filters).to_dict("records"):
+            try:
+                yield meta, self.load_trace(meta["name"], usecols=usecols, chunksize=chunksize)
+            except FileNotFoundError:
+                continue
+
+
+def open_db(db):
+    """Accepts a ResultsDB or a database file path."""
+    return db if isinstance(db, ResultsDB) else ResultsDB(db)
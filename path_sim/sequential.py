@@ -0,0 +1,155 @@
+from .main import depends_on
+
+# ==============================================================================
+# SEQUENTIAL UPDATES: load-based decisions that see earlier switches in the step
+# ==============================================================================
+#
+# By default min_load and blest decide from the loads at the start of the
+# step: the argmin is computed once per step (MemoizedStrategy) and every
+# agent takes it, so a step costs O(paths + agents). With sequential updates
+# each agent instead sees the loads as left by the agents before it: a
+# switching agent removes the window it was counted with from its old path
+# (never below zero) and puts the reset window (2.0) on its new one. The
+# Simulator calls observe() once per step, before any agent updates its
+# cwnd, to record those windows and heapify the loads in O(paths); a
+# decision is then an O(1) peek and a switch two O(log paths) key updates.
+#
+# Ties go to the lowest path index, as with PathState.argmin.
+
+SEQUENTIAL_STRATEGIES = ("min_load", "blest", "blest_measured")
+
+# cwnd an agent restarts from when it switches (see Agent.choose_new_path)
+SWITCH_CWND = 2.0
+
+
+class IndexedMinHeap:
+    """Binary min-heap of (key, index) with O(log n) updates of any index's key."""
+
+    def __init__(self, keys, indexes):
+        self.keys = {i: keys[i] for i in indexes}
+        self.heap = list(self.keys)
+        self.position = {i: pos for pos, i in enumerate(self.heap)}
+        # Bottom-up heapify: O(n) instead of sorting
+        for pos in reversed(range(len(self.heap) // 2)):
+            self._sift_down(pos)
+
+    def __contains__(self, index):
+        return index in self.position
+
+    def peek(self):
+        """Index with the smallest key (lowest index among equal keys)."""
+        return self.heap[0]
+
+    def update(self, index, key):
+        """Changes the key of an index and restores the heap order."""
+        old = self.keys[index]
+        self.keys[index] = key
+        if (key, index) < (old, index):
+            self._sift_up(self.position[index])
+        else:
+            self._sift_down(self.position[index])
+
+    def _less(self, a, b):
+        return (self.keys[a], a) < (self.keys[b], b)
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i]] = i
+        self.position[heap[j]] = j
+
+    def _sift_up(self, pos):
+        while pos > 0:
+            parent = (pos - 1) // 2
+            if not self._less(self.heap[pos], self.heap[parent]):
+                break
+            self._swap(pos, parent)
+            pos = parent
+
+    def _sift_down(self, pos):
+        size = len(self.heap)
+        while True:
+            smallest = pos
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < size and self._less(self.heap[child], self.heap[smallest]):
+                    smallest = child
+            if smallest == pos:
+                return
+            self._swap(pos, smallest)
+            pos = smallest
+
+
+class SequentialLoadBalancer:
+    """min_load / blest whose per-step loads follow every switch made during the step.
+
+    observe() starts each step from its PathState and the agents' windows;
+    select() is the strategy callable the agents hold, updating the heap in
+    agent order.
+    """
+
+    def __init__(self, strategy_name, rtt_factor=1.5):
+        if strategy_name not in SEQUENTIAL_STRATEGIES:
+            raise ValueError(f"Strategy does not support sequential updates: {strategy_name}")
+        self.strategy_name = strategy_name
+        self.rtt_factor = rtt_factor
+        self.heap = None
+        self.index_of = None
+        # cwnd each agent was counted with in this step's loads, by agent id
+        self.windows = None
+
+    def _candidates(self, path_state):
+        """Path indexes the strategy chooses among at this step."""
+        if self.strategy_name == "min_load":
+            return range(len(path_state.ids))
+        rtts = path_state.rtt_ms if self.strategy_name == "blest_measured" else path_state.base_rtt_ms
+        best_rtt = min(rtts)
+        return [i for i, rtt in enumerate(rtts) if rtt <= best_rtt * self.rtt_factor]
+
+    def observe(self, agents, path_state):
+        """Starts a step: heapifies its loads and records the window each agent was counted with."""
+        self.heap = IndexedMinHeap(path_state.load, self._candidates(path_state))
+        self.index_of = {path_id: i for i, path_id in enumerate(path_state.ids)}
+        self.windows = {agent.id: agent.cwnd for agent in agents}
+
+    @depends_on("agent_state", "path_state")
+    def select(self, agent, topology, path_state):
+        """Strategy callable: the least loaded candidate now, then moves the agent's window."""
+        heap = self.heap
+        new = heap.peek()
+        old = self.index_of[agent.current_path.id]
+        if new != old:
+            if old in heap:
+                heap.update(old, max(heap.keys[old] - self.windows[agent.id], 0.0))
+            heap.update(new, heap.keys[new] + SWITCH_CWND)
+        return topology.paths[new]
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import time
+    from .main import Simulator, create_topology_file, reset_strategy_state
+
+    # Many paths, few agents each: per-step decisions cost O(paths) once,
+    # sequential ones O(log paths) per switching agent
+    CONFIG_FILE = "topology_large.json"
+    num_paths = 2000
+    rng = random.Random(0)
+    create_topology_file(CONFIG_FILE, paths=[
+        {"id": f"path_{i}", "capacity_mbps": rng.choice([10, 50, 100]), "base_rtt_ms": rng.randint(10, 100),
+         "attributes": []}
+        for i in range(num_paths)
+    ])
+
+    for strategy in ("min_load", "blest"):
+        for sequential in (False, True):
+            reset_strategy_state()
+            random.seed(0)
+            sim = Simulator(CONFIG_FILE, 5000, 50, strategy, trace="paths", sequential_updates=sequential)
+            start = time.perf_counter()
+            sim.run()
+            elapsed = time.perf_counter() - start
+            loads = [sim.log_data[-1][f"path_{i}_load"] for i in range(num_paths)]
+            print(f"{strategy} {'sequential' if sequential else 'per-step'}: {elapsed / 50 * 1000:.1f} ms/step, "
+                  f"paths in use {sum(load > 0 for load in loads)}, total loss {sim.log_data[-1]['total_loss']}")
+    os.remove(CONFIG_FILE)
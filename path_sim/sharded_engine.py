@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .main import Simulator
+from .memory import CWND_DTYPE, path_index_dtype
+from .congestion import PathStateArrays, population_groups
+from .sketch import CwndSketch, merge_sketches
+from .strategy_codes import SHARD_STRATEGIES, SHARD_STRATEGY_NAMES
+from .vector_step import PathTables, StrategyState, choose_paths, static_choice, step_target
+
+# ==============================================================================
+# SHARDED ENGINE: agent state in arrays, shards processed by a thread pool
+# ==============================================================================
+
+
+class AgentShard:
+    """A contiguous slice of the agent population with its own random stream.
+
+    The random stream is seeded from (seed, shard index), so the result does
+    not depend on which thread processes the shard or how many threads exist.
+    The shard is cut into segments, one per population group it overlaps,
+    each with its congestion-control model and that model's state arrays.
+    """
+    def __init__(self, shard_index, start, num_agents, num_paths, seed, groups):
+        self.rng = np.random.default_rng([seed, shard_index])
+        self.index_dtype = path_index_dtype(num_paths)
+        self.path_idx = self.rng.integers(num_paths, size=num_agents, dtype=self.index_dtype)
+        self.cwnd = self.rng.uniform(1.0, 5.0, size=num_agents).astype(CWND_DTYPE)
+        self.strategy_state = StrategyState(num_agents, self.index_dtype, np.float32)
+        self.segments = []
+        for group_start, group_end, model in groups:
+            lo, hi = max(start, group_start), min(start + num_agents, group_end)
+            if lo < hi:
+                segment = slice(lo - start, hi - start)
+                self.segments.append((segment, model, model.init_state(self.cwnd[segment])))
+
+    def partial_loads(self, num_paths):
+        """Sum of cwnd per path over this shard only."""
+        return np.bincount(self.path_idx, weights=self.cwnd, minlength=num_paths)
+
+    def update(self, strategy, path_state, t, choice, weights, epsilon):
+        """Applies congestion control, the strategy decision and the switch reset in place."""
+        num_paths = path_state.load.shape[0]
+        cwnd = np.empty_like(self.cwnd)
+        for segment, model, state in self.segments:
+            cwnd[segment] = model.update(self.cwnd[segment], self.path_idx[segment], state, t, path_state)
+
+        new = choose_paths(strategy, self.strategy_state, slice(None), choice, weights, num_paths,
+                           rng=self.rng, epsilon=epsilon)
+
+        switched = new != self.path_idx
+        cwnd[switched] = 2.0
+        for segment, model, state in self.segments:
+            model.on_switch(state, switched[segment], t, cwnd[segment])
+        self.path_idx = new.astype(self.index_dtype, copy=False)
+        self.cwnd = cwnd
+        return cwnd.sum(dtype=np.float64)
+
+
+class ShardedSimulator(Simulator):
+    """Simulator for very large populations, sharded across a thread pool.
+
+    Agents are not materialised as Agent objects; their state lives in
+    per-shard NumPy arrays. Each step, shards compute partial path loads that
+    are reduced in shard order, then update cwnd and paths independently.
+    The shard layout depends only on shard_size, so results are identical for
+    any num_threads. State uses compact dtypes (float32 cwnd, int16/int32 path
+    index). Per-agent columns are never logged: trace is "paths" or "cwnd",
+    whose per-shard sketches are merged in shard order.
+
+    congestion_control selects the cwnd model (see congestion.py): a model or
+    its name for the whole population, or a list of (fraction, model) pairs
+    for contiguous population groups. The default is AIMD as in Agent.
+    """
+    ENGINE = "sharded"
+    STRATEGIES = SHARD_STRATEGY_NAMES
+
+    def __init__(self, config_filepath, num_agents, duration, strategy_name,
+                 num_threads=None, shard_size=65536, seed=0, epsilon=0.1, telemetry=None,
+                 memory_budget_mb=None, congestion_control="aimd", trace="paths", profile_memory=False):
+        if trace == "agents":
+            raise ValueError("The sharded engine does not log per-agent columns")
+        self.congestion_control = congestion_control
+        self.num_threads = num_threads or os.cpu_count()
+        self.shard_size = shard_size
+        self.seed = seed
+        self.epsilon = epsilon
+        super().__init__(config_filepath, num_agents, duration, strategy_name, telemetry=telemetry,
+                         trace=trace, memory_budget_mb=memory_budget_mb, profile_memory=profile_memory)
+        if self.events is not None:
+            raise ValueError("Topology events are not supported by the sharded engine")
+
+    def _create_agents(self):
+        """Creates the agent shards; returns an empty Agent list."""
+        num_paths = len(self.topology.paths)
+        groups = population_groups(self.num_agents, self.congestion_control)
+        self.shards = [
+            AgentShard(i, start, min(self.shard_size, self.num_agents - start), num_paths, self.seed, groups)
+            for i, start in enumerate(range(0, self.num_agents, self.shard_size))
+        ]
+        return []
+
+    def run(self):
+        """The main loop, with both per-agent phases fanned out over shards."""
+        print(f"\nStarting sharded simulation with {self.num_agents} agents for {self.duration} steps "
+              f"({len(self.shards)} shards, {self.num_threads} threads)...")
+        paths = self.topology.paths
+        num_paths = len(paths)
+        tables = PathTables(self.topology)
+        strategy = SHARD_STRATEGIES[self.strategy_func]
+        static = static_choice(strategy, self.strategy_func, self.topology)
+        self.profiler.lap("setup")
+
+        with ThreadPoolExecutor(max_workers=self.num_threads) as pool:
+            for t in range(self.duration):
+                # 1. Partial loads per shard, reduced in shard order
+                loads = np.zeros(num_paths)
+                for partial in pool.map(lambda s: s.partial_loads(num_paths), self.shards):
+                    loads += partial
+
+                # 2. Shared, read-only path state table for this step
+                path_state = PathStateArrays(loads, tables.capacity, tables.base_rtt)
+
+                # 3. Per-step decision target, then independent shard updates
+                choice = step_target(strategy, loads, tables.blest_mask, static)
+                throughputs = list(pool.map(
+                    lambda s: s.update(strategy, path_state, t, choice, tables.weights, self.epsilon),
+                    self.shards
+                ))
+                self.profiler.lap("step")
+
+                # 4. Log aggregate state for the current time step `t`
+                log_entry = {
+                    'timestep': t,
+                    'total_throughput': float(sum(throughputs))
+                }
+                for path, load in zip(paths, loads.tolist()):
+                    log_entry[f'{path.id}_load'] = round(load, 2)
+                path_loss = [round(x, 2) for x in path_state.loss.tolist()]
+                for path, x in zip(paths, path_loss):
+                    log_entry[f'{path.id}_loss'] = x
+                log_entry['total_loss'] = round(sum(path_loss), 2)
+                if self.trace == "cwnd":
+                    sketch = merge_sketches(pool.map(
+                        lambda s: CwndSketch.from_arrays(s.cwnd, s.path_idx, num_paths), self.shards
+                    ))
+                    log_entry.update(self._cwnd_columns(sketch, [path.id for path in paths]))
+                self.log_data.append(log_entry)
+
+                if self.telemetry is not None:
+                    path_ids = [path.id for path in paths]
+                    self._publish_step(
+                        t, dict(zip(path_ids, loads.tolist())), dict(zip(path_ids, path_loss)),
+                        {path_id for path_id, c in zip(path_ids, path_state.congested.tolist()) if c},
+                        log_entry['total_throughput']
+                    )
+                self.profiler.lap("log")
+
+        print("Simulation finished.")
@@ -0,0 +1,120 @@
+import numpy as np
+
+# ==============================================================================
+# CWND DISTRIBUTION SKETCH: constant-size per-step summaries of every agent's cwnd
+# ==============================================================================
+#
+# trace="cwnd" replaces the agent_{id}_cwnd columns with a handful of
+# columns per step, overall and per path:
+#
+#   cwnd_p50, cwnd_p90, cwnd_p99, cwnd_min, cwnd_max, cwnd_gini
+#   {path_id}_cwnd_p50, ..., {path_id}_cwnd_gini
+#
+# The sketch behind them is a fixed-bin histogram per path: count and cwnd
+# sum per log-spaced bin (BINS_PER_OCTAVE bins per doubling, so quantiles are
+# within ~4.4%), plus exact min and max. Sketches of disjoint agent sets
+# (shards) or of different runs (replications) merge by adding counts and
+# sums, so the summary of a merge equals the summary of the pooled agents.
+# The Gini coefficient treats the agents of a bin as equal, so it is a
+# (tight) lower bound.
+
+CWND_QUANTILES = (50, 90, 99)
+CWND_STATS = tuple(f"p{q}" for q in CWND_QUANTILES) + ("min", "max", "gini")
+
+BINS_PER_OCTAVE = 16
+NUM_OCTAVES = 24
+
+
+def cwnd_columns(path_ids):
+    """Column names of the sketch summary, overall first, then per path."""
+    return [f"cwnd_{stat}" for stat in CWND_STATS] + \
+        [f"{path_id}_cwnd_{stat}" for path_id in path_ids for stat in CWND_STATS]
+
+
+class CwndSketch:
+    """Mergeable fixed-bin histogram of cwnd per path."""
+
+    num_bins = BINS_PER_OCTAVE * NUM_OCTAVES
+
+    def __init__(self, num_paths):
+        self.num_paths = num_paths
+        self.counts = np.zeros((num_paths, self.num_bins))
+        self.sums = np.zeros((num_paths, self.num_bins))
+        self.mins = np.full(num_paths, np.inf)
+        self.maxs = np.full(num_paths, -np.inf)
+
+    @classmethod
+    def from_arrays(cls, cwnd, path_idx, num_paths, weights=None):
+        return cls(num_paths).add(cwnd, path_idx, weights)
+
+    def add(self, cwnd, path_idx, weights=None):
+        """Adds agents (cwnd, path index) in one vectorized pass; weights count agents fractionally."""
+        cwnd = np.asarray(cwnd, dtype=np.float64)
+        path_idx = np.asarray(path_idx, dtype=np.int64)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            present = weights > 0
+            cwnd, path_idx, weights = cwnd[present], path_idx[present], weights[present]
+        if cwnd.size == 0:
+            return self
+        # cwnd >= 1, so bin 0 starts at 1.0; larger values share the top bin
+        bins = np.clip((np.log2(np.maximum(cwnd, 1.0)) * BINS_PER_OCTAVE).astype(np.int64), 0, self.num_bins - 1)
+        cells = path_idx * self.num_bins + bins
+        size = self.num_paths * self.num_bins
+        self.counts += np.bincount(cells, weights=weights, minlength=size).reshape(self.counts.shape)
+        mass = cwnd if weights is None else cwnd * weights
+        self.sums += np.bincount(cells, weights=mass, minlength=size).reshape(self.sums.shape)
+        np.minimum.at(self.mins, path_idx, cwnd)
+        np.maximum.at(self.maxs, path_idx, cwnd)
+        return self
+
+    def merge(self, other):
+        """Adds another sketch of the same paths into this one."""
+        self.counts += other.counts
+        self.sums += other.sums
+        np.minimum(self.mins, other.mins, out=self.mins)
+        np.maximum(self.maxs, other.maxs, out=self.maxs)
+        return self
+
+    @staticmethod
+    def _stats(counts, sums, mins, maxs):
+        """CWND_STATS of every row of (counts, sums); NaN for empty rows."""
+        total = counts.sum(axis=1)
+        empty = total <= 0
+        safe_total = np.where(empty, 1.0, total)
+        means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        cumulative = np.cumsum(counts, axis=1)
+        stats = []
+        for q in CWND_QUANTILES:
+            # First bin whose cumulative count reaches q% of the agents, at that bin's mean
+            index = np.argmax(cumulative >= (q / 100) * safe_total[:, None] - 1e-9, axis=1)
+            value = np.clip(means[np.arange(len(total)), index], mins, maxs)
+            stats.append(value)
+        stats += [mins, maxs]
+        # Gini of grouped data: 1 - sum_i f_i (S_i + S_{i-1}), bins in ascending cwnd order
+        total_sum = sums.sum(axis=1)
+        share = counts / safe_total[:, None]
+        lorenz = np.cumsum(sums, axis=1) / np.where(total_sum > 0, total_sum, 1.0)[:, None]
+        previous = np.concatenate([np.zeros((len(total), 1)), lorenz[:, :-1]], axis=1)
+        stats.append(1.0 - (share * (lorenz + previous)).sum(axis=1))
+        result = np.column_stack(stats)
+        result[empty] = np.nan
+        return result
+
+    def summary(self, path_ids):
+        """Dict of the cwnd_columns(path_ids), rounded like the trace; None for empty paths."""
+        overall = self._stats(self.counts.sum(axis=0, keepdims=True), self.sums.sum(axis=0, keepdims=True),
+                              self.mins.min(keepdims=True), self.maxs.max(keepdims=True))
+        per_path = self._stats(self.counts, self.sums, self.mins, self.maxs)
+        values = np.concatenate([overall.ravel(), per_path.ravel()]).tolist()
+        return {key: (None if value != value else round(value, 4 if key.endswith("gini") else 2))
+                for key, value in zip(cwnd_columns(path_ids), values)}
+
+
+def merge_sketches(sketches):
+    """One sketch holding every agent of the given sketches."""
+    sketches = list(sketches)
+    merged = CwndSketch(sketches[0].num_paths)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
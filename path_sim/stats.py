@@ -0,0 +1,48 @@
+import math
+
+# ==============================================================================
+# STATISTICS HELPERS shared by the adaptive sweep modes
+# ==============================================================================
+
+# Two-sided 95% Student-t quantiles by degrees of freedom (df > 120 uses 1.96)
+T_975 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145,
+    15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086,
+    25: 2.060, 30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980,
+}
+
+
+def t_quantile_975(df):
+    """Student-t 0.975 quantile, conservative (next lower tabulated df) between entries."""
+    if df > 120:
+        return 1.96
+    return T_975[max(k for k in T_975 if k <= df)]
+
+
+def mean_confidence_interval(values):
+    """Returns (mean, half_width) of the 95% confidence interval of the mean.
+
+    The half width is infinite for fewer than two values.
+    """
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, math.inf
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    return mean, t_quantile_975(n - 1) * math.sqrt(variance / n)
+
+
+def replications_needed(values, target_half_width, max_count):
+    """Estimated sample size at which the 95% half width falls to the target.
+
+    Uses the current sample standard deviation; capped at max_count and
+    never below len(values) + 1.
+    """
+    n = len(values)
+    mean, half_width = mean_confidence_interval(values)
+    if half_width == math.inf or target_half_width <= 0:
+        return min(max_count, n + 1)
+    std = half_width / t_quantile_975(n - 1) * math.sqrt(n)
+    needed = math.ceil((t_quantile_975(n - 1) * std / target_half_width) ** 2)
+    return min(max_count, max(n + 1, needed))
@@ -0,0 +1,43 @@
+from .main import (
+    select_min_rtt,
+    select_min_load,
+    select_attribute_aware,
+    select_round_robin,
+    select_weighted_round_robin,
+    select_epsilon_greedy,
+    select_blest,
+)
+
+# ==============================================================================
+# STRATEGY CODES: integer names of the strategies the array engines implement
+# ==============================================================================
+#
+# The compiled kernel (jit_engine.py) and the array engines (sharded, multi,
+# churn, fluid) dispatch on these codes instead of the Python callables.
+# This module imports neither numba nor the engines, so loading an engine
+# only pays for what it uses.
+
+STATIC_CHOICE = 0
+MIN_LOAD = 1
+ROUND_ROBIN = 2
+WEIGHTED_ROUND_ROBIN = 3
+BLEST = 4
+EPSILON_GREEDY = 5
+
+# Strategies that draw random numbers inside the step (epsilon_greedy) are not
+# listed and always run on the pure-Python engine so their random stream stays identical
+KERNEL_STRATEGIES = {
+    select_min_rtt: STATIC_CHOICE,
+    select_attribute_aware: STATIC_CHOICE,
+    select_min_load: MIN_LOAD,
+    select_round_robin: ROUND_ROBIN,
+    select_weighted_round_robin: WEIGHTED_ROUND_ROBIN,
+    select_blest: BLEST,
+}
+
+# The array engines draw from their own generator, so they also run epsilon_greedy
+SHARD_STRATEGIES = {**KERNEL_STRATEGIES, select_epsilon_greedy: EPSILON_GREEDY}
+
+# The same sets by name, for the Simulator.STRATEGIES check made before any allocation
+KERNEL_STRATEGY_NAMES = ("min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin", "blest")
+SHARD_STRATEGY_NAMES = KERNEL_STRATEGY_NAMES + ("epsilon_greedy",)
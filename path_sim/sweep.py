@@ -0,0 +1,405 @@
+import hashlib
+import importlib
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .main import create_topology_file, create_meta_file, reset_strategy_state
+
+# ==============================================================================
+# DECLARATIVE SWEEPS: one engine driven by JSON/TOML sweep specs
+# ==============================================================================
+#
+# A spec describes one experiment:
+#
+#   {
+#     "experiment": "experiment_1",
+#     "duration": 300,
+#     "agent_counts": [10, 25, 50],
+#     "strategies": ["min_rtt", "min_load"],
+#     "topology": {"file": "topology.json", "paths": [...]},
+#     "result_file": "results_experiment1_{strategy}_{agents}_agents.csv",
+#     "log_file": "experiment1_log.txt",
+#     "summary_file": "summary.csv",          (optional)
+#     "database": "results/results.db",       (optional: store runs there instead of CSV files)
+#     "engine": "reference",                  (optional: reference, jit, sharded, multi, churn, fluid)
+#     "engine_options": {"congestion_control": "cubic"},   (optional engine kwargs,
+#                                             e.g. "profile_memory": true for tracemalloc)
+#     "seed": 42,                             (optional)
+#     "workers": 4,                           (optional)
+#     "telemetry_port": 8765                  (optional, sequential sweeps only)
+#   }
+#
+# Relative paths are resolved against the directory of the spec file.
+# The topology is written next to the spec for the duration of the sweep, as
+# <file stem>.<hash of its paths><ext>, so specs that share a directory and a
+# topology file name but not its paths do not overwrite each other.
+#
+# The "multi" engine batches small cells: runs of batchable strategies are
+# grouped (up to MULTI_BATCH_AGENTS agents per batch) and simulated together by
+# multi_engine.MultiScenarioSimulator, which reproduces the reference engine's
+# trace="paths" results. Other strategies run on the reference engine.
+#
+# pandas is only imported by the functions that read results, so worker
+# processes that just simulate and save a run do not pay for it.
+
+ENGINES = {
+    "reference": ("main", "Simulator"),
+    "jit": ("jit_engine", "JitSimulator"),
+    "sharded": ("sharded_engine", "ShardedSimulator"),
+    "churn": ("churn", "ChurnSimulator"),
+    "fluid": ("fluid", "FluidSimulator"),
+}
+
+# Total agents of one multi-engine batch
+MULTI_BATCH_AGENTS = 50_000
+
+
+def load_spec(spec_filepath):
+    """Reads a sweep spec from a .json or .toml file."""
+    if spec_filepath.endswith(".toml"):
+        import tomllib
+        with open(spec_filepath, "rb") as f:
+            spec = tomllib.load(f)
+    else:
+        with open(spec_filepath) as f:
+            spec = json.load(f)
+    spec["base_dir"] = os.path.dirname(os.path.abspath(spec_filepath))
+    return spec
+
+
+def _resolve(spec, relative_path):
+    """Resolves a spec-relative path."""
+    return os.path.join(spec["base_dir"], relative_path)
+
+
+def _topology_file(spec):
+    """The topology file a sweep writes for a spec, keyed by a hash of its paths.
+
+    Specs that share a base_dir and a topology file name but define different
+    paths get different files, so one never overwrites the other mid-sweep.
+    """
+    digest = hashlib.sha1(json.dumps(spec["topology"]["paths"], sort_keys=True).encode()).hexdigest()[:8]
+    stem, ext = os.path.splitext(spec["topology"]["file"])
+    return _resolve(spec, f"{stem}.{digest}{ext}")
+
+
+def _database(spec):
+    """The spec's results database path, or None when results go to CSV files."""
+    return _resolve(spec, spec["database"]) if spec.get("database") else None
+
+
+def _read_result(spec, result_file, usecols=None):
+    """Reads one run's trace from the spec's results database or its CSV file."""
+    database = _database(spec)
+    if database is None:
+        import pandas as pd
+        return pd.read_csv(result_file, usecols=usecols)
+    from .results_db import ResultsDB
+    return ResultsDB(database).load_trace(os.path.basename(result_file), usecols=usecols)
+
+
+def _read_cost(spec, result_file):
+    """The cost fields recorded in one run's metadata (None where not recorded)."""
+    from .profiler import COST_COLUMNS
+
+    database = _database(spec)
+    if database is None:
+        try:
+            with open(result_file.replace(".csv", ".meta.json")) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            meta = {}
+    else:
+        from .results_db import ResultsDB
+        meta = ResultsDB(database).load_meta(os.path.basename(result_file)) or {}
+    return {column: meta.get(column) for column in COST_COLUMNS}
+
+
+def plan_runs(specs):
+    """Expands specs into unique runs, ordered largest cell first.
+
+    Runs whose parameters match (topology content, duration, strategy,
+    agents, engine and seed) are simulated once; every experiment asking for
+    it becomes a target that receives a copy of the result.
+    """
+    unique = {}
+    for spec in specs:
+        topology_key = json.dumps(spec["topology"]["paths"], sort_keys=True)
+        for strategy in spec["strategies"]:
+            for num_agents in spec["agent_counts"]:
+                engine = spec.get("engine", "reference")
+                options = spec.get("engine_options", {})
+                key = (topology_key, spec["duration"], strategy, num_agents, engine,
+                       json.dumps(options, sort_keys=True), spec.get("seed"))
+                run = unique.setdefault(key, {
+                    "config_file": _topology_file(spec),
+                    "duration": spec["duration"],
+                    "strategy": strategy,
+                    "agents": num_agents,
+                    "engine": engine,
+                    "engine_options": options,
+                    "seed": spec.get("seed"),
+                    "targets": [],
+                })
+                run["targets"].append({
+                    "spec": spec,
+                    "result_file": _resolve(spec, spec["result_file"].format(strategy=strategy, agents=num_agents)),
+                })
+    return sorted(unique.values(), key=lambda run: run["agents"] * run["duration"], reverse=True)
+
+
+def build_simulator(engine_name, config_filepath, num_agents, duration, strategy_name, seed=None,
+                    telemetry=None, **engine_options):
+    """Creates a simulator of the named engine, seeded reproducibly when seed is given."""
+    if engine_name == "multi":
+        # A single run is not batched; the reference engine gives the same results
+        trace = "cwnd" if engine_options.get("trace") == "cwnd" else "paths"
+        engine_name, engine_options = "reference", dict(engine_options, trace=trace)
+    module_name, class_name = ENGINES[engine_name]
+    engine = getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+    kwargs = dict(engine_options)
+    # Round-robin counters are keyed by agent id, so a previous run's state would leak in
+    reset_strategy_state()
+    if seed is not None:
+        if engine_name in ("sharded", "churn"):
+            kwargs["seed"] = seed
+        else:
+            random.seed(seed)
+    return engine(
+        config_filepath=config_filepath,
+        num_agents=num_agents,
+        duration=duration,
+        strategy_name=strategy_name,
+        telemetry=telemetry,
+        **kwargs
+    )
+
+
+def execute_run(run, telemetry=None):
+    """Simulates one planned run and saves it to its first target's result file or database.
+
+    Returns the result file and the run's cost (Simulator.run_cost()).
+    """
+    sim = build_simulator(
+        run["engine"], run["config_file"], run["agents"], run["duration"], run["strategy"],
+        seed=run["seed"], telemetry=telemetry, **run["engine_options"]
+    )
+    sim.run()
+    result_file = _save_run(run, sim)
+    return result_file, sim.run_cost()
+
+
+def _save_run(run, sim):
+    """Saves a finished run to its first target's result file or database."""
+    result_file = run["targets"][0]["result_file"]
+    database = _database(run["targets"][0]["spec"])
+    os.makedirs(os.path.dirname(database or result_file), exist_ok=True)
+    sim.save_results(output_filepath=result_file, db=database)
+    return result_file
+
+
+def plan_batches(runs, max_agents=MULTI_BATCH_AGENTS):
+    """Groups the multi-engine runs into batches of at most max_agents agents.
+
+    Runs with a strategy the multi engine cannot batch, with engine options
+    other than trace and profile_memory, or with trace="cwnd", are left out
+    and run on their own.
+    """
+    from .multi_engine import batchable
+
+    batches, batch, size = [], [], 0
+    for run in runs:
+        if run["engine"] != "multi" or not batchable(run["strategy"]) or set(run["engine_options"]) - {"trace", "profile_memory"}:
+            continue
+        if run["engine_options"].get("trace") == "cwnd":
+            continue
+        if batch and size + run["agents"] > max_agents:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(run)
+        size += run["agents"]
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def execute_batch(batch):
+    """Simulates a batch of planned runs in one multi-scenario simulation; saves each run.
+
+    Each run gets its own cost (MultiScenarioSimulator.run_costs()): its share
+    of the batch's wall time, flagged with the number of batched runs.
+    """
+    from .multi_engine import MultiScenarioSimulator
+
+    sim = MultiScenarioSimulator([
+        {"config_file": run["config_file"], "num_agents": run["agents"], "duration": run["duration"],
+         "strategy": run["strategy"], "seed": run["seed"]}
+        for run in batch
+    ], profile_memory=any(run["engine_options"].get("profile_memory") for run in batch))
+    sim.run()
+    result_files = [_save_run(run, scenario) for run, scenario in zip(batch, sim.simulators)]
+    return list(zip(result_files, sim.run_costs()))
+
+
+def _experiment_logger(spec):
+    """A file logger per experiment, in the format the experiment logs use."""
+    logger = logging.getLogger(f"sweep.{spec['experiment']}")
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        log_file = _resolve(spec, spec["log_file"])
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"))
+        logger.addHandler(handler)
+    return logger
+
+
+def _log_run(logger, spec, strategy, num_agents, result_file):
+    """Logs throughput, loss and per-path oscillation of one finished run."""
+    logger.info(f"\n=== Simulation: Strategy={strategy}, Agents={num_agents} ===")
+    df = _read_result(spec, result_file)
+    logger.info(f"Avg Throughput: {df['total_throughput'].mean():.2f} Mbps, "
+                f"Avg Loss: {df['total_loss'].mean():.2f} Mbps")
+    for path in [col for col in df.columns if col.endswith('_load')]:
+        std = df[path].std()
+        peak = df[path].max() - df[path].min()
+        logger.info(f"{path}: std={std:.2f}, peak-to-peak={peak:.2f}")
+
+
+def summarize_experiment(spec, logger):
+    """Logs the comparison summary of an experiment and writes its summary CSV."""
+    import pandas as pd
+    from .metrics import summarize_runs
+
+    logger.info("\n=== Oscillation and Loss Comparison Summary ===")
+    cells, runs, costs = [], [], []
+    for strategy in spec["strategies"]:
+        for num_agents in spec["agent_counts"]:
+            result_file = _resolve(spec, spec["result_file"].format(strategy=strategy, agents=num_agents))
+            try:
+                runs.append((len(cells), _read_result(spec, result_file)))
+            except FileNotFoundError:
+                logger.warning(f"Missing file for {strategy}, {num_agents} agents")
+                continue
+            cells.append((strategy, num_agents))
+            costs.append(_read_cost(spec, result_file))
+
+    # Every metric is computed in one grouped pass over all runs of the experiment
+    names = ["oscillation", "loss", "fairness", "efficiency", "stability", "loss_avoidance"]
+    table = summarize_runs(runs, names)
+    summary_rows = []
+    for (strategy, num_agents), values, cost in zip(cells, table.to_dict("records"), costs):
+        msg = (
+            f"{strategy.upper()} with {num_agents} agents "
+            f"Osc: {values['oscillation']:.2f}, Loss: {values['loss']:.2f} Mbps, "
+            f"Fairness: {values['fairness']:.2f}, Efficiency: {values['efficiency']:.2f}, "
+            f"Stability: {values['stability']:.2f}, LossAvoid: {values['loss_avoidance']:.2f}"
+        )
+        logger.info(msg)
+        print(msg)
+
+        # Cost columns let the summary be sorted by run time and memory
+        summary_rows.append({"strategy": strategy, "agents": num_agents,
+                             **{name: round(values[name], 4) for name in names}, **cost})
+
+    if spec.get("summary_file"):
+        pd.DataFrame(summary_rows).to_csv(_resolve(spec, spec["summary_file"]), index=False)
+        logger.info("Saved experiment summary to summary CSV.")
+
+
+def _copy_result(source_database, source_file, database, result_file):
+    """Copies one run's trace between result files and/or results databases."""
+    if source_database is None and database is None:
+        os.makedirs(os.path.dirname(result_file), exist_ok=True)
+        shutil.copyfile(source_file, result_file)
+        return
+    import pandas as pd
+    from .results_db import ResultsDB
+
+    name = os.path.basename(result_file)
+    if database is None:
+        os.makedirs(os.path.dirname(result_file), exist_ok=True)
+        ResultsDB(source_database).load_trace(os.path.basename(source_file)).to_csv(result_file, index=False)
+    elif source_database == database:
+        ResultsDB(database).copy_trace(os.path.basename(source_file), name)
+    else:
+        df = pd.read_csv(source_file) if source_database is None else \
+            ResultsDB(source_database).load_trace(os.path.basename(source_file))
+        ResultsDB(database).save_trace(name, df)
+
+
+def run_sweep(specs, workers=None):
+    """Plans, executes and summarizes one or more experiment specs."""
+    workers = workers or max(spec.get("workers", 1) for spec in specs)
+    loggers = {spec["experiment"]: _experiment_logger(spec) for spec in specs}
+    for spec in specs:
+        create_topology_file(_topology_file(spec), paths=spec["topology"]["paths"])
+        loggers[spec["experiment"]].info("=== Starting all simulations ===")
+
+    runs = plan_runs(specs)
+    requested = sum(len(run["targets"]) for run in runs)
+    print(f"Planned {len(runs)} unique runs for {requested} requested cells, {workers} worker(s).")
+    batches = plan_batches(runs) if any(run["engine"] == "multi" for run in runs) else []
+    batched = {id(run) for batch in batches for run in batch}
+    single_runs = [run for run in runs if id(run) not in batched]
+    if batches:
+        print(f"Batched {len(batched)} runs into {len(batches)} multi-scenario simulation(s).")
+
+    if workers == 1:
+        # Runs stay in this process, so a live telemetry stream can be attached
+        telemetry = None
+        telemetry_port = next((s["telemetry_port"] for s in specs if s.get("telemetry_port")), None)
+        if telemetry_port is not None:
+            from .telemetry import TelemetryPublisher
+            telemetry = TelemetryPublisher(port=telemetry_port).start()
+        single_results = [execute_run(run, telemetry) for run in single_runs]
+        if telemetry is not None:
+            telemetry.close()
+        batch_results = [execute_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batch_results = pool.map(execute_batch, batches)
+            single_results = list(pool.map(execute_run, single_runs))
+            batch_results = list(batch_results)
+    # (result file, cost) of every run
+    results = dict(zip(map(id, single_runs), single_results))
+    for batch, batch_result in zip(batches, batch_results):
+        results.update(zip(map(id, batch), batch_result))
+
+    # Copy de-duplicated results to every other target and write the metadata
+    for run in runs:
+        result_file, cost = results[id(run)]
+        source_database = _database(run["targets"][0]["spec"])
+        for target in run["targets"]:
+            spec = target["spec"]
+            database = _database(spec)
+            if target["result_file"] != result_file or database != source_database:
+                _copy_result(source_database, result_file, database, target["result_file"])
+            create_meta_file(
+                result_filename=target["result_file"],
+                strategy=run["strategy"],
+                num_agents=run["agents"],
+                config_file=spec["topology"]["file"],
+                duration=run["duration"],
+                experiment=spec["experiment"],
+                db=database,
+                cost=cost
+            )
+            _log_run(loggers[spec["experiment"]], spec, run["strategy"], run["agents"], target["result_file"])
+
+    for spec in specs:
+        logger = loggers[spec["experiment"]]
+        summarize_experiment(spec, logger)
+        if os.path.exists(_topology_file(spec)):
+            os.remove(_topology_file(spec))
+        logger.info("All simulations completed. Topology file removed.\n")
+
+
+if __name__ == "__main__":
+    # python -m path_sim.sweep experiment_1/sweep.json [experiment_2/sweep.json ...]
+    run_sweep([load_spec(path) for path in sys.argv[1:]])
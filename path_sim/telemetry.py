@@ -0,0 +1,165 @@
+import asyncio
+import json
+import sys
+import threading
+
+# ==============================================================================
+# LIVE TELEMETRY: per-step path state streamed as NDJSON over a local socket
+# ==============================================================================
+
+class TelemetryPublisher:
+    """Streams simulation frames to any number of local subscribers.
+
+    The asyncio server runs on a background thread, so publish() never waits
+    on the network: each subscriber has a bounded queue and frames that do not
+    fit are dropped (and counted) instead of slowing the simulation. Frames are
+    newline-delimited JSON. Listens on TCP by default, or on a Unix socket when
+    unix_path is given. One publisher can be shared by every Simulator of a
+    sweep, and subscribers may attach or leave at any time.
+    """
+    def __init__(self, host="127.0.0.1", port=0, unix_path=None, max_queue=1024):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.max_queue = max_queue
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self._subscribers = set()
+        # Subscribers are added and removed on the server thread but read by publish()
+        self._subscribers_lock = threading.Lock()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        """Starts the server thread and returns once it is accepting connections.
+
+        Raises the server's error (e.g. OSError when the address is in use)
+        if it could not start listening.
+        """
+        self._thread = threading.Thread(target=self._serve, name="telemetry", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread.join()
+            self._loop = None
+            raise self._error
+        where = self.unix_path or f"{self.host}:{self.port}"
+        print(f"Telemetry publishing on {where}")
+        return self
+
+    def _serve(self):
+        """Body of the server thread: runs the event loop until close()."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            if self.unix_path:
+                server = asyncio.start_unix_server(self._handle_subscriber, path=self.unix_path)
+            else:
+                server = asyncio.start_server(self._handle_subscriber, self.host, self.port)
+            self._server = self._loop.run_until_complete(server)
+            if not self.unix_path:
+                # Report the real port when an ephemeral one (port=0) was requested
+                self.port = self._server.sockets[0].getsockname()[1]
+        except Exception as error:
+            # Handed to start(), which would otherwise wait forever
+            self._error = error
+            self._loop.close()
+            return
+        finally:
+            self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    async def _handle_subscriber(self, reader, writer):
+        """Drains one subscriber's queue into its socket until it disconnects."""
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        with self._subscribers_lock:
+            self._subscribers.add(queue)
+        try:
+            while True:
+                line = await queue.get()
+                if line is None:
+                    break
+                writer.write(line)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            with self._subscribers_lock:
+                self._subscribers.discard(queue)
+            writer.close()
+
+    def _fan_out(self, line):
+        """Runs on the event loop: offers a frame to every subscriber queue."""
+        with self._subscribers_lock:
+            queues = list(self._subscribers)
+        for queue in queues:
+            try:
+                queue.put_nowait(line)
+            except asyncio.QueueFull:
+                self.frames_dropped += 1
+
+    def publish(self, frame):
+        """Queues one frame for all subscribers; never blocks the caller."""
+        self.frames_published += 1
+        with self._subscribers_lock:
+            has_subscribers = bool(self._subscribers)
+        if self._loop is None or not has_subscribers:
+            return
+        line = (json.dumps(frame, separators=(",", ":")) + "\n").encode()
+        self._loop.call_soon_threadsafe(self._fan_out, line)
+
+    def close(self):
+        """Disconnects all subscribers and stops the server thread."""
+        if self._loop is None:
+            return
+        def shutdown():
+            with self._subscribers_lock:
+                queues = list(self._subscribers)
+            for queue in queues:
+                # Make room for the end-of-stream marker if the queue is full
+                while queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+            self._loop.call_later(0.1, self._loop.stop)
+        self._loop.call_soon_threadsafe(shutdown)
+        self._thread.join()
+        self._loop = None
+        print(f"Telemetry closed: {self.frames_published} frames published, {self.frames_dropped} dropped.")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+async def subscribe(host="127.0.0.1", port=None, unix_path=None):
+    """Async generator yielding the frames of a running publisher."""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        async for line in reader:
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+async def print_frames(port):
+    """Prints a one-line summary of every frame received from localhost:port."""
+    async for frame in subscribe(port=port):
+        loads = ", ".join(f"{path_id}={load}" for path_id, load in frame['loads'].items())
+        print(f"{frame['strategy']}/{frame['agents']} t={frame['timestep']}: "
+              f"throughput={frame['throughput']} loads=[{loads}] congested={frame['congested']}")
+
+
+if __name__ == "__main__":
+    # Attach to a running sweep: python -m path_sim.telemetry <port>
+    asyncio.run(print_frames(int(sys.argv[1])))
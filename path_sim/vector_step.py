@@ -0,0 +1,133 @@
+import numpy as np
+
+from .main import select_min_rtt
+from .strategy_codes import (
+    STATIC_CHOICE,
+    MIN_LOAD,
+    ROUND_ROBIN,
+    WEIGHTED_ROUND_ROBIN,
+    BLEST,
+    EPSILON_GREEDY,
+)
+
+# ==============================================================================
+# VECTORIZED STEP: the AIMD update and strategy decisions of the array engines
+# ==============================================================================
+#
+# The sharded, multi-scenario, churn, fluid and batched-optimization engines
+# all advance agents held in arrays. They share the pieces here: the per-path
+# tables a decision reads, the AIMD update of Agent.update_cwnd, the per-step
+# target of min_load / blest and the per-agent round-robin, weighted
+# round-robin and epsilon-greedy decisions. The JIT kernel (jit_engine.py)
+# runs the same rules one agent at a time and shares the tables.
+
+# BLEST only considers paths within this factor of the fastest base RTT
+BLEST_RTT_FACTOR = 1.5
+
+
+class PathTables:
+    """Per-path arrays of a topology, in topology order."""
+
+    def __init__(self, topology, rtt_factor=BLEST_RTT_FACTOR):
+        paths = topology.paths
+        self.capacity = np.array([p.capacity_mbps for p in paths], dtype=np.float64)
+        self.base_rtt = np.array([p.base_rtt_ms for p in paths], dtype=np.float64)
+        self.weights = np.array([getattr(p, 'weight', 1) for p in paths], dtype=np.float64)
+        self.blest_mask = self.base_rtt <= self.base_rtt.min() * rtt_factor
+        self.min_rtt_idx = paths.index(select_min_rtt(None, topology, None))
+
+
+def static_choice(strategy, strategy_func, topology):
+    """Path index every agent picks under a STATIC_CHOICE strategy.
+
+    None means there is no shared choice and every agent picks a random path
+    (attribute_aware when no path is compliant, see main.shares). Other
+    strategies get the min-RTT path, the greedy choice of epsilon-greedy.
+    """
+    paths = topology.paths
+    if strategy == STATIC_CHOICE:
+        path = getattr(strategy_func, 'shared', strategy_func)(None, topology, None)
+        return None if path is None else paths.index(path)
+    return paths.index(select_min_rtt(None, topology, None))
+
+
+def aimd(cwnd, congested, increase=1.0, decrease=0.5, floor=1.0):
+    """Agent.update_cwnd on arrays: congested[i] says whether agent i's path is congested."""
+    cwnd = np.where(congested, cwnd * decrease, cwnd + increase)
+    return np.maximum(cwnd, floor, out=cwnd)
+
+
+def step_target(strategy, loads, blest_mask, static, valid=None):
+    """The path every agent picks this step under min_load / blest, else `static`.
+
+    loads is (paths,) or (scenarios, paths); `valid` masks padded paths out of
+    the min_load argmin. The first minimum wins, as in the reference engine.
+    """
+    if strategy == MIN_LOAD:
+        return np.argmin(loads if valid is None else np.where(valid, loads, np.inf), axis=-1)
+    if strategy == BLEST:
+        return np.argmin(np.where(blest_mask, loads, np.inf), axis=-1)
+    return static
+
+
+def weighted_round_robin(index, counter, weight, num_paths):
+    """One weighted round-robin step; weight is the weight of each agent's current index.
+
+    Returns the new (index, counter) arrays in the dtypes of the inputs.
+    """
+    keep = counter < weight
+    new_counter = np.where(keep, counter + 1, 1).astype(counter.dtype, copy=False)
+    new_index = np.where(keep, index, (index + 1) % num_paths).astype(index.dtype, copy=False)
+    return new_index, new_counter
+
+
+def epsilon_greedy(rng, num_agents, num_paths, epsilon, greedy):
+    """Explores a random path with probability epsilon, else takes `greedy`.
+
+    epsilon may be an array of candidates: every candidate then shares the
+    same draws and the result gets a leading candidate axis.
+    """
+    explore = rng.random(num_agents) < np.asarray(epsilon)[..., None]
+    random_paths = rng.integers(num_paths, size=num_agents)
+    return np.where(explore, random_paths, greedy)
+
+
+class StrategyState:
+    """Per-agent counters of the round-robin strategies, one slot per agent."""
+
+    def __init__(self, size, index_dtype=np.int64, counter_dtype=np.float64):
+        self.rr_counter = np.zeros(size, dtype=np.int32)
+        self.wrr_index = np.zeros(size, dtype=index_dtype)
+        self.wrr_counter = np.zeros(size, dtype=counter_dtype)
+
+    def reset(self, rows):
+        """Starts the agents in `rows` from a fresh state (a reused slot)."""
+        self.rr_counter[rows] = 0
+        self.wrr_index[rows] = 0
+        self.wrr_counter[rows] = 0
+
+
+def choose_paths(strategy, state, rows, target, weights, num_paths, rng=None, epsilon=0.0, weight_rows=None):
+    """New path of the agents `rows` (index array or slice) of `state` for one step.
+
+    target comes from step_target; a None target draws a random path per
+    agent from rng. weights is indexed by the WRR index, or by
+    (weight_rows, index) when every agent has its own topology (multi
+    engine); num_paths may likewise be per agent. Counters advance in place.
+    """
+    if strategy == ROUND_ROBIN:
+        new = state.rr_counter[rows] % num_paths
+        state.rr_counter[rows] += 1
+        return new
+    if strategy == WEIGHTED_ROUND_ROBIN:
+        index = state.wrr_index[rows]
+        weight = weights[index] if weight_rows is None else weights[weight_rows, index]
+        new, state.wrr_counter[rows] = weighted_round_robin(index, state.wrr_counter[rows], weight, num_paths)
+        state.wrr_index[rows] = new
+        return new
+    size = len(range(*rows.indices(len(state.rr_counter)))) if isinstance(rows, slice) else len(rows)
+    if strategy == EPSILON_GREEDY:
+        return epsilon_greedy(rng, size, num_paths, epsilon, target)
+    if target is None:
+        return rng.integers(num_paths, size=size)
+    return np.full(size, target)
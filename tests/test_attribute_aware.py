@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from path_sim.main import Simulator, create_topology_file, reset_strategy_state
+
+HIGH_COST_PATHS = [
+    {"id": f"path_{i}", "capacity_mbps": 100 * i, "weight": 100 * i, "base_rtt_ms": 50 * i, "attributes": ["high-cost"]}
+    for i in (1, 2, 3)
+]
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = str(tmp_path / "topology.json")
+    create_topology_file(path, paths=HIGH_COST_PATHS)
+    return path
+
+
+def _loads(log_entry):
+    return [log_entry[f"path_{i}_load"] for i in (1, 2, 3)]
+
+
+def test_fallback_draws_a_path_per_agent(config_file):
+    reset_strategy_state()
+    random.seed(0)
+    sim = Simulator(config_file, 300, 20, "attribute_aware")
+    sim.run()
+    # Without a compliant path the agents do not herd onto one shared random pick
+    assert len({agent.current_path.id for agent in sim.agents}) == 3
+    assert all(load > 0 for load in _loads(sim.log_data[-1]))
+
+
+def test_jit_falls_back_and_matches_reference(config_file):
+    pytest.importorskip("numpy")
+    from path_sim.jit_engine import JitSimulator, verify_equivalence
+
+    assert not JitSimulator(config_file, 10, 10, "attribute_aware").kernel_available()
+    assert verify_equivalence(config_file, 100, 50, "attribute_aware", seed=3)
+
+
+@pytest.mark.parametrize("engine", ["sharded", "churn", "fluid"])
+def test_array_engines_spread_the_fallback(config_file, engine):
+    pytest.importorskip("numpy")
+    from path_sim.sweep import build_simulator
+
+    sim = build_simulator(engine, config_file, 3000, 20, "attribute_aware", seed=0)
+    sim.run()
+    assert all(load > 0 for load in _loads(sim.log_data[-1]))
+
+
+def test_multi_engine_runs_the_fallback_unbatched(config_file, tmp_path):
+    pytest.importorskip("numpy")
+    from path_sim.multi_engine import MultiScenarioSimulator, verify_equivalence
+
+    compliant_file = str(tmp_path / "compliant.json")
+    create_topology_file(compliant_file)
+    scenarios = [{"config_file": f, "num_agents": 30, "duration": 40, "strategy": "attribute_aware", "seed": 2}
+                 for f in (config_file, compliant_file)]
+    assert MultiScenarioSimulator(scenarios).unbatched == [0]
+    assert all(verify_equivalence(scenarios))
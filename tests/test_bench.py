@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from path_sim import bench
+
+
+def test_failing_benchmark_leaves_no_topology_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(bench, "bench_imports", lambda modules: [{"module": "main", "seconds": 0.0}])
+    config_files = []
+
+    def failing_bench(config_filepath, *args):
+        config_files.append(config_filepath)
+        raise RuntimeError("benchmark failed")
+
+    monkeypatch.setattr(bench, "bench_engines", failing_bench)
+    with pytest.raises(RuntimeError, match="benchmark failed"):
+        bench.run_benchmarks()
+    assert not os.path.exists(config_files[0])
+    assert list(tmp_path.iterdir()) == []
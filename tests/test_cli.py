@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from path_sim.cli import main
+
+
+def test_run_into_a_database_is_found_by_analyze(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    main(["run", "--strategy", "min_load", "--agents", "20", "--duration", "30", "--seed", "1", "--db", "r.db"])
+    capsys.readouterr()
+
+    main(["analyze", "r.db", "--output", "summary.csv"])
+    import pandas as pd
+
+    summary = pd.read_csv("summary.csv")
+    assert summary[["name", "experiment", "strategy", "agents"]].values.tolist() == [
+        ["results_min_load_20_agents.csv", "cli", "min_load", 20]
+    ]
+    assert summary["loss"].notna().all()
+
+
+def test_run_to_csv_writes_its_meta_file(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    main(["run", "--strategy", "min_rtt", "--agents", "10", "--duration", "20", "--seed", "1",
+          "--trace", "paths", "--experiment", "smoke"])
+    meta = json.loads((tmp_path / "results_min_rtt_10_agents.meta.json").read_text())
+    assert (meta["experiment"], meta["strategy"], meta["agents"]) == ("smoke", "min_rtt", 10)
+    assert meta["wall_seconds"] is not None
+    capsys.readouterr()
+
+    main(["analyze", "."])
+    assert "results_min_rtt_10_agents.csv" in capsys.readouterr().out
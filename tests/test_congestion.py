@@ -0,0 +1,91 @@
+import random
+import warnings
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from path_sim.congestion import Cubic, PathStateArrays
+from path_sim.main import Simulator, create_topology_file, reset_strategy_state
+from path_sim.sweep import build_simulator
+
+MODELS = ["aimd", "cubic", "bbr", "delay"]
+
+
+@pytest.fixture(scope="module")
+def config_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("topology") / "topology.json"
+    create_topology_file(str(path))
+    return str(path)
+
+
+def test_zero_capacity_path_is_infinitely_utilized():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        state = PathStateArrays(np.array([0.0, 5.0, 3.0]), np.array([0.0, 0.0, 10.0]), np.array([10.0, 20.0, 30.0]))
+    assert state.utilization.tolist() == [np.inf, np.inf, 0.3]
+    assert np.isfinite(state.rtt_ms).all()
+
+
+def test_cubic_starts_and_restarts_from_the_current_window():
+    model = Cubic()
+    state = model.init_state(np.array([3.0, 4.5], dtype=np.float32))
+    assert state["w_max"].tolist() == [3.0, 4.5]
+    model.on_switch(state, np.array([False, True]), 7, np.array([3.0, 2.0], dtype=np.float32))
+    assert state["w_max"].tolist() == [3.0, 2.0]
+    assert state["epoch_start"].tolist() == [0, 7]
+
+
+def _final_cwnd_max(engine, config_file, model):
+    # min_rtt keeps every agent on one path, so the switch reset does not mask the model
+    sim = build_simulator(engine, config_file, 20, 60, "min_rtt", seed=1, trace="cwnd", congestion_control=model)
+    sim.run()
+    return sim.log_data[-1]["cwnd_max"]
+
+
+@pytest.mark.parametrize("engine", ["reference", "sharded"])
+def test_models_produce_different_windows(config_file, engine):
+    results = {model: _final_cwnd_max(engine, config_file, model) for model in MODELS}
+    assert len(set(results.values())) == len(MODELS), results
+
+
+def test_reference_aimd_model_matches_agent_update(config_file):
+    logs = []
+    for kwargs in ({}, {"congestion_control": [(0.5, "aimd"), (0.5, "aimd")]}):
+        reset_strategy_state()
+        random.seed(4)
+        sim = Simulator(config_file, 50, 40, "min_load", **kwargs)
+        sim.run()
+        logs.append(sim.log_data)
+    assert logs[0] == logs[1]
+
+
+@pytest.mark.parametrize("engine", ["churn", "fluid"])
+def test_aimd_only_engines_refuse_other_models(config_file, engine):
+    with pytest.raises(ValueError, match="only models AIMD"):
+        build_simulator(engine, config_file, 10, 10, "min_rtt", congestion_control="cubic")
+
+
+def test_failure_migration_resets_the_model_state(config_file):
+    reset_strategy_state()
+    random.seed(0)
+    events = [{"t": 10, "action": "remove", "path": "path_1"}]
+    sim = Simulator(config_file, 50, 20, "min_rtt", trace="paths", congestion_control="cubic", events=events)
+    apply_events = sim._apply_events
+    seen = {}
+
+    def spy(t):
+        on_failed = [i for i, agent in enumerate(sim.agents) if agent.current_path.id == "path_1"]
+        apply_events(t)
+        if t == 10:
+            state = sim.cc_segments[0][2]
+            seen.update(migrated=on_failed, cwnd=[sim.agents[i].cwnd for i in on_failed],
+                        w_max=state["w_max"][on_failed].tolist(), epoch=state["epoch_start"][on_failed].tolist())
+
+    sim._apply_events = spy
+    sim.run()
+    # Right after the failure the migrated flows hold a fresh window, not the old path's
+    assert seen["migrated"]
+    assert seen["cwnd"] == [2.0] * len(seen["migrated"])
+    assert seen["w_max"] == [2.0] * len(seen["migrated"])
+    assert seen["epoch"] == [10] * len(seen["migrated"])
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from path_sim.main import create_topology_file
+from path_sim.sweep import build_simulator
+
+
+@pytest.fixture(scope="module")
+def config_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("topology") / "topology.json"
+    create_topology_file(str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ["sharded", "churn", "fluid"])
+@pytest.mark.parametrize("strategy", ["ucb", "min_rtt_measured", "no_such_strategy"])
+def test_unsupported_strategy_is_refused_before_allocation(config_file, engine, strategy):
+    # 10^9 agents would need gigabytes of learner tables or shards if anything were allocated first
+    with pytest.raises(ValueError, match=f"not supported by the {engine} engine"):
+        build_simulator(engine, config_file, 10**9, 10, strategy)
+
+
+@pytest.mark.parametrize("engine", ["reference", "jit", "sharded", "churn", "fluid", "multi"])
+def test_every_engine_has_a_memory_model(engine):
+    from path_sim.memory import estimate_memory
+
+    assert estimate_memory(engine, 1000, 3, 100, "paths") > 0
+
+
+def test_memory_model_refuses_unknown_engine():
+    from path_sim.memory import estimate_memory
+
+    with pytest.raises(ValueError, match="No memory model for engine: warp"):
+        estimate_memory("warp", 1000, 3, 100)
@@ -0,0 +1,31 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from path_sim.jit_engine import JitSimulator, compiled_step_loop, verify_equivalence
+from path_sim.main import LEARNING_STRATEGIES, create_topology_file
+
+STRATEGIES = ["min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin",
+              "epsilon_greedy", "blest", "min_rtt_measured", "epsilon_greedy_measured",
+              "blest_measured", *LEARNING_STRATEGIES]
+KERNEL_STRATEGIES = ["min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin", "blest"]
+
+
+@pytest.fixture(scope="module")
+def config_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("topology") / "topology.json"
+    create_topology_file(str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("num_agents", [10, 100])
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_jit_matches_reference(config_file, strategy, num_agents, seed):
+    assert verify_equivalence(config_file, num_agents, 100, strategy, seed=seed)
+
+
+@pytest.mark.skipif(compiled_step_loop() is None, reason="Numba is not installed")
+@pytest.mark.parametrize("strategy", KERNEL_STRATEGIES)
+def test_kernel_strategies_run_compiled(config_file, strategy):
+    assert JitSimulator(config_file, 10, 10, strategy).kernel_available()
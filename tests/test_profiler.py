@@ -0,0 +1,55 @@
+import pytest
+
+from path_sim.main import create_topology_file
+from path_sim.profiler import RunProfiler, peak_rss_bytes, reset_peak_rss
+
+
+def test_peak_rss_is_per_run():
+    if not reset_peak_rss():
+        pytest.skip("the peak RSS cannot be reset on this platform")
+    # A large transient allocation raises the process peak...
+    block = bytearray(256 * 2**20)
+    block[::4096] = b"x" * len(block[::4096])
+    process_peak = peak_rss_bytes()
+    del block
+    # ...but a run profiled afterwards only sees its own peak
+    profiler = RunProfiler()
+    profiler.lap("step")
+    assert profiler.summary(1, [])["peak_rss_mb"] < (process_peak - 128 * 2**20) / 2**20
+
+
+def test_batched_runs_split_the_batch_cost(tmp_path):
+    pytest.importorskip("numpy")
+    from path_sim.multi_engine import MultiScenarioSimulator
+
+    config_file = str(tmp_path / "topology.json")
+    create_topology_file(config_file)
+    high_cost_file = str(tmp_path / "high_cost.json")
+    create_topology_file(high_cost_file, paths=[
+        {"id": "path_1", "capacity_mbps": 100, "weight": 100, "base_rtt_ms": 50, "attributes": ["high-cost"]}
+    ])
+    scenarios = [{"config_file": config_file, "num_agents": n, "duration": 50, "strategy": "min_load", "seed": 0}
+                 for n in (10, 30)]
+    # No compliant path: this scenario runs on its own Simulator
+    scenarios.append({"config_file": high_cost_file, "num_agents": 10, "duration": 50,
+                      "strategy": "attribute_aware", "seed": 0})
+    sim = MultiScenarioSimulator(scenarios)
+    sim.run()
+    costs = sim.run_costs()
+
+    assert [cost["batched_runs"] for cost in costs] == [2, 2, None]
+    batched = [sim.profiler.phases[name]["seconds"] for name in ("setup", "step", "log")]
+    assert costs[0]["wall_seconds"] + costs[1]["wall_seconds"] == pytest.approx(sum(batched), abs=1e-3)
+    # Shares follow agent-steps: 10 x 50 against 30 x 50
+    assert costs[1]["wall_seconds"] == pytest.approx(3 * costs[0]["wall_seconds"], rel=0.01, abs=1e-3)
+    assert costs[2]["wall_seconds"] < sim.profiler.phases["unbatched"]["seconds"] + 1e-3
+
+
+def test_repeated_summaries_report_the_same_cost():
+    profiler = RunProfiler(trace_malloc=True)
+    data = [bytearray(2**20) for _ in range(8)]
+    profiler.lap("step")
+    first = profiler.summary(10, [])
+    del data
+    assert first["alloc_peak_mb"] >= 8
+    assert profiler.summary(10, []) == first
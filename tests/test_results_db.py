@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+import pandas as pd
+
+from path_sim.metrics import summarize_database, summarize_runs
+from path_sim.results_db import ResultsDB
+
+METRICS = ["oscillation", "loss", "throughput", "fairness", "fairness_std"]
+
+
+def _trace(seed, steps=50):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"timestep": range(steps), "total_throughput": rng.uniform(50, 100, steps)})
+    for path_id in ("A", "B", "C"):
+        df[f"{path_id}_load"] = rng.uniform(0, 60, steps).round(2)
+    for path_id in ("A", "B", "C"):
+        df[f"{path_id}_loss"] = rng.uniform(0, 5, steps).round(2)
+    df["total_loss"] = df[["A_loss", "B_loss", "C_loss"]].sum(axis=1)
+    return df
+
+
+def test_database_summary_streams_chunks_and_matches_in_memory_metrics(tmp_path):
+    db = ResultsDB(str(tmp_path / "results.db"))
+    traces = {}
+    for i, strategy in enumerate(["min_rtt", "blest", "blest"]):
+        name = f"results_{strategy}_{i}.csv"
+        traces[name] = _trace(i)
+        db.save_meta(name, experiment="exp", strategy=strategy, agents=10 * (i + 1))
+        db.save_trace(name, traces[name])
+    db.save_meta("results_no_trace.csv", experiment="exp", strategy="blest", agents=5)
+
+    # 7-row chunks: every trace spans several chunks, the last one partial
+    metas, table = summarize_database(db, METRICS, chunksize=7, strategy="blest")
+    assert [meta["name"] for meta in metas] == ["results_blest_1.csv", "results_blest_2.csv"]
+    expected = summarize_runs([(i, traces[meta["name"]]) for i, meta in enumerate(metas)], METRICS)
+    pd.testing.assert_frame_equal(table.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_names=False, check_index_type=False)
+
+
+def test_migrated_database_keeps_the_schema_column_types(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    # A runs table from before the cost columns were recorded
+    conn.execute("CREATE TABLE runs (name TEXT PRIMARY KEY, experiment TEXT, strategy TEXT, "
+                 "agents INTEGER, topology TEXT, duration INTEGER)")
+    conn.commit()
+    conn.close()
+
+    db = ResultsDB(path)
+    db.save_meta("results_a.csv", strategy="min_rtt", agents=10, batched_runs=12, wall_seconds=1)
+    assert db.load_meta("results_a.csv")["batched_runs"] == 12
+    assert isinstance(db.load_meta("results_a.csv")["batched_runs"], int)
+    assert isinstance(db.load_meta("results_a.csv")["wall_seconds"], float)
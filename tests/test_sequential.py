@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from path_sim.main import Simulator, create_topology_file, reset_strategy_state
+from path_sim.sequential import SWITCH_CWND, IndexedMinHeap
+
+PATHS = [
+    {"id": f"path_{i}", "capacity_mbps": capacity, "weight": capacity, "base_rtt_ms": rtt, "attributes": []}
+    for i, (capacity, rtt) in enumerate([(40, 20), (60, 25), (30, 28), (80, 60), (50, 15)])
+]
+
+
+def test_heapify_orders_by_key_then_index():
+    keys = [5.0, 1.0, 3.0, 1.0, 0.5, 7.0, 1.0]
+    heap = IndexedMinHeap(keys, range(len(keys)))
+    order = []
+    for _ in keys:
+        order.append(heap.peek())
+        heap.update(order[-1], float("inf"))
+    assert order == [4, 1, 3, 6, 2, 0, 5]
+
+
+@pytest.mark.parametrize("strategy", ["min_load", "blest"])
+def test_heap_loads_follow_every_decision(tmp_path, strategy):
+    config_file = str(tmp_path / "topology.json")
+    create_topology_file(config_file, paths=PATHS)
+    reset_strategy_state()
+    random.seed(0)
+    sim = Simulator(config_file, 60, 30, strategy, trace="paths", sequential_updates=True)
+    balancer = sim.balancer
+    checks = []
+
+    def checked_select(agent, topology, path_state):
+        # Agents already decided this step sit on their new path with the window the heap gave them
+        if not checks or checks[-1][0] is not path_state:
+            checks.append((path_state, {}, {other.id: other.current_path.id for other in sim.agents}))
+        _, decided, start_path = checks[-1]
+        path = balancer.select(agent, topology, path_state)
+        decided[agent.id] = path.id
+        expected = {path_id: 0.0 for path_id in path_state.ids}
+        for other in sim.agents:
+            window = balancer.windows[other.id]
+            if other.id not in decided:
+                expected[start_path[other.id]] += window
+            elif decided[other.id] != start_path[other.id]:
+                expected[decided[other.id]] += SWITCH_CWND
+            else:
+                expected[decided[other.id]] += window
+        for index, key in balancer.heap.keys.items():
+            assert key == pytest.approx(expected[path_state.ids[index]], abs=1e-9)
+        return path
+
+    sim.decide.func = checked_select
+    sim.run()
+    assert len(checks) == sim.duration
@@ -0,0 +1,43 @@
+import random
+
+from path_sim.main import create_topology_file
+from path_sim.sweep import build_simulator
+
+
+def test_unseeded_runs_start_from_fresh_round_robin_state(tmp_path):
+    config_file = str(tmp_path / "topology.json")
+    create_topology_file(config_file)
+    logs = []
+    for _ in range(2):
+        random.seed(0)
+        sim = build_simulator("reference", config_file, 7, 20, "round_robin")
+        sim.run()
+        logs.append(sim.log_data)
+    assert logs[0] == logs[1]
+
+
+def test_specs_sharing_a_topology_file_name_keep_their_own_paths(tmp_path):
+    import json
+
+    import pytest
+
+    pd = pytest.importorskip("pandas")
+    from path_sim.sweep import run_sweep
+
+    def spec(name, capacity):
+        return {
+            "experiment": name, "duration": 20, "agent_counts": [10], "strategies": ["min_rtt"],
+            "topology": {"file": "topology.json", "paths": [
+                {"id": "path_1", "capacity_mbps": capacity, "weight": capacity, "base_rtt_ms": 50, "attributes": []}
+            ]},
+            "result_file": f"results_{name}_{{strategy}}_{{agents}}.csv", "log_file": f"{name}_log.txt",
+            "seed": 0, "base_dir": str(tmp_path),
+        }
+
+    run_sweep([spec("low", 5), spec("high", 500)], workers=1)
+
+    # 10 agents starting at cwnd 1-5 congest a 5 Mbps path but never a 500 Mbps one
+    assert pd.read_csv(tmp_path / "results_low_min_rtt_10.csv")["total_loss"].sum() > 0
+    assert pd.read_csv(tmp_path / "results_high_min_rtt_10.csv")["total_loss"].sum() == 0
+    assert json.loads((tmp_path / "results_low_min_rtt_10.meta.json").read_text())["topology"] == "topology.json"
+    assert not list(tmp_path.glob("topology*.json"))
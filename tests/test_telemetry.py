@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from path_sim.telemetry import TelemetryPublisher, subscribe
+
+
+def test_start_raises_when_the_port_is_taken():
+    with TelemetryPublisher() as first:
+        second = TelemetryPublisher(port=first.port)
+        with pytest.raises(OSError):
+            second.start()
+        # The failed publisher holds no loop, so close() is a no-op
+        second.close()
+
+
+def test_subscriber_receives_published_frames():
+    async def receive(publisher, count):
+        frames = []
+        async for frame in subscribe(port=publisher.port):
+            frames.append(frame)
+            if len(frames) == count:
+                return frames
+
+    async def run(publisher):
+        task = asyncio.ensure_future(receive(publisher, 3))
+        while not publisher._subscribers:
+            await asyncio.sleep(0.01)
+        for t in range(3):
+            publisher.publish({"timestep": t})
+        return await asyncio.wait_for(task, timeout=5)
+
+    with TelemetryPublisher() as publisher:
+        frames = asyncio.run(run(publisher))
+    assert [frame["timestep"] for frame in frames] == [0, 1, 2]
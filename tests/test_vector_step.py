@@ -0,0 +1,38 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from path_sim.main import create_topology_file
+from path_sim.multi_engine import verify_equivalence
+from path_sim.strategy_codes import ROUND_ROBIN, WEIGHTED_ROUND_ROBIN
+from path_sim.vector_step import StrategyState, aimd, choose_paths
+
+
+def test_aimd_matches_agent_update():
+    cwnd = np.array([1.5, 4.0, 1.0, 7.0])
+    congested = np.array([True, False, True, True])
+    assert aimd(cwnd, congested).tolist() == [1.0, 5.0, 1.0, 3.5]
+
+
+def test_round_robin_counters_advance_only_for_chosen_rows():
+    state = StrategyState(4)
+    rows = np.array([1, 3])
+    for step in range(3):
+        assert choose_paths(ROUND_ROBIN, state, rows, None, None, 3).tolist() == [step % 3] * 2
+    assert state.rr_counter.tolist() == [0, 3, 0, 3]
+
+
+def test_weighted_round_robin_follows_weights():
+    state = StrategyState(1)
+    weights = np.array([2.0, 1.0, 3.0])
+    choices = [int(choose_paths(WEIGHTED_ROUND_ROBIN, state, slice(None), None, weights, 3)[0]) for _ in range(7)]
+    assert choices == [0, 0, 1, 2, 2, 2, 0]
+
+
+def test_multi_engine_matches_reference(tmp_path):
+    config_file = str(tmp_path / "topology.json")
+    create_topology_file(config_file)
+    strategies = ["min_rtt", "min_load", "attribute_aware", "round_robin", "weighted_round_robin", "blest"]
+    scenarios = [{"config_file": config_file, "num_agents": n, "duration": 60, "strategy": strategy, "seed": 1}
+                 for strategy in strategies for n in (5, 40)]
+    assert all(verify_equivalence(scenarios))